@@ -0,0 +1,62 @@
+"""Durchsatz der Digest-Algorithmen auf dieser Maschine (MB/s).
+
+Aufruf:
+    python benchmarks/bench_digest.py [--size-mb 256] [--repeat 3] [--file PATH]
+
+Ohne --file wird ein Puffer im Speicher gehasht (reiner CPU-Durchsatz);
+mit --file läuft zusätzlich compute_sha256() über die Datei.
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sss.dedupe import compute_sha256  # noqa: E402
+from sss.hashing import ALGORITHMS, new_hasher  # noqa: E402
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=256)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", type=Path, default=None)
+    args = parser.parse_args()
+
+    data = os.urandom(args.size_mb * 1024 * 1024)
+    view = memoryview(data)
+    chunk = 1 << 20
+
+    def in_memory(algorithm: str) -> None:
+        h = new_hasher(algorithm)
+        for off in range(0, len(view), chunk):
+            h.update(view[off : off + chunk])
+        h.digest()
+
+    print(f"{'algorithm':<10} {'memory MB/s':>12} {'file MB/s':>10}")
+    for algorithm in ALGORITHMS:
+        mem = args.size_mb / _best_of(args.repeat, lambda: in_memory(algorithm))
+        col = "-"
+        if args.file is not None:
+            file_mb = args.file.stat().st_size / (1024 * 1024)
+            secs = _best_of(
+                args.repeat, lambda: compute_sha256(args.file, algorithm=algorithm)
+            )
+            col = f"{file_mb / secs:.0f}"
+        print(f"{algorithm:<10} {mem:>12.0f} {col:>10}")
+
+
+if __name__ == "__main__":
+    main()
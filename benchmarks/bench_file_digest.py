@@ -0,0 +1,74 @@
+"""Vergleich: alter Lesepfad (neues bytes-Objekt je Chunk) vs. file_digest().
+
+Aufruf:
+    python benchmarks/bench_file_digest.py [--size-mb 512] [--repeat 3] [--file PATH]
+
+Ohne --file wird eine Zufallsdatei im Temp-Verzeichnis angelegt. Beide Pfade
+lesen dieselbe Datei; gemessen wird die beste von --repeat Wiederholungen.
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sss.hashing import file_digest  # noqa: E402
+
+
+def legacy_digest(path: Path, chunk_size: int) -> str:
+    """Bisheriger Pfad aus compute_sha256/get_sha256."""
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _best_of(repeat: int, fn) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=512)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--file", type=Path, default=None)
+    args = parser.parse_args()
+
+    tmp = None
+    path = args.file
+    if path is None:
+        tmp = tempfile.NamedTemporaryFile(delete=False, suffix=".bin")
+        with tmp:
+            for _ in range(args.size_mb):
+                tmp.write(os.urandom(1024 * 1024))
+        path = Path(tmp.name)
+
+    size_mb = path.stat().st_size / (1024 * 1024)
+    scenarios = {
+        "legacy read 8 KiB": lambda: legacy_digest(path, 8192),
+        "legacy read 1 MiB": lambda: legacy_digest(path, 1 << 20),
+        "readinto 1 MiB": lambda: file_digest(path, mmap_threshold=0, drop_cache=False),
+        "mmap 1 MiB": lambda: file_digest(path, mmap_threshold=1, drop_cache=False),
+    }
+    try:
+        print(f"{'path':<20} {'MB/s':>8}")
+        for name, fn in scenarios.items():
+            print(f"{name:<20} {size_mb / _best_of(args.repeat, fn):>8.0f}")
+    finally:
+        if tmp is not None:
+            os.unlink(tmp.name)
+
+
+if __name__ == "__main__":
+    main()
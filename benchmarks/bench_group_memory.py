@@ -0,0 +1,99 @@
+"""Speicher pro Datei in Duplikatgruppen: alte vs. kompakte Darstellung.
+
+Aufruf:
+    python benchmarks/bench_group_memory.py [--files 100000] [--dirs 500]
+
+Baut --files Dateien in Zweiergruppen auf --dirs Verzeichnisse verteilt,
+einmal wie früher (Hex-Digest als str, Liste von Path, FileRecords) und
+einmal als DuplicateGroup mit PathTable. Gemessen wird mit tracemalloc,
+was die Gruppen nach dem Aufbau belegen; ausgegeben werden Bytes pro
+erfasster Datei.
+"""
+
+import argparse
+import gc
+import hashlib
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sss.dedupe import DuplicateGroup  # noqa: E402
+from sss.pathtable import PathTable  # noqa: E402
+from sss.scanner import FileRecord  # noqa: E402
+
+
+@dataclass
+class LegacyGroup:
+    """DuplicateGroup vor der kompakten Darstellung."""
+
+    size: int
+    digest: str
+    files: list[Path]
+    algorithm: str = "sha256"
+    records: list[FileRecord] = field(default_factory=list)
+
+
+def _groups(files: int, dirs: int):
+    """(size, hex-digest, [FileRecord, FileRecord]) ohne etwas festzuhalten."""
+    for g in range(files // 2):
+        digest = hashlib.sha256(g.to_bytes(8, "little")).hexdigest()
+        recs = [
+            FileRecord(
+                Path(f"/srv/archiv/{(2 * g + k) % dirs:05d}/shot_{2 * g + k:09d}.png"),
+                100_000 + g,
+                1_700_000_000_000_000_000 + g,
+                2 * g + k,
+                42,
+            )
+            for k in range(2)
+        ]
+        yield 100_000 + g, digest, recs
+
+
+def _legacy(files: int, dirs: int) -> list:
+    return [
+        LegacyGroup(size, digest, [r.path for r in recs], records=recs)
+        for size, digest, recs in _groups(files, dirs)
+    ]
+
+
+def _compact(files: int, dirs: int) -> list:
+    table = PathTable()
+    return [
+        DuplicateGroup(size, digest, records=recs, table=table)
+        for size, digest, recs in _groups(files, dirs)
+    ]
+
+
+def _measure(build, files: int, dirs: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    groups = build(files, dirs)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    assert len(groups) == files // 2
+    return used / files
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--dirs", type=int, default=500)
+    args = parser.parse_args()
+
+    before = _measure(_legacy, args.files, args.dirs)
+    after = _measure(_compact, args.files, args.dirs)
+
+    print(f"{'darstellung':<12} {'bytes/datei':>12}")
+    print(f"{'vorher':<12} {before:>12.0f}")
+    print(f"{'kompakt':<12} {after:>12.0f}")
+    print(f"ersparnis    {before / after:>11.1f}x")
+
+
+if __name__ == "__main__":
+    main()
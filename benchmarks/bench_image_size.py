@@ -0,0 +1,70 @@
+"""Vergleich: get_image_size() (Header-Parser) vs. PIL.Image.open.
+
+Aufruf:
+    python benchmarks/bench_image_size.py [--count 5000] [--dir PATH]
+
+Ohne --dir werden --count kleine PNG/JPEG-Dateien in einem Temp-Verzeichnis
+erzeugt. Ausgegeben werden Dateien pro Sekunde für beide Pfade.
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from sss.metadata import _pillow_image_size, get_image_size  # noqa: E402
+
+
+def _make_corpus(root: Path, count: int) -> list[Path]:
+    from PIL import Image
+
+    sizes = [(1920, 1080), (2560, 1440), (1280, 800), (3840, 2160)]
+    paths = []
+    for i in range(count):
+        w, h = sizes[i % len(sizes)]
+        ext = "png" if i % 2 else "jpg"
+        p = root / f"shot_{i:06d}.{ext}"
+        # kleine Bilder reichen – gemessen wird der Kopf, nicht das Dekodieren
+        Image.new("RGB", (w // 16, h // 16), (i % 256, 0, 0)).save(p)
+        paths.append(p)
+    return paths
+
+
+def _rate(fn, paths: list[Path]) -> float:
+    start = time.perf_counter()
+    for p in paths:
+        fn(p)
+    return len(paths) / (time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=5000)
+    parser.add_argument("--dir", type=Path, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.dir is not None:
+            paths = sorted(
+                p
+                for p in args.dir.iterdir()
+                if p.suffix.lower() in {".png", ".jpg", ".jpeg"}
+            )
+        else:
+            paths = _make_corpus(Path(tmp), args.count)
+
+        _rate(get_image_size, paths[:100])  # Warm-up (Page-Cache)
+        fast = _rate(get_image_size, paths)
+        slow = _rate(_pillow_image_size, paths)
+
+    print(f"{'path':<12} {'files/s':>10}")
+    print(f"{'header':<12} {fast:>10.0f}")
+    print(f"{'pillow':<12} {slow:>10.0f}")
+    print(f"speedup      {fast / slow:>10.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Reproduzierbarer Screenshot-Korpus für Benchmarks.
+
+Aufruf:
+    python benchmarks/corpus.py OUT [--count 2000] [--seed 0] [--dup-ratio 0.1]
+        [--collision-ratio 0.1] [--jpeg-ratio 0.5] [--fanout 4] [--depth 2]
+        [--mtime-spread-days 365] [--scale 2]
+
+Gleicher Seed + gleiche Parameter = byte-identischer Korpus. Erzeugt werden
+PNG/JPEG-Dateien mit Rechtecken und etwas Rauschen in einer Mischung
+typischer Bildschirmauflösungen (geteilt durch --scale, damit das Erzeugen
+schnell bleibt), verteilt auf einen Ordnerbaum mit --fanout Unterordnern je
+Ebene bis --depth. Außerdem:
+
+- --dup-ratio: Anteil byte-gleicher Kopien früherer Dateien
+- --collision-ratio: Anteil Dateien, die auf das nächste Vielfache von
+  16 KiB aufgefüllt werden – gleiche Größe, anderer Inhalt
+- --mtime-spread-days: mtimes gleichverteilt über so viele Tage
+
+Die Parameter und Kennzahlen landen in OUT/corpus.json.
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+RESOLUTIONS = ((1920, 1080), (2560, 1440), (1366, 768), (1280, 800), (3840, 2160))
+COLLISION_QUANTUM = 16 * 1024
+# 2024-01-01 00:00 UTC, damit mtimes nicht vom Erzeugungszeitpunkt abhängen
+MTIME_BASE = 1704067200
+MANIFEST = "corpus.json"
+
+
+@dataclass(slots=True, kw_only=True)
+class CorpusSpec:
+    count: int = 2000
+    seed: int = 0
+    dup_ratio: float = 0.1
+    collision_ratio: float = 0.1
+    jpeg_ratio: float = 0.5
+    resolutions: tuple[tuple[int, int], ...] = RESOLUTIONS
+    scale: int = 2
+    fanout: int = 4
+    depth: int = 2
+    mtime_spread_days: float = 365.0
+
+
+@dataclass(slots=True, kw_only=True)
+class CorpusInfo:
+    spec: CorpusSpec
+    files: int = 0
+    bytes: int = 0
+    duplicates: int = 0
+    collisions: int = 0
+    dirs: list[str] = field(default_factory=list)
+
+
+def _dirs(fanout: int, depth: int) -> list[str]:
+    """Relative Ordnerpfade: "" (Wurzel), "d0", "d0/d1", ..."""
+    level = [""]
+    out = [""]
+    for _ in range(depth):
+        level = [
+            os.path.join(parent, f"d{i}") if parent else f"d{i}"
+            for parent in level
+            for i in range(fanout)
+        ]
+        out.extend(level)
+    return out
+
+
+def _render(rng: random.Random, size: tuple[int, int], fmt: str) -> bytes:
+    from PIL import Image, ImageDraw
+
+    w, h = size
+    img = Image.new("RGB", size, tuple(rng.randrange(256) for _ in range(3)))
+    draw = ImageDraw.Draw(img)
+    for _ in range(rng.randint(5, 25)):  # Fenster, Leisten, Buttons
+        x0, y0 = rng.randrange(w), rng.randrange(h)
+        x1, y1 = x0 + rng.randrange(1, w // 2), y0 + rng.randrange(1, h // 2)
+        draw.rectangle(
+            (x0, y0, x1, y1), fill=tuple(rng.randrange(256) for _ in range(3))
+        )
+    # etwas Rauschen (Text, Fotos), damit die Dateien nicht winzig werden
+    nw, nh = max(1, w // 4), max(1, h // 8)
+    noise = Image.frombytes("RGB", (nw, nh), rng.randbytes(nw * nh * 3))
+    img.paste(noise, (rng.randrange(w - nw + 1), rng.randrange(h - nh + 1)))
+
+    buf = io.BytesIO()
+    if fmt == "jpg":
+        img.save(buf, "JPEG", quality=85)
+    else:
+        img.save(buf, "PNG", compress_level=1)
+    return buf.getvalue()
+
+
+def generate_corpus(root: Path | str, spec: CorpusSpec | None = None) -> CorpusInfo:
+    """Erzeugt den Korpus unter root (muss leer sein oder fehlen)."""
+    spec = spec or CorpusSpec()
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    if any(root.iterdir()):
+        raise ValueError(f"{root} ist nicht leer")
+
+    rng = random.Random(spec.seed)
+    info = CorpusInfo(spec=spec, dirs=_dirs(spec.fanout, spec.depth))
+    for d in info.dirs[1:]:
+        (root / d).mkdir(parents=True, exist_ok=True)
+
+    originals: list[tuple[bytes, str]] = []
+    spread = spec.mtime_spread_days * 86400
+    for i in range(spec.count):
+        if originals and rng.random() < spec.dup_ratio:
+            data, ext = rng.choice(originals)
+            info.duplicates += 1
+        else:
+            ext = "jpg" if rng.random() < spec.jpeg_ratio else "png"
+            w, h = rng.choice(spec.resolutions)
+            data = _render(rng, (w // spec.scale, h // spec.scale), ext)
+            if rng.random() < spec.collision_ratio:
+                padded = -(-len(data) // COLLISION_QUANTUM) * COLLISION_QUANTUM
+                data += rng.randbytes(padded - len(data))  # hinter IEND/EOI
+                info.collisions += 1
+            originals.append((data, ext))
+
+        path = root / rng.choice(info.dirs) / f"Screenshot_{i:06d}.{ext}"
+        path.write_bytes(data)
+        mtime = MTIME_BASE + rng.random() * spread
+        os.utime(path, (mtime, mtime))
+        info.files += 1
+        info.bytes += len(data)
+
+    manifest = asdict(info)
+    manifest.pop("dirs")
+    (root / MANIFEST).write_text(json.dumps(manifest, indent=2))
+    return info
+
+
+def load_manifest(root: Path | str) -> dict:
+    return json.loads((Path(root) / MANIFEST).read_text())
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Korpus-Parameter; auch von suite.py benutzt."""
+    d = CorpusSpec()
+    parser.add_argument("--count", type=int, default=d.count)
+    parser.add_argument("--seed", type=int, default=d.seed)
+    parser.add_argument("--dup-ratio", type=float, default=d.dup_ratio)
+    parser.add_argument("--collision-ratio", type=float, default=d.collision_ratio)
+    parser.add_argument("--jpeg-ratio", type=float, default=d.jpeg_ratio)
+    parser.add_argument("--scale", type=int, default=d.scale)
+    parser.add_argument("--fanout", type=int, default=d.fanout)
+    parser.add_argument("--depth", type=int, default=d.depth)
+    parser.add_argument("--mtime-spread-days", type=float, default=d.mtime_spread_days)
+
+
+def spec_from_args(args: argparse.Namespace) -> CorpusSpec:
+    return CorpusSpec(
+        count=args.count,
+        seed=args.seed,
+        dup_ratio=args.dup_ratio,
+        collision_ratio=args.collision_ratio,
+        jpeg_ratio=args.jpeg_ratio,
+        scale=args.scale,
+        fanout=args.fanout,
+        depth=args.depth,
+        mtime_spread_days=args.mtime_spread_days,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("out", type=Path)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    info = generate_corpus(args.out, spec_from_args(args))
+    print(
+        f"{info.files} Dateien, {info.bytes / 1e6:.1f} MB, "
+        f"{info.duplicates} Duplikate, {info.collisions} Größenkollisionen "
+        f"in {len(info.dirs)} Ordnern -> {args.out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""Benchmark-Suite: scan, dedupe, Verschieben und Metadaten auf einem Korpus.
+
+Aufruf:
+    python benchmarks/suite.py [--corpus DIR] [Korpus-Parameter, siehe corpus.py]
+        [--scenario NAME ...] [--repeat 3] [--jobs 1]
+        [--output FILE.json] [--compare ALT.json]
+
+Ohne --corpus wird ein Korpus im Temp-Verzeichnis erzeugt (gleicher Seed =
+gleicher Korpus). Jedes Szenario läuft in einem eigenen Python-Prozess,
+damit der Spitzen-RSS pro Szenario gemessen werden kann; gezählt wird die
+beste von --repeat Wiederholungen.
+
+Ergebnisse (files/s, MB/s, Spitzen-RSS) landen als JSON in --output
+(Default: benchmarks/results/<zeitstempel>.json); --compare zeigt die
+Änderung gegenüber einem früheren Lauf.
+"""
+
+import argparse
+import json
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent / "src"))
+
+import corpus  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+# -- Szenarien (laufen im Kindprozess) ---------------------------------------
+
+
+def _records(root: Path) -> list:
+    from sss.scanner import IMAGE_EXTENSIONS, iter_files
+
+    return list(iter_files(root, recursive=True, extensions=IMAGE_EXTENSIONS))
+
+
+def _work_copy(root: Path, tmp: Path) -> Path:
+    """Frische Kopie des Korpus für Szenarien, die Dateien verschieben."""
+    work = tmp / "work"
+    if work.exists():
+        shutil.rmtree(work)
+    shutil.copytree(root, work)
+    if (tmp / "out").exists():
+        shutil.rmtree(tmp / "out")
+    return work
+
+
+def scenario_dedupe(root: Path, tmp: Path, jobs: int):
+    from sss.dedupe import find_duplicate_groups
+    from sss.hashing import HashEngine
+
+    def run():
+        find_duplicate_groups(_records(root), engine=HashEngine(jobs))
+
+    return None, run
+
+
+def scenario_scan_plan(root: Path, tmp: Path, jobs: int):
+    from typer.testing import CliRunner
+
+    from sss.cli import app
+
+    runner = CliRunner()
+
+    def run():
+        result = runner.invoke(app, ["scan", str(root), "--recursive"])
+        assert result.exit_code == 0, result.output
+
+    return None, run
+
+
+def scenario_safe_move(root: Path, tmp: Path, jobs: int):
+    from sss.mover import build_target_path, safe_move
+
+    state = {}
+
+    def setup():
+        work = _work_copy(root, tmp)
+        state["records"] = _records(work)
+
+    def run():
+        out = tmp / "out"
+        for rec in state["records"]:
+            safe_move(rec, build_target_path(rec, out))
+
+    return setup, run
+
+
+def scenario_execute_moves(root: Path, tmp: Path, jobs: int):
+    from sss.mover import build_target_path, execute_moves
+
+    state = {}
+
+    def setup():
+        work = _work_copy(root, tmp)
+        state["records"] = _records(work)
+
+    def run():
+        out = tmp / "out"
+        plan = [(r, build_target_path(r, out) / r.name) for r in state["records"]]
+        report = execute_moves(plan, workers=jobs)
+        assert not report.errors, report.errors[:3]
+
+    return setup, run
+
+
+def scenario_metadata(root: Path, tmp: Path, jobs: int):
+    from sss.metadata import extract_metadata_many
+
+    def run():
+        extract_metadata_many([rec.path for rec in _records(root)], jobs=jobs)
+
+    return None, run
+
+
+SCENARIOS = {
+    "dedupe": scenario_dedupe,
+    "scan-plan": scenario_scan_plan,
+    "safe-move": scenario_safe_move,
+    "execute-moves": scenario_execute_moves,
+    "metadata": scenario_metadata,
+}
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux: KiB, macOS: Bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(name: str, root: Path, repeat: int, jobs: int) -> dict:
+    """Führt ein Szenario im aktuellen Prozess aus und liefert die Messwerte."""
+    manifest = corpus.load_manifest(root)
+    with tempfile.TemporaryDirectory(prefix="sss-bench-") as tmp:
+        setup, run = SCENARIOS[name](root, Path(tmp), jobs)
+        best = float("inf")
+        for _ in range(repeat):
+            if setup is not None:
+                setup()
+            start = time.perf_counter()
+            run()
+            best = min(best, time.perf_counter() - start)
+    return {
+        "seconds": best,
+        "files": manifest["files"],
+        "bytes": manifest["bytes"],
+        "files_per_s": manifest["files"] / best,
+        "mb_per_s": manifest["bytes"] / 1e6 / best,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+# -- Steuerung ---------------------------------------------------------------
+
+
+def _git_revision() -> str | None:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=BENCH_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return out.stdout.strip()
+
+
+def _run_scenario(name: str, root: Path, repeat: int, jobs: int) -> dict:
+    cmd = [sys.executable, __file__, "--child", name, "--corpus", str(root)]
+    cmd += ["--repeat", str(repeat), "--jobs", str(jobs)]
+    out = subprocess.run(cmd, capture_output=True, text=True)
+    if out.returncode != 0:
+        raise SystemExit(f"Szenario {name} fehlgeschlagen:\n{out.stderr}")
+    return json.loads(out.stdout)
+
+
+def _print_table(results: dict, baseline: dict | None) -> None:
+    header = f"{'scenario':<15} {'s':>8} {'files/s':>10} {'MB/s':>8} {'RSS MB':>8}"
+    if baseline:
+        header += f" {'Δ files/s':>10}"
+    print(header)
+    for name, r in results.items():
+        rss = "-" if r["peak_rss_mb"] is None else f"{r['peak_rss_mb']:.0f}"
+        line = (
+            f"{name:<15} {r['seconds']:>8.3f} {r['files_per_s']:>10.0f} "
+            f"{r['mb_per_s']:>8.1f} {rss:>8}"
+        )
+        old = (baseline or {}).get(name)
+        if old:
+            line += f" {(r['files_per_s'] / old['files_per_s'] - 1) * 100:>+9.1f}%"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--corpus", type=Path, default=None)
+    corpus.add_arguments(parser)
+    parser.add_argument(
+        "--scenario", action="append", choices=list(SCENARIOS), default=None
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--jobs", type=int, default=1)
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--compare", type=Path, default=None)
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_child(args.child, args.corpus, args.repeat, args.jobs)))
+        return
+
+    with tempfile.TemporaryDirectory(prefix="sss-corpus-") as tmp:
+        root = args.corpus
+        if root is None:
+            root = Path(tmp) / "corpus"
+            print("Erzeuge Korpus ...", file=sys.stderr)
+            corpus.generate_corpus(root, corpus.spec_from_args(args))
+
+        results = {}
+        for name in args.scenario or SCENARIOS:
+            print(f"Szenario {name} ...", file=sys.stderr)
+            results[name] = _run_scenario(name, root, args.repeat, args.jobs)
+        manifest = corpus.load_manifest(root)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git": _git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "jobs": args.jobs,
+        "corpus": manifest,
+        "results": results,
+    }
+    output = args.output or (
+        BENCH_DIR / "results" / f"{time.strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+
+    baseline = None
+    if args.compare:
+        old = json.loads(args.compare.read_text())
+        if old.get("corpus", {}).get("spec") != manifest["spec"]:
+            print("Achtung: anderer Korpus als im Vergleichslauf", file=sys.stderr)
+        baseline = old["results"]
+    _print_table(results, baseline)
+    print(f"\nErgebnisse: {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,21 @@
+"""Ort der persistenten Caches (Digests, Katalog, Journale, Aufnahmedaten).
+
+Eigenes Modul ohne Abhängigkeiten, damit z. B. journal das Verzeichnis
+kennt, ohne hashcache und damit sqlite3 zu laden (siehe
+tests/test_cli_startup.py).
+"""
+
+import os
+from pathlib import Path
+
+
+def default_cache_dir() -> Path:
+    """Cache-Verzeichnis: $SSS_CACHE_DIR, sonst plattformüblicher User-Cache."""
+    override = os.environ.get("SSS_CACHE_DIR")
+    if override:
+        return Path(override)
+    if os.name == "nt":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "sss"
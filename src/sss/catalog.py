@@ -0,0 +1,338 @@
+"""Persistenter Metadaten-Katalog (SQLite) für `sss index` und `sss query`.
+
+Pro Datei werden Endung, Größe, Digest, MIME-Typ, Breite/Höhe und mtime
+zusammen mit der Stat-Signatur gespeichert. `Catalog.update` läuft über
+einen Ordner und liest nur Dateien neu, deren Signatur sich geändert hat;
+alles andere wird nur als gesehen markiert. Abfragen laufen über Indizes
+auf Endung/Auflösung, Größe, mtime und Digest, ohne den Ordner anzufassen.
+"""
+
+import os
+import sqlite3
+import time
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from .cachedir import default_cache_dir
+from .hashcache import signature_matches, stat_signature
+from .metadata import extract_metadata_many
+from .scanner import FileRecord
+
+SCHEMA_VERSION = 1
+
+# Geänderte Dateien werden in Blöcken dieser Größe extrahiert und committet.
+_BATCH = 256
+
+_COLUMNS = "path, size, mtime_ns, ext, digest, mime, width, height"
+
+
+def default_catalog_path() -> Path:
+    return default_cache_dir() / "catalog.sqlite"
+
+
+def _key(path: Path | str) -> str:
+    # wie DigestCache: abspath statt resolve(), keine zusätzlichen Syscalls
+    return os.path.abspath(path)
+
+
+def _prefix_range(root: Path | str) -> tuple[str, str]:
+    """Schlüsselbereich [lo, hi) aller Pfade unterhalb von root."""
+    key = _key(root).rstrip(os.sep) + os.sep
+    # os.sep + 1 ist das kleinste Zeichen, das nicht mehr unter root fällt
+    return key, key[:-1] + chr(ord(os.sep) + 1)
+
+
+@dataclass(slots=True, kw_only=True)
+class CatalogEntry:
+    path: Path
+    size: int
+    mtime_ns: int
+    ext: str
+    digest: str
+    mime: str
+    width: int | None = None
+    height: int | None = None
+
+    @property
+    def mtime(self) -> float:
+        return self.mtime_ns / 1e9
+
+    def to_dict(self) -> dict:
+        return {
+            "path": str(self.path),
+            "size": self.size,
+            "mtime": self.mtime,
+            "ext": self.ext,
+            "digest": self.digest,
+            "mime": self.mime,
+            "width": self.width,
+            "height": self.height,
+        }
+
+
+@dataclass(slots=True, kw_only=True)
+class IndexReport:
+    """Ergebnis von Catalog.update."""
+
+    seen: int = 0
+    added: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    errors: int = 0
+
+    def render(self) -> str:
+        return (
+            f"Index: gesehen={self.seen} | neu={self.added} | "
+            f"geändert={self.updated} | unverändert={self.unchanged} | "
+            f"entfernt={self.removed} | fehler={self.errors}"
+        )
+
+
+class Catalog:
+    """
+    SQLite-Katalog mit Datei-Metadaten.
+
+    Die Verbindung wird wie beim DigestCache erst beim ersten Zugriff
+    geöffnet. Ein Katalog mit fremder Schema-Version wird neu angelegt –
+    er lässt sich jederzeit per `sss index` wieder aufbauen.
+    """
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path is not None else default_catalog_path()
+        self._conn: sqlite3.Connection | None = None
+
+    # -- Verbindung --------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            conn.execute("DROP TABLE IF EXISTS files")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS files (
+                path       TEXT PRIMARY KEY,
+                dev        INTEGER NOT NULL,
+                ino        INTEGER NOT NULL,
+                size       INTEGER NOT NULL,
+                mtime_ns   INTEGER NOT NULL,
+                ext        TEXT NOT NULL,
+                digest     TEXT NOT NULL,
+                mime       TEXT NOT NULL,
+                width      INTEGER,
+                height     INTEGER,
+                indexed_at INTEGER NOT NULL
+            )
+            """)
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS files_dims ON files(ext, width, height)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS files_size ON files(size)")
+        conn.execute("CREATE INDEX IF NOT EXISTS files_mtime ON files(mtime_ns)")
+        conn.execute("CREATE INDEX IF NOT EXISTS files_digest ON files(digest)")
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self._conn.execute("PRAGMA optimize")
+        self._conn.close()
+        self._conn = None
+
+    def __enter__(self) -> "Catalog":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    # -- Aktualisieren -----------------------------------------------------
+
+    def update(
+        self,
+        records: Iterable[FileRecord],
+        *,
+        root: Path | str | None = None,
+        jobs: int = 1,
+    ) -> IndexReport:
+        """
+        Übernimmt records in den Katalog.
+
+        - Dateien mit unveränderter Stat-Signatur werden nicht gelesen.
+        - Neue/geänderte Dateien laufen blockweise durch extract_metadata_many.
+        - root: Einträge unterhalb von root, die in records nicht vorkamen,
+          werden entfernt (Datei gelöscht, verschoben oder ausgeschlossen).
+        """
+        conn = self._connect()
+        run = time.time_ns()
+        report = IndexReport()
+        todo: list[tuple[str, FileRecord, bool]] = []
+        for record in records:
+            report.seen += 1
+            key = _key(record.path)
+            row = conn.execute(
+                "SELECT dev, ino, size, mtime_ns FROM files WHERE path = ?", (key,)
+            ).fetchone()
+            if row is not None and signature_matches(
+                tuple(row), stat_signature(record)
+            ):
+                conn.execute(
+                    "UPDATE files SET indexed_at = ? WHERE path = ?", (run, key)
+                )
+                report.unchanged += 1
+                continue
+            todo.append((key, record, row is not None))
+            if len(todo) >= _BATCH:
+                self._store(todo, run, jobs, report)
+                todo.clear()
+        self._store(todo, run, jobs, report)
+
+        if root is not None:
+            lo, hi = _prefix_range(root)
+            cur = conn.execute(
+                "DELETE FROM files WHERE path >= ? AND path < ? AND indexed_at < ?",
+                (lo, hi, run),
+            )
+            report.removed = cur.rowcount
+        conn.commit()
+        return report
+
+    def _store(
+        self,
+        todo: list[tuple[str, FileRecord, bool]],
+        run: int,
+        jobs: int,
+        report: IndexReport,
+    ) -> None:
+        if not todo:
+            return
+        try:
+            results = extract_metadata_many([r.path for _, r, _ in todo], jobs=jobs)
+        except OSError:
+            # eine Datei ist verschwunden o. ä.: einzeln weiter, Rest behalten
+            results = []
+            for _, record, _ in todo:
+                try:
+                    results.extend(extract_metadata_many([record.path]))
+                except OSError:
+                    results.append(None)
+        rows = []
+        for (key, record, existed), md in zip(todo, results):
+            if md is None:
+                report.errors += 1
+                continue
+            if existed:
+                report.updated += 1
+            else:
+                report.added += 1
+            rows.append(
+                (
+                    key,
+                    *stat_signature(record),
+                    md["ext"],
+                    md["sha256"],
+                    md["mime"],
+                    md.get("width"),
+                    md.get("height"),
+                    run,
+                )
+            )
+        conn = self._connect()
+        conn.executemany(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+        conn.commit()
+
+    # -- Abfragen ----------------------------------------------------------
+
+    def query(
+        self,
+        *,
+        ext: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        min_size: int | None = None,
+        max_size: int | None = None,
+        year: int | None = None,
+        under: Path | str | None = None,
+        digest: str | None = None,
+        duplicates: bool = False,
+        limit: int | None = None,
+    ) -> Iterator[CatalogEntry]:
+        """
+        Liefert passende Einträge, sortiert nach Pfad.
+
+        - year: mtime im Kalenderjahr (lokale Zeit, wie die Zielordner von scan)
+        - under: nur Dateien unterhalb dieses Ordners
+        - duplicates: nur Dateien, deren Digest unter den Treffern mehrfach
+          vorkommt; sortiert nach Digest, dann Pfad
+        """
+        where, params = [], []
+        if ext is not None:
+            where.append("ext = ?")
+            params.append(ext.lstrip(".").lower())
+        if width is not None:
+            where.append("width = ?")
+            params.append(width)
+        if height is not None:
+            where.append("height = ?")
+            params.append(height)
+        if min_size is not None:
+            where.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            where.append("size <= ?")
+            params.append(max_size)
+        if year is not None:
+            lo = int(datetime(year, 1, 1).timestamp()) * 10**9
+            hi = int(datetime(year + 1, 1, 1).timestamp()) * 10**9
+            where.append("mtime_ns >= ? AND mtime_ns < ?")
+            params += [lo, hi]
+        if under is not None:
+            where.append("path >= ? AND path < ?")
+            params += _prefix_range(under)
+        if digest is not None:
+            where.append("digest = ?")
+            params.append(digest.lower())
+
+        sql = f"SELECT {_COLUMNS} FROM files"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        if duplicates:
+            sql = (
+                f"WITH sel AS ({sql}) SELECT * FROM sel WHERE digest IN "
+                "(SELECT digest FROM sel GROUP BY digest HAVING COUNT(*) > 1) "
+                "ORDER BY digest, path"
+            )
+        else:
+            sql += " ORDER BY path"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        for path, size, mtime_ns, ext_, digest_, mime, w, h in self._connect().execute(
+            sql, params
+        ):
+            yield CatalogEntry(
+                path=Path(path),
+                size=size,
+                mtime_ns=mtime_ns,
+                ext=ext_,
+                digest=digest_,
+                mime=mime,
+                width=w,
+                height=h,
+            )
@@ -1,14 +1,32 @@
+"""Kommandozeile (typer).
+
+sss wird oft tausendfach am Tag aus cron oder Dateimanager-Hooks gestartet.
+Auf Modulebene wird deshalb nur importiert, was jeder Aufruf braucht; alles
+Schwergewichtige (hashlib, sqlite3, Thread-Pool, Pillow) laden die Befehle
+selbst, wenn sie laufen. tests/test_cli_startup.py prüft das.
+"""
+
 from pathlib import Path
 from datetime import datetime
+import contextlib
+import itertools
 
 import typer
 
-from .mover import build_target_path, safe_move
-from .summary import Summary
-import sss.dedupe as dedupe_module
+from .scanner import IMAGE_EXTENSIONS, iter_files
+
+# Spiegel von hashing.ALGORITHMS, damit --help ohne hashlib auskommt
+DIGEST_CHOICES = ("sha256", "blake2b", "blake2s")
 
+# scan: ab so vielen Dateien laufen Durchlauf, Planung und Verschieben
+# überlappend auf der asyncio-Pipeline (sss.pipeline); kleinere Ordner
+# bleiben ohne Event-Loop und Threads, das hält den Start schlank.
+_PIPELINE_AFTER = 64
+# höchstens so viele Verschiebungen pro execute_moves-Aufruf der Pipeline
+_MOVE_BATCH = 1000
 
-app = typer.Typer(no_args_is_help=True)
+# rich_markup_mode=None: Hilfe als schlichter click-Text, ohne rich zu laden
+app = typer.Typer(no_args_is_help=True, rich_markup_mode=None)
 
 
 @app.callback()
@@ -22,6 +40,95 @@ def hello(name: str = "Freund"):
     typer.echo(f"Hallo, {name}!")
 
 
+@contextlib.contextmanager
+def _journal(journal_path: Path | None, command: str, *, unique: bool, out):
+    """
+    Öffnet ein Write-Ahead-Journal für einen ausführenden Lauf. Ein
+    automatisch angelegtes Journal wird nach sauberem Ende gelöscht; nach
+    einem Abbruch bleibt es liegen und `sss resume` kann weitermachen.
+    """
+    from .journal import Journal, new_journal_path
+
+    path = journal_path or new_journal_path(command)
+    out.line(f"📝 Journal: {path}")
+    with Journal(path, command=command, unique=unique) as journal:
+        yield journal
+    if journal_path is None:
+        path.unlink()
+
+
+def _emit_stats(summary, stats: bool, stats_json: Path | None) -> None:
+    """--stats: Report ausgeben; --stats-json: Metriken als JSON schreiben."""
+    if stats:
+        typer.echo("\n" + summary.render_stats())
+    if stats_json is not None:
+        import json
+
+        data = json.dumps(summary.to_dict(), indent=2)
+        if str(stats_json) == "-":
+            typer.echo(data)
+        else:
+            stats_json.write_text(data + "\n", encoding="utf-8")
+
+
+def _output(fmt: str, quiet: bool):
+    from .output import Output
+
+    try:
+        return Output(fmt, quiet=quiet)
+    except ValueError as exc:
+        raise typer.BadParameter(str(exc), param_hint="--format") from None
+
+
+def _plan_record(record, out_root: Path, out, dates=None) -> Path:
+    """Zeigt die PLAN-Zeile und liefert den Zielordner <out_root>/<jahr>/<monat>."""
+    from .mover import build_target_path
+
+    dest_dir = build_target_path(record, out_root, dates=dates)
+    _plan_line(record, dest_dir, out)
+    return dest_dir
+
+
+def _plan_line(record, dest_dir: Path, out) -> None:
+    if out.lines:  # Datumsformat nur, wenn es jemand liest
+        change_time = datetime.fromtimestamp(record.mtime).strftime("%d.%m.%Y %H:%M:%S")
+        file_size_mb = record.size / (1024 * 1024)
+        out.line(
+            f"PLAN: {record.name} -> {dest_dir}  "
+            f"({file_size_mb:.2f} MB, {change_time})"
+        )
+
+
+def _sort_record(
+    record,
+    out_root: Path,
+    *,
+    dry_run: bool,
+    summary,
+    allocators: dict,
+    out,
+    dates=None,
+) -> None:
+    """
+    Plant (und ggf. verschiebt) eine einzelne Datei, z. B. für watch.
+    allocators: NameAllocator je Zielordner, über Aufrufe hinweg wiederverwendet.
+    """
+    from .mover import safe_move
+    from .renamer import NameAllocator
+
+    dest_dir = _plan_record(record, out_root, out, dates)
+    if not dry_run:
+        alloc = allocators.get(dest_dir)
+        if alloc is None:
+            alloc = allocators[dest_dir] = NameAllocator(dest_dir)
+        safe_move(record, dest_dir, allocator=alloc)
+        summary.inc_moved()
+        out.line(f"✓ Verschoben: {record.name} -> {dest_dir}")
+    else:
+        summary.inc_simulated()
+        out.line(f"✈ Simulation: {record.name} -> {dest_dir}")
+
+
 @app.command()
 def scan(
     path: Path,
@@ -31,7 +138,53 @@ def scan(
     dry_run: bool = typer.Option(
         True, "--dry-run/--no-dry-run", help="Nur simulieren, nichts verschieben"
     ),
+    recursive: bool = typer.Option(
+        False, "--recursive", "-r", help="Auch Unterordner durchsuchen"
+    ),
+    max_depth: int = typer.Option(
+        None, "--max-depth", min=0, help="Maximale Ordnertiefe (mit --recursive)"
+    ),
+    exclude: list[str] = typer.Option(
+        [], "--exclude", help="Ordnername oder -pfad überspringen (mehrfach möglich)"
+    ),
+    sort: bool = typer.Option(
+        True,
+        "--sort/--no-sort",
+        help=(
+            "Nach Änderungszeit sortieren (Standard). Dafür wird der Ordner erst "
+            "komplett gelistet, auch mit --format jsonl; --no-sort streamt und "
+            "plant schon beim Durchlauf."
+        ),
+    ),
+    journal_path: Path = typer.Option(
+        None,
+        "--journal",
+        help="Journal für 'sss resume' (default: User-Cache/sss/journals)",
+    ),
+    stats: bool = typer.Option(
+        False, "--stats", help="Zeiten pro Stufe, Latenzen und Zähler ausgeben"
+    ),
+    stats_json: Path = typer.Option(
+        None, "--stats-json", help="Metriken als JSON schreiben ('-' = stdout)"
+    ),
+    fmt: str = typer.Option(
+        "text", "--format", help="Ausgabeformat: text oder jsonl (ein JSON pro Zeile)"
+    ),
+    quiet: bool = typer.Option(
+        False, "--quiet", "-q", help="Nur die Zusammenfassung ausgeben"
+    ),
+    date_cache: bool = typer.Option(
+        True,
+        "--date-cache/--no-date-cache",
+        help="Aufnahmedaten im Cache merken",
+    ),
 ):
+    import time
+
+    from .dates import DateResolver
+    from .summary import Summary
+
+    out = _output(fmt, quiet)
     in_root = Path(path)
 
     if not in_root.exists():
@@ -39,49 +192,107 @@ def scan(
         raise typer.Exit(code=1)
 
     out_root = out_dir or (in_root / "_by_date")
-    typer.echo(f"📁 Zielbasis: {out_root}")
-
-    files = [f for f in in_root.iterdir() if f.is_file()]
-    image_extensions = (".png", ".jpg", ".jpeg")
+    out.line(f"📁 Zielbasis: {out_root}")
+    summary = Summary(out_root=out_root)
+    want_stats = stats or stats_json is not None
 
-    screenshots = [f for f in files if f.suffix.lower() in image_extensions]
+    # Zielbasis nie selbst wieder einsammeln
+    records = iter_files(
+        in_root,
+        recursive=recursive,
+        max_depth=max_depth,
+        extensions=IMAGE_EXTENSIONS,
+        exclude=[*exclude, out_root.absolute()],
+    )
+    if want_stats:
+        records = summary.stages.wrap("walk", records)
+    if sort:
+        records = list(records)
+        with summary.stages.measure("sort"):
+            records.sort(key=lambda r: r.mtime_ns, reverse=True)
+        records = iter(records)
 
-    if not screenshots:
-        typer.echo("Keine Screenshots gefunden.")
+    head = list(itertools.islice(records, _PIPELINE_AFTER))
+    if not head:
+        out.summary("Keine Screenshots gefunden.", summary.to_dict())
+        _emit_stats(summary, stats, stats_json)
         raise typer.Exit(code=0)
 
-    sorted_screenshots = sorted(
-        screenshots, key=lambda p: p.stat().st_mtime, reverse=True
-    )
+    from .mover import MoveReport, build_target_path, execute_moves
 
-    summary = Summary(out_root=out_root)
+    out.line("Gefundene Screenshots:")
+    dates = DateResolver(use_cache=date_cache)
+    allocators: dict = {}
+    total = MoveReport()
+    journal = None
 
-    typer.echo("Gefundene Screenshots:")
-    for file_path in sorted_screenshots:
-        dest_dir = build_target_path(file_path, out_root)
-        mtime = file_path.stat().st_mtime
-        change_time = datetime.fromtimestamp(mtime).strftime("%d.%m.%Y %H:%M:%S")
-        file_size_mb = file_path.stat().st_size / (1024 * 1024)
-        typer.echo(
-            f"PLAN: {file_path.name} -> {dest_dir}  ({file_size_mb:.2f} MB, {change_time})"
-        )
+    def plan(record):
+        if not want_stats:
+            return record, build_target_path(record, out_root, dates=dates)
+        start = time.perf_counter()
+        with summary.stages.measure("plan"):
+            dest_dir = build_target_path(record, out_root, dates=dates)
+        summary.add_latency(time.perf_counter() - start)
+        return record, dest_dir
 
+    def show(planned):
+        record, dest_dir = planned
+        _plan_line(record, dest_dir, out)
         if not dry_run:
-            dest_dir = build_target_path(file_path, out_root)
-            safe_move(file_path, dest_dir)
-            summary.inc_moved()
-            typer.echo(f"✓ Verschoben: {file_path.name} -> {dest_dir}")
-        else:
-            summary.inc_simulated()
-            typer.echo(f"✈ Simulation: {file_path.name} -> {dest_dir}")
+            return record, dest_dir / record.name
+        summary.inc_simulated()
+        out.line(f"✈ Simulation: {record.name} -> {dest_dir}")
+        out.record(
+            "plan",
+            src=record.path,
+            dst=dest_dir / record.name,
+            size=record.size,
+            mtime=record.mtime,
+        )
+        return None
 
-    typer.echo("\n" + summary.render())
+    def move(batch):
+        # gebündelt: ein mkdir/listdir pro Zielordner, über Bündel hinweg
+        with summary.stages.measure("move"):
+            return execute_moves(batch, journal=journal, allocators=allocators)
 
+    def report(done):
+        for src, dst in done.moved:
+            out.line(f"✓ Verschoben: {src.name} -> {dst.parent}")
+            out.record("move", src=src, dst=dst)
+        for src, exc in done.errors:
+            out.line(f"✗ Fehler: {src.name}: {exc}")
+            out.record("error", src=src, error=str(exc))
+        summary.inc_moved(len(done.moved))
+        total.merge(done)
 
-if __name__ == "__main__":
-    import sys
+    with contextlib.ExitStack() as stack:
+        if not dry_run:
+            journal = stack.enter_context(
+                _journal(journal_path, "scan", unique=True, out=out)
+            )
+        if len(head) < _PIPELINE_AFTER:
+            moves = [m for m in map(show, map(plan, head)) if m is not None]
+            dates.close()
+            if moves:
+                report(move(moves))
+        else:
+            from .pipeline import Pipeline
 
-    sys.exit(app())
+            # Planen läuft in genau einem Thread: dessen SQLite-Verbindung
+            # (Datums-Cache) wird dort auch wieder geschlossen
+            pipeline = Pipeline(itertools.chain(head, records))
+            pipeline.map(plan, finish=dates.close)
+            pipeline.map(show, inline=True)
+            pipeline.batch(_MOVE_BATCH).map(move)
+            pipeline.run(sink=report)
+
+    if not dry_run:
+        out.summary(total.render())
+    out.summary("\n" + summary.render(), summary.to_dict())
+    _emit_stats(summary, stats, stats_json)
+    if total.errors:
+        raise typer.Exit(code=1)
 
 
 @app.command()
@@ -92,27 +303,529 @@ def dedupe(
         "--execute",
         help="Aktionen wirklich ausführen statt nur Dry-Run.",
     ),
+    use_cache: bool = typer.Option(
+        True, "--cache/--no-cache", help="Persistenten Hash-Cache benutzen."
+    ),
+    cache_path: Path = typer.Option(
+        None, "--cache-path", help="Cache-Datei (default: User-Cache/sss)."
+    ),
+    cache_max_entries: int = typer.Option(
+        None, "--cache-max-entries", min=0, help="Maximale Anzahl Cache-Einträge."
+    ),
+    prune_cache: bool = typer.Option(
+        False, "--prune-cache", help="Veraltete Cache-Einträge vorher entfernen."
+    ),
+    jobs: int = typer.Option(
+        1, "--jobs", "-j", min=1, help="Anzahl paralleler Hash-Worker."
+    ),
+    digest: str = typer.Option(
+        DIGEST_CHOICES[0],
+        "--digest",
+        help=f"Digest-Algorithmus ({', '.join(DIGEST_CHOICES)}).",
+    ),
+    action: str = typer.Option(
+        "move",
+        "--action",
+        help="move (nach duplicates/ verschieben), hardlink oder reflink "
+        "(Duplikat an Ort und Stelle durch Link auf den Keeper ersetzen).",
+    ),
+    journal_path: Path = typer.Option(
+        None,
+        "--journal",
+        help="Journal für 'sss resume' (default: User-Cache/sss/journals)",
+    ),
+    stats_flag: bool = typer.Option(
+        False, "--stats", help="Zeiten pro Stufe, Latenzen und Zähler ausgeben"
+    ),
+    stats_json: Path = typer.Option(
+        None, "--stats-json", help="Metriken als JSON schreiben ('-' = stdout)"
+    ),
+    fmt: str = typer.Option(
+        "text", "--format", help="Ausgabeformat: text oder jsonl (ein JSON pro Zeile)"
+    ),
+    quiet: bool = typer.Option(
+        False, "--quiet", "-q", help="Nur die Zusammenfassung ausgeben"
+    ),
+    max_memory: str = typer.Option(
+        None,
+        "--max-memory",
+        help="Speicher begrenzen (z. B. 512M): Einträge auf die Platte "
+        "auslagern und extern sortieren",
+    ),
+    against: Path = typer.Option(
+        None,
+        "--against",
+        help="Nur gegen dieses Archiv prüfen (persistenter Digest-Index)",
+    ),
+    rebuild_index: bool = typer.Option(
+        False, "--rebuild-index", help="Digest-Index des Archivs neu aufbauen"
+    ),
 ) -> None:
     """Findet Duplikate und zeigt einen Dry-Run oder führt die Aktionen aus."""
+    from . import dedupe as dedupe_module
+    from .hashcache import DigestCache
+    from .hashing import ALGORITHMS, HashEngine
+    from .summary import Summary
 
-    actions = dedupe_module.plan_moves(directory)
+    out = _output(fmt, quiet)
+    if digest not in ALGORITHMS:
+        raise typer.BadParameter(
+            f"erlaubt: {', '.join(ALGORITHMS)}", param_hint="--digest"
+        )
+    if action not in dedupe_module.ACTIONS:
+        raise typer.BadParameter(
+            f"erlaubt: {', '.join(dedupe_module.ACTIONS)}", param_hint="--action"
+        )
+    memory_limit = _parse_size(max_memory)
+    if memory_limit is not None and memory_limit <= 0:
+        raise typer.BadParameter("muss größer als 0 sein", param_hint="--max-memory")
+    if against is not None:
+        if memory_limit is not None:
+            raise typer.BadParameter(
+                "nicht zusammen mit --against", param_hint="--max-memory"
+            )
+        if not against.is_dir():
+            typer.echo("Das Archiv wurde nicht gefunden")
+            raise typer.Exit(code=1)
 
+    cache = None
+    if use_cache:
+        cache = DigestCache(cache_path, max_entries=cache_max_entries)
+        if prune_cache:
+            removed = cache.prune(max_entries=cache_max_entries)
+            out.line(f"Cache bereinigt: {removed} Einträge entfernt")
+
+    stats = dedupe_module.DedupeStats()
+    engine = HashEngine(jobs, algorithm=digest)
+    try:
+        if against is not None:
+            from .digestindex import DigestIndex
+
+            with DigestIndex.open(
+                against,
+                algorithm=digest,
+                cache=cache,
+                engine=engine,
+                rebuild=rebuild_index,
+            ) as index:
+                out.line(
+                    f"🗂 Archiv-Index: {len(index)} Dateien "
+                    f"({index.hashed} neu gehasht)"
+                )
+                actions = dedupe_module.plan_against(
+                    directory,
+                    index,
+                    action=action,
+                    cache=cache,
+                    stats=stats,
+                    engine=engine,
+                )
+        else:
+            actions = dedupe_module.plan_directory(
+                directory,
+                action=action,
+                cache=cache,
+                stats=stats,
+                engine=engine,
+                max_memory=memory_limit,
+            )
+    finally:
+        if cache is not None:
+            cache.close()
+    out.summary(stats.render())
+
+    summary = Summary(out_root=directory)
+    summary.stages.merge(stats.stages)
+    summary.files_hashed = stats.full_hashed
+    summary.bytes_read = stats.bytes_read
+    summary.cache_hits = stats.cache_hits
+    summary.latencies.extend(stats.latencies)
+    try:
+        _dedupe_run(dedupe_module, actions, summary, execute, journal_path, out)
+    finally:
+        _emit_stats(summary, stats_flag, stats_json)
+
+
+def _dedupe_run(dedupe_module, actions, summary, execute, journal_path, out) -> None:
     if not actions:
-        typer.echo("Keine doppelten Dateien gefunden.")
+        out.summary("Keine doppelten Dateien gefunden.", summary.to_dict())
         raise typer.Exit(code=0)
 
     if not execute:
         # wie bisher: nur anzeigen
-        typer.echo(f"Dry-Run: {len(actions)} geplante Aktionen")
+        out.summary(f"Dry-Run: {len(actions)} geplante Aktionen")
         for act in actions:
             # act ist DedupAction
-            typer.echo(f"{act.action.upper()} {act.src} -> {act.dst}")
+            out.line(f"{act.action.upper()} {act.src} -> {act.dst}")
+            out.record(
+                "plan", action=act.action, src=act.src, dst=act.dst, reason=act.reason
+            )
+        out.summary(None, summary.to_dict())
         raise typer.Exit(code=0)
 
     # == execute == True ==
-    summary = Summary(out_root=directory)
-    dedupe_module.execute_actions(actions, summary)
+    with summary.stages.measure("move"):
+        with _journal(journal_path, "dedupe", unique=True, out=out) as journal:
+            report = dedupe_module.execute_actions(actions, summary, journal=journal)
+    for src, dst in report.moved:
+        out.record("move", src=src, dst=dst)
+    for keeper, dup in report.linked:
+        out.record("link", src=keeper, dst=dup)
 
     # einfache Erfolgsmeldung – Detailformat kannst du später hübscher machen
+    out.line("Ausführung abgeschlossen.")
+    out.summary(report.render())
+    out.summary(str(summary), summary.to_dict())
+
+
+@app.command()
+def similar(
+    directory: Path,
+    threshold: int = typer.Option(
+        6, "--threshold", "-t", min=0, max=64, help="Max. Hamming-Abstand (Bits)."
+    ),
+    keep: str = typer.Option(
+        "largest", "--keep", help="Keeper: largest, newest, oldest, shortest_path."
+    ),
+    recursive: bool = typer.Option(
+        False, "--recursive", "-r", help="Auch Unterordner durchsuchen"
+    ),
+    jobs: int = typer.Option(
+        1, "--jobs", "-j", min=1, help="Anzahl paralleler Worker."
+    ),
+    execute: bool = typer.Option(
+        False, "--execute", help="Aktionen wirklich ausführen statt nur Dry-Run."
+    ),
+    journal_path: Path = typer.Option(
+        None,
+        "--journal",
+        help="Journal für 'sss resume' (default: User-Cache/sss/journals)",
+    ),
+) -> None:
+    """Findet ähnliche Bilder (z. B. PNG und JPEG desselben Screens)."""
+    from . import dedupe as dedupe_module
+    from .hashing import HashEngine
+    from .output import Output
+    from .similar import find_similar_groups
+    from .summary import Summary
+
+    target_dir = directory / "similar"
+    records = sorted(
+        iter_files(
+            directory,
+            recursive=recursive,
+            extensions=IMAGE_EXTENSIONS,
+            exclude=[target_dir.absolute()],
+        ),
+        key=lambda rec: rec.path,
+    )
+    groups = find_similar_groups(records, threshold=threshold, engine=HashEngine(jobs))
+
+    actions = []
+    for group in groups:
+        try:
+            keeper = dedupe_module.choose_keeper(group, policy=keep)
+        except ValueError as exc:
+            raise typer.BadParameter(str(exc), param_hint="--keep") from None
+        actions.extend(dedupe_module.plan_moves(group, keeper, target_dir=target_dir))
+
+    if not actions:
+        typer.echo("Keine ähnlichen Bilder gefunden.")
+        raise typer.Exit(code=0)
+
+    if not execute:
+        typer.echo(f"Dry-Run: {len(groups)} Gruppen, {len(actions)} geplante Aktionen")
+        for act in actions:
+            typer.echo(f"{act.action.upper()} {act.src} -> {act.dst}  ({act.reason})")
+        raise typer.Exit(code=0)
+
+    summary = Summary(out_root=directory)
+    with _journal(journal_path, "similar", unique=True, out=Output()) as journal:
+        report = dedupe_module.execute_actions(actions, summary, journal=journal)
     typer.echo("Ausführung abgeschlossen.")
+    typer.echo(report.render())
     typer.echo(str(summary))
+
+
+@app.command()
+def watch(
+    path: Path,
+    out_dir: Path = typer.Option(
+        None, "--out-dir", help="Zielbasis (default: <path>/_by_date)"
+    ),
+    dry_run: bool = typer.Option(
+        True, "--dry-run/--no-dry-run", help="Nur simulieren, nichts verschieben"
+    ),
+    initial: bool = typer.Option(
+        True, "--initial/--no-initial", help="Vorhandene Dateien zuerst einsortieren"
+    ),
+    polling: bool = typer.Option(
+        False, "--polling", help="Snapshot-Polling statt inotify erzwingen"
+    ),
+    interval: float = typer.Option(
+        1.0, "--interval", min=0.01, help="Polling-Intervall in Sekunden"
+    ),
+    timeout: float = typer.Option(
+        None,
+        "--timeout",
+        min=0,
+        help="Beenden nach so vielen Sekunden ohne neue Datei (default: nie)",
+    ),
+):
+    """Überwacht einen Ordner und sortiert neue Screenshots sofort ein."""
+    import time
+
+    from .dates import DateResolver
+    from .output import Output
+    from .scanner import FileRecord
+    from .summary import Summary
+    from .watcher import InotifyWatcher, open_watcher
+
+    in_root = Path(path)
+    if not in_root.is_dir():
+        typer.echo("Der Pfad wurde nicht gefunden")
+        raise typer.Exit(code=1)
+
+    out_root = out_dir or (in_root / "_by_date")
+    summary = Summary(out_root=out_root)
+    allocators = {}
+    out = Output()
+    dates = DateResolver()
+
+    # Watcher vor dem Initial-Scan öffnen, damit dazwischen nichts verloren geht
+    with open_watcher(
+        in_root, extensions=IMAGE_EXTENSIONS, interval=interval, polling=polling
+    ) as watcher:
+        mode = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+        typer.echo(f"👀 Überwache {in_root} ({mode}) -> {out_root}")
+
+        if initial:
+            existing = sorted(
+                iter_files(in_root, extensions=IMAGE_EXTENSIONS),
+                key=lambda r: r.mtime_ns,
+            )
+            for record in existing:
+                _sort_record(
+                    record,
+                    out_root,
+                    dry_run=dry_run,
+                    summary=summary,
+                    allocators=allocators,
+                    out=out,
+                    dates=dates,
+                )
+
+        last_event = time.monotonic()
+        try:
+            while True:
+                paths = watcher.poll(timeout)
+                for file_path in paths:
+                    try:
+                        record = FileRecord.from_path(file_path)
+                    except OSError:
+                        continue  # schon weg (z. B. im Initial-Scan verschoben)
+                    _sort_record(
+                        record,
+                        out_root,
+                        dry_run=dry_run,
+                        summary=summary,
+                        allocators=allocators,
+                        out=out,
+                        dates=dates,
+                    )
+                if paths:
+                    last_event = time.monotonic()
+                elif timeout is not None and time.monotonic() - last_event >= timeout:
+                    break
+        except KeyboardInterrupt:
+            pass
+        finally:
+            dates.close()
+
+    typer.echo("\n" + summary.render())
+
+
+@app.command()
+def resume(
+    journal: Path = typer.Argument(
+        None, help="Journal-Datei; ohne Angabe werden offene Journale gelistet"
+    ),
+    rollback: bool = typer.Option(
+        False,
+        "--rollback",
+        help="Offene Aktionen rückgängig machen statt fertigstellen",
+    ),
+):
+    """Setzt einen abgebrochenen scan/dedupe-Lauf anhand seines Journals fort."""
+    from .journal import default_journal_dir, read_journal
+    from .mover import resume_journal
+
+    if journal is None:
+        found = False
+        for path in sorted(default_journal_dir().glob("*.jsonl")):
+            try:
+                state = read_journal(path)
+            except ValueError:
+                continue
+            if not state.complete:
+                found = True
+                typer.echo(f"{path}  ({state.command}, {len(state.pending)} offen)")
+        if not found:
+            typer.echo("Keine offenen Journale.")
+        raise typer.Exit(code=0)
+
+    if not journal.is_file():
+        typer.echo("Das Journal wurde nicht gefunden")
+        raise typer.Exit(code=1)
+    try:
+        state = read_journal(journal)
+    except ValueError as exc:
+        typer.echo(str(exc))
+        raise typer.Exit(code=1) from None
+
+    pending = len(state.pending)
+    if not pending:
+        typer.echo("Nichts zu tun: keine offenen Aktionen.")
+        raise typer.Exit(code=0)
+
+    report = resume_journal(journal, rollback=rollback)
+    verb = "Zurückgerollt" if rollback else "Fertiggestellt"
+    typer.echo(f"{verb}: {len(report.moved)} von {pending} offenen Aktionen")
+    for src, exc in report.errors:
+        typer.echo(f"✗ Fehler: {src}: {exc}")
+    if report.errors:
+        raise typer.Exit(code=1)
+
+
+_SIZE_UNITS = {"": 1, "K": 1024, "M": 1024**2, "G": 1024**3, "T": 1024**4}
+
+
+def _parse_size(value: str | None) -> int | None:
+    """'5MB', '5M', '1.5G', '4096' -> Bytes (Einheiten zur Basis 1024)."""
+    if value is None:
+        return None
+    text = value.strip().upper().removesuffix("IB").removesuffix("B")
+    unit = text[-1:] if text[-1:] in _SIZE_UNITS else ""
+    try:
+        number = float(text[: len(text) - len(unit)])
+    except ValueError:
+        raise typer.BadParameter(f"ungültige Größe: {value!r}") from None
+    if number < 0:
+        raise typer.BadParameter(f"ungültige Größe: {value!r}")
+    return int(number * _SIZE_UNITS[unit])
+
+
+@app.command()
+def index(
+    path: Path,
+    catalog_path: Path = typer.Option(
+        None, "--catalog", help="Katalog-Datei (default: User-Cache/sss)"
+    ),
+    recursive: bool = typer.Option(
+        True, "--recursive/--no-recursive", help="Auch Unterordner aufnehmen"
+    ),
+    exclude: list[str] = typer.Option(
+        [], "--exclude", help="Ordnername oder -pfad überspringen (mehrfach möglich)"
+    ),
+    all_files: bool = typer.Option(
+        False, "--all-files", help="Alle Dateien statt nur PNG/JPEG aufnehmen"
+    ),
+    jobs: int = typer.Option(
+        1, "--jobs", "-j", min=1, help="Anzahl paralleler Lese-Worker."
+    ),
+):
+    """Nimmt einen Ordner in den Metadaten-Katalog auf (inkrementell)."""
+    from .catalog import Catalog
+
+    if not path.is_dir():
+        typer.echo("Der Pfad wurde nicht gefunden")
+        raise typer.Exit(code=1)
+
+    records = iter_files(
+        path,
+        recursive=recursive,
+        extensions=None if all_files else IMAGE_EXTENSIONS,
+        exclude=exclude,
+    )
+    with Catalog(catalog_path) as catalog:
+        report = catalog.update(records, root=path, jobs=jobs)
+        typer.echo(report.render())
+        typer.echo(f"Katalog: {catalog.path} ({len(catalog)} Dateien)")
+
+
+@app.command()
+def query(
+    catalog_path: Path = typer.Option(
+        None, "--catalog", help="Katalog-Datei (default: User-Cache/sss)"
+    ),
+    ext: str = typer.Option(None, "--ext", help="Endung, z. B. png"),
+    resolution: str = typer.Option(
+        None, "--resolution", help="Auflösung BREITExHÖHE, z. B. 2560x1440"
+    ),
+    year: int = typer.Option(None, "--year", help="Jahr der Änderungszeit"),
+    min_size: str = typer.Option(None, "--min-size", help="Mindestgröße, z. B. 5MB"),
+    max_size: str = typer.Option(None, "--max-size", help="Höchstgröße, z. B. 1G"),
+    under: Path = typer.Option(None, "--under", help="Nur unterhalb dieses Ordners"),
+    digest: str = typer.Option(None, "--digest", help="Nur Dateien mit diesem Digest"),
+    duplicates: bool = typer.Option(
+        False, "--duplicates", help="Nur Dateien, die sich einen Digest teilen"
+    ),
+    limit: int = typer.Option(None, "--limit", min=1, help="Höchstens so viele"),
+    fmt: str = typer.Option(
+        "text", "--format", help="Ausgabeformat: text oder jsonl (ein JSON pro Zeile)"
+    ),
+    quiet: bool = typer.Option(
+        False, "--quiet", "-q", help="Nur die Zusammenfassung ausgeben"
+    ),
+):
+    """Durchsucht den Metadaten-Katalog, ohne die Dateien anzufassen."""
+    import time
+
+    from .catalog import Catalog
+
+    out = _output(fmt, quiet)
+    width = height = None
+    if resolution is not None:
+        try:
+            width, height = (int(v) for v in resolution.lower().split("x"))
+        except ValueError:
+            raise typer.BadParameter(
+                "erwartet BREITExHÖHE, z. B. 2560x1440", param_hint="--resolution"
+            ) from None
+
+    start = time.perf_counter()
+    count = 0
+    group = None
+    with Catalog(catalog_path) as catalog:
+        for entry in catalog.query(
+            ext=ext,
+            width=width,
+            height=height,
+            min_size=_parse_size(min_size),
+            max_size=_parse_size(max_size),
+            year=year,
+            under=under,
+            digest=digest,
+            duplicates=duplicates,
+            limit=limit,
+        ):
+            count += 1
+            if duplicates and entry.digest != group:
+                group = entry.digest
+                out.line(f"== {group} ==")
+            if out.lines:
+                dims = f"{entry.width}x{entry.height}, " if entry.width else ""
+                date = datetime.fromtimestamp(entry.mtime).strftime("%d.%m.%Y")
+                out.line(
+                    f"{entry.path}  ({dims}{entry.size / (1024 * 1024):.2f} MB, "
+                    f"{date})"
+                )
+            out.record("file", **entry.to_dict())
+    ms = (time.perf_counter() - start) * 1000
+    out.summary(f"{count} Treffer ({ms:.1f} ms)", {"count": count, "ms": ms})
+
+
+if __name__ == "__main__":
+    import sys
+
+    sys.exit(app())
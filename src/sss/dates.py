@@ -0,0 +1,544 @@
+"""Aufnahmedatum eines Screenshots für die Zielordner von scan.
+
+Die mtime stimmt nach jedem Kopieren nicht mehr. Deshalb wird in dieser
+Reihenfolge gesucht:
+
+1. Datei-Kopf (nur die ersten HEAD_BYTES, kein Pillow):
+   JPEG EXIF DateTimeOriginal/DateTimeDigitized/DateTime, bei PNG ein
+   eXIf-Chunk, ein tEXt/iTXt "Creation Time" oder der tIME-Chunk
+2. Dateiname, z. B. "Screenshot 2024-05-03 at 10.22.11",
+   "Bildschirmfoto vom 2024-05-03 10-22-11", "Screenshot_20240503-102211"
+3. mtime
+
+Alle Zeiten sind naive lokale Zeiten (wie datetime.fromtimestamp); nur
+tIME ist laut PNG-Spezifikation UTC und wird umgerechnet.
+
+Das Modul wird von mover beim Start von scan geladen und importiert daher
+nichts Schweres. Auch der persistente Cache (DateCache) kommt ohne SQLite
+aus: eine sortierte Datei fester Satzlänge, per mmap durchsucht, plus
+kleine Delta-Dateien mit den Einträgen der letzten Läufe.
+"""
+
+import heapq
+import itertools
+import mmap
+import os
+import re
+import struct
+import time
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .cachedir import default_cache_dir
+
+if TYPE_CHECKING:
+    from .scanner import FileRecord
+
+HEAD_BYTES = 64 * 1024
+
+# Obergrenze für DateCache; darüber wird die Datei mit den Einträgen des
+# aktuellen Laufs neu begonnen (veraltete Einträge sammeln sich sonst an).
+MAX_DATE_ENTRIES = 2_000_000
+
+# Neue Einträge landen in Delta-Dateien neben dates.bin. Die sortierte
+# Hauptdatei wird erst ab DATE_DELTA_MAX Delta-Einträgen neu geschrieben;
+# ab DATE_DELTA_FILES Delta-Dateien werden diese zu einer zusammengefasst.
+DATE_DELTA_MAX = 50_000
+DATE_DELTA_FILES = 16
+
+# Plausibler Bereich, damit z. B. "IMG_00000000" nicht als Datum gilt
+_MIN_YEAR, _MAX_YEAR = 1990, 2100
+
+_EXIF_FORMAT = "%Y:%m:%d %H:%M:%S"
+_TAG_EXIF_IFD = 0x8769
+_TAG_DATETIME = 0x0132
+_TAGS_ORIGINAL = (0x9003, 0x9004)  # DateTimeOriginal, DateTimeDigitized
+
+_FILENAME_PATTERNS = (
+    # 2024-05-03 at 10.22.11 (PM), 2024-05-03 um 10.22.11, 2024-05-03_10-22-11,
+    # 2024-05-03 102211 (Windows), 2024-05-03 (nur Datum)
+    re.compile(
+        r"""
+        (?<!\d) (?P<y>\d{4}) [-_.] (?P<mo>\d{2}) [-_.] (?P<d>\d{2})
+        (?:
+            [\sT_.-]+ (?:at\s+|um\s+)?
+            (?:
+                (?P<h>\d{1,2}) [.:-] (?P<mi>\d{2}) [.:-] (?P<s>\d{2})
+                | (?P<h2>\d{2}) (?P<mi2>\d{2}) (?P<s2>\d{2})
+            )
+            (?:\s?(?P<ampm>[AaPp][Mm]))?
+        )?
+        (?!\d)
+        """,
+        re.VERBOSE,
+    ),
+    # 20240503-102211, 20240503_102211, 20240503102211
+    re.compile(
+        r"(?<!\d)(?P<y>\d{4})(?P<mo>\d{2})(?P<d>\d{2})[\sT_-]?"
+        r"(?P<h>\d{2})(?P<mi>\d{2})(?P<s>\d{2})(?!\d)"
+    ),
+)
+
+
+# -- Datei-Kopf ----------------------------------------------------------
+
+
+def _exif_text(value: bytes) -> datetime | None:
+    try:
+        return datetime.strptime(
+            value.split(b"\0", 1)[0].strip().decode("ascii"), _EXIF_FORMAT
+        )
+    except (UnicodeDecodeError, ValueError):  # z. B. "0000:00:00 00:00:00"
+        return None
+
+
+def _ifd(tiff: bytes, offset: int, order: str) -> dict[int, tuple[int, int, bytes]]:
+    """Einträge eines TIFF-IFD: tag -> (typ, anzahl, 4 Byte Wert/Offset)."""
+    entries = {}
+    if offset + 2 > len(tiff):
+        return entries
+    (count,) = struct.unpack_from(order + "H", tiff, offset)
+    for i in range(count):
+        pos = offset + 2 + 12 * i
+        if pos + 12 > len(tiff):
+            break
+        tag, typ, n = struct.unpack_from(order + "HHI", tiff, pos)
+        entries[tag] = (typ, n, tiff[pos + 8 : pos + 12])
+    return entries
+
+
+def _ascii(tiff: bytes, order: str, entry: tuple[int, int, bytes]) -> bytes:
+    typ, n, raw = entry
+    if typ != 2:  # ASCII
+        return b""
+    if n <= 4:
+        return raw[:n]
+    (offset,) = struct.unpack(order + "I", raw)
+    return tiff[offset : offset + n]
+
+
+def exif_date(tiff: bytes) -> datetime | None:
+    """DateTimeOriginal (sonst -Digitized, sonst DateTime) aus einem TIFF-Block."""
+    if tiff[:4] == b"II*\0":
+        order = "<"
+    elif tiff[:4] == b"MM\0*":
+        order = ">"
+    else:
+        return None
+    (ifd0_offset,) = struct.unpack_from(order + "I", tiff, 4)
+    ifd0 = _ifd(tiff, ifd0_offset, order)
+    pointer = ifd0.get(_TAG_EXIF_IFD)
+    if pointer is not None:
+        (exif_offset,) = struct.unpack(order + "I", pointer[2])
+        sub = _ifd(tiff, exif_offset, order)
+        for tag in _TAGS_ORIGINAL:
+            if tag in sub and (dt := _exif_text(_ascii(tiff, order, sub[tag]))):
+                return dt
+    if _TAG_DATETIME in ifd0:
+        return _exif_text(_ascii(tiff, order, ifd0[_TAG_DATETIME]))
+    return None
+
+
+def _jpeg_date(head: bytes) -> datetime | None:
+    pos = 2
+    while pos + 4 <= len(head):
+        if head[pos] != 0xFF:
+            return None
+        marker = head[pos + 1]
+        if marker == 0xFF:  # Füllbyte
+            pos += 1
+            continue
+        if marker == 0xD8 or 0xD0 <= marker <= 0xD7:
+            pos += 2
+            continue
+        if marker in (0xDA, 0xD9):  # Bilddaten: danach kein EXIF mehr
+            return None
+        (length,) = struct.unpack_from(">H", head, pos + 2)
+        if marker == 0xE1 and head[pos + 4 : pos + 10] == b"Exif\0\0":
+            return exif_date(head[pos + 10 : pos + 2 + length])
+        pos += 2 + length
+    return None
+
+
+def _text_date(text: str) -> datetime | None:
+    text = text.strip()
+    for parse in (
+        datetime.fromisoformat,
+        lambda t: datetime.strptime(t, _EXIF_FORMAT),
+    ):
+        try:
+            dt = parse(text)
+        except ValueError:
+            continue
+        return _local(dt) if dt.tzinfo else dt
+    try:  # RFC 1123, von der PNG-Spezifikation empfohlen
+        from email.utils import parsedate_to_datetime
+
+        dt = parsedate_to_datetime(text)
+    except (TypeError, ValueError, IndexError):
+        return None
+    return _local(dt) if dt.tzinfo else dt
+
+
+def _local(dt: datetime) -> datetime:
+    return dt.astimezone().replace(tzinfo=None)
+
+
+def _png_date(head: bytes) -> datetime | None:
+    found: dict[str, datetime] = {}
+    pos = 8
+    while pos + 8 <= len(head):
+        length, ctype = struct.unpack_from(">I4s", head, pos)
+        data = head[pos + 8 : pos + 8 + length]
+        if len(data) < length:
+            break  # Chunk reicht über den gelesenen Kopf hinaus
+        if ctype == b"eXIf":
+            if dt := exif_date(data):
+                return dt  # genauer als alles andere
+        elif ctype == b"tEXt" or ctype == b"iTXt":
+            key, _, text = data.partition(b"\0")
+            encoding = "latin-1"
+            if ctype == b"iTXt":
+                # Kompressions-Flag/-Methode, Sprache\0, Übersetzung\0, Text
+                compressed = text[:1] != b"\0"
+                text = b"" if compressed else text[2:].split(b"\0", 2)[-1]
+                encoding = "utf-8"
+            if key == b"Creation Time" and text:
+                dt = _text_date(text.decode(encoding, "replace"))
+                if dt is not None:
+                    found.setdefault("text", dt)
+        elif ctype == b"tIME" and length == 7:
+            try:
+                dt = datetime(*struct.unpack(">HBBBBB", data), tzinfo=timezone.utc)
+            except ValueError:
+                pass
+            else:
+                found.setdefault("time", _local(dt))
+        elif ctype == b"IEND":
+            break
+        pos += 12 + length
+    return found.get("text") or found.get("time")
+
+
+def header_date(head: bytes) -> datetime | None:
+    """Aufnahmedatum aus den ersten Bytes einer PNG- oder JPEG-Datei."""
+    try:
+        if head.startswith(b"\x89PNG\r\n\x1a\n"):
+            dt = _png_date(head)
+        elif head.startswith(b"\xff\xd8"):
+            dt = _jpeg_date(head)
+        else:
+            return None
+    except struct.error:  # abgeschnittene oder kaputte Strukturen
+        return None
+    if dt is None or not _MIN_YEAR <= dt.year <= _MAX_YEAR:
+        return None
+    return dt
+
+
+# -- Dateiname -----------------------------------------------------------
+
+
+def filename_date(name: str) -> datetime | None:
+    """Datum/Uhrzeit aus typischen Screenshot-Dateinamen."""
+    for pattern in _FILENAME_PATTERNS:
+        for m in pattern.finditer(name):
+            g = m.groupdict()
+            hour = g.get("h") or g.get("h2")
+            minute = g.get("mi") or g.get("mi2")
+            second = g.get("s") or g.get("s2")
+            try:
+                h = int(hour) if hour else 0
+                if g.get("ampm"):
+                    h = h % 12 + (12 if g["ampm"].lower() == "pm" else 0)
+                dt = datetime(
+                    int(g["y"]),
+                    int(g["mo"]),
+                    int(g["d"]),
+                    h,
+                    int(minute) if minute else 0,
+                    int(second) if second else 0,
+                )
+            except ValueError:
+                continue
+            if _MIN_YEAR <= dt.year <= _MAX_YEAR:
+                return dt
+    return None
+
+
+# -- Auflösung -----------------------------------------------------------
+
+
+def resolve_capture_date(path: Path | str, mtime: float) -> tuple[datetime, str]:
+    """Liefert (datum, quelle) mit quelle in "header", "filename", "mtime"."""
+    try:
+        with open(path, "rb") as f:
+            head = f.read(HEAD_BYTES)
+    except OSError:
+        head = b""
+    if (dt := header_date(head)) is not None:
+        return dt, "header"
+    if (dt := filename_date(os.path.basename(path))) is not None:
+        return dt, "filename"
+    return datetime.fromtimestamp(mtime), "mtime"
+
+
+def capture_date(file: "Path | FileRecord") -> datetime:
+    """Aufnahmedatum ohne Cache (ein Kopf-Lesezugriff pro Aufruf)."""
+    path, mtime = _path_mtime(file)
+    return resolve_capture_date(path, mtime)[0]
+
+
+def _path_mtime(file: "Path | FileRecord") -> tuple[Path, float]:
+    if isinstance(file, Path | str):
+        return Path(file), os.stat(file).st_mtime
+    return file.path, file.mtime
+
+
+# -- Cache ---------------------------------------------------------------
+
+_DATE_MAGIC = b"SSSDATE1"
+# (dev, ino, size, mtime_ns, crc32 des Pfads) -> Mikrosekunden seit 1970
+_DATE_KEY = struct.Struct(">QQQqI")
+_DATE_VALUE = struct.Struct(">q")
+_DATE_RECORD = _DATE_KEY.size + _DATE_VALUE.size
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+_delta_ids = itertools.count()
+
+
+def default_date_cache_path() -> Path:
+    return default_cache_dir() / "dates.bin"
+
+
+class DateCache:
+    """
+    Aufnahmedaten pro Datei und Stat-Signatur, getrennt vom Digest-Cache
+    (dessen LRU-Grenze und --prune-cache betreffen sie also nicht).
+
+    Die Datei ist nach Schlüssel sortiert und wird beim ersten lookup() per
+    mmap geöffnet und binär durchsucht, ohne sie zu laden. Neue Einträge
+    sammeln sich im Speicher; close() schreibt sie als eigene Delta-Datei
+    (<name>.delta-*, wie digestindex seine pending-Dateien), die der
+    nächste Lauf komplett einliest. Die Hauptdatei wird nur neu geschrieben,
+    wenn die Deltas zusammen DATE_DELTA_MAX Einträge übersteigen; gelöscht
+    werden dabei nur die gelesenen Delta-Dateien. Eine unlesbare oder
+    fremde Datei gilt als leer.
+    """
+
+    def __init__(
+        self, path: Path | str | None = None, *, max_entries: int = MAX_DATE_ENTRIES
+    ):
+        self.path = Path(path) if path is not None else default_date_cache_path()
+        self.max_entries = max_entries
+        self._map: mmap.mmap | None = None
+        self._count = 0
+        self._opened = False
+        self._new: dict[bytes, bytes] = {}
+        self._delta: dict[bytes, bytes] = {}
+        self._delta_files: list[Path] = []
+
+    @staticmethod
+    def key(record: "FileRecord") -> bytes:
+        path = os.fsencode(os.path.abspath(record.path))
+        # Windows: dev/ino sind je nach Herkunft des FileRecord 0 oder echt
+        # (siehe scanner.FileRecord); der Pfad-Anteil trennt die Dateien
+        dev, ino = (0, 0) if os.name == "nt" else (record.dev, record.ino)
+        return _DATE_KEY.pack(dev, ino, record.size, record.mtime_ns, zlib.crc32(path))
+
+    def _open(self) -> None:
+        self._opened = True
+        self._read_deltas()
+        try:
+            f = open(self.path, "rb")
+        except OSError:
+            return
+        with f:
+            size = os.fstat(f.fileno()).st_size
+            body = size - len(_DATE_MAGIC)
+            if body <= 0 or body % _DATE_RECORD or f.read(8) != _DATE_MAGIC:
+                return
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._count = body // _DATE_RECORD
+
+    def _read_deltas(self) -> None:
+        prefix = f"{self.path.name}.delta-"
+        try:
+            with os.scandir(self.path.parent) as it:
+                names = sorted(
+                    e.name
+                    for e in it
+                    if e.name.startswith(prefix) and not e.name.endswith(".tmp")
+                )
+        except OSError:
+            return
+        n = _DATE_KEY.size
+        for name in names:
+            path = self.path.parent / name
+            try:
+                data = path.read_bytes()
+            except OSError:
+                continue
+            self._delta_files.append(path)
+            body = len(data) - len(_DATE_MAGIC)
+            if body < 0 or body % _DATE_RECORD or data[:8] != _DATE_MAGIC:
+                continue  # wird beim nächsten Zusammenfassen mit gelöscht
+            for pos in range(len(_DATE_MAGIC), len(data), _DATE_RECORD):
+                self._delta[data[pos : pos + n]] = data[pos + n : pos + _DATE_RECORD]
+
+    def lookup(self, key: bytes) -> datetime | None:
+        if not self._opened:
+            self._open()
+        value = self._new.get(key)
+        if value is None:
+            value = self._delta.get(key)
+        if value is None and self._map is not None:
+            value = self._search(key)
+        if value is None:
+            return None
+        return _EPOCH + _MICROSECOND * _DATE_VALUE.unpack(value)[0]
+
+    def _search(self, key: bytes) -> bytes | None:
+        data, n = self._map, _DATE_KEY.size
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            pos = len(_DATE_MAGIC) + mid * _DATE_RECORD
+            probe = data[pos : pos + n]
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return data[pos + n : pos + _DATE_RECORD]
+        return None
+
+    def store(self, key: bytes, dt: datetime) -> None:
+        self._new[key] = _DATE_VALUE.pack((dt - _EPOCH) // _MICROSECOND)
+
+    def __len__(self) -> int:
+        if not self._opened:
+            self._open()
+        added = self._delta.keys() | self._new.keys()
+        if self._map is not None:
+            added = {k for k in added if self._search(k) is None}
+        return self._count + len(added)
+
+    def _existing(self):
+        data = self._map
+        for i in range(self._count):
+            pos = len(_DATE_MAGIC) + i * _DATE_RECORD
+            yield data[pos : pos + _DATE_RECORD]
+
+    def close(self) -> None:
+        """Schreibt neue Einträge (falls vorhanden) und gibt die Datei frei."""
+        try:
+            if self._new:
+                self._flush()
+        finally:
+            if self._map is not None:
+                self._map.close()
+            self._map, self._count, self._opened = None, 0, False
+            self._new, self._delta, self._delta_files = {}, {}, []
+
+    def _flush(self) -> None:
+        if not self._opened:
+            self._open()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        read = self._delta_files
+        if len(self._delta) + len(self._new) > DATE_DELTA_MAX:
+            self._merge()
+        elif len(read) >= DATE_DELTA_FILES:
+            # viele kleine Deltas zu einem zusammenfassen
+            self._write_delta({**self._delta, **self._new})
+        else:
+            self._write_delta(self._new)
+            return
+        for path in read:
+            path.unlink(missing_ok=True)
+
+    def _write_delta(self, entries: dict[bytes, bytes]) -> None:
+        name = f"{self.path.name}.delta-{time.time_ns()}-{os.getpid()}"
+        path = self.path.with_name(f"{name}-{next(_delta_ids)}")
+        tmp = path.with_name(f"{path.name}.tmp")
+        with open(tmp, "wb") as f:
+            f.write(_DATE_MAGIC)
+            f.writelines(k + v for k, v in entries.items())
+        os.replace(tmp, path)
+
+    def _merge(self) -> None:
+        new = sorted(k + v for k, v in {**self._delta, **self._new}.items())
+        old = self._existing()
+        if self._count + len(new) > self.max_entries:
+            old = iter(())
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        last = None
+        with open(tmp, "wb") as f:
+            f.write(_DATE_MAGIC)
+            # bei gleichem Schlüssel gewinnt der neue Eintrag (merge ist stabil)
+            for rec in heapq.merge(new, old, key=lambda r: r[: _DATE_KEY.size]):
+                key = rec[: _DATE_KEY.size]
+                if key != last:
+                    f.write(rec)
+                    last = key
+        # unter Windows lässt sich eine gemappte Datei nicht ersetzen
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        os.replace(tmp, self.path)
+
+    def __enter__(self) -> "DateCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class DateResolver:
+    """
+    Aufnahmedaten mit persistentem Cache (DateCache), damit ein erneuter
+    scan die Köpfe nicht noch einmal liest – ab der ersten Datei.
+
+    - cache_path: Datei des DateCache (default: User-Cache/sss/dates.bin)
+    - use_cache: False = nie einen Cache öffnen
+
+    Mit `with` benutzen oder close() aufrufen, damit alles geschrieben wird.
+    """
+
+    def __init__(self, cache_path: Path | str | None = None, *, use_cache: bool = True):
+        self.cache_path = cache_path
+        self.use_cache = use_cache
+        self.hits = 0
+        self.reads = 0
+        self._cache = DateCache(cache_path) if use_cache else None
+
+    def __call__(self, file: "Path | FileRecord") -> datetime:
+        if isinstance(file, Path | str):
+            from .scanner import FileRecord
+
+            file = FileRecord.from_path(file)
+        cache = self._cache
+        if cache is not None:
+            key = cache.key(file)
+            cached = cache.lookup(key)
+            if cached is not None:
+                self.hits += 1
+                return cached
+
+        dt, _source = resolve_capture_date(file.path, file.mtime)
+        self.reads += 1
+        if cache is not None:
+            cache.store(key, dt)
+        return dt
+
+    def close(self) -> None:
+        if self._cache is not None:
+            self._cache.close()
+
+    def __enter__(self) -> "DateResolver":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
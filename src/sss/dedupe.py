@@ -1,145 +1,884 @@
+from array import array
+from collections.abc import Iterable, Iterator
+from operator import itemgetter
 from pathlib import Path
-import hashlib
-from dataclasses import dataclass
+import itertools
+import os
+import stat
+import tempfile
+import time
+from dataclasses import dataclass, field
 from collections import defaultdict
 from typing import Literal
 
+from . import mover
+from .hashcache import DigestCache
+from .mover import MoveReport
+from .pathtable import PathTable
+from .summary import StageTimes
+from .scanner import FileRecord, iter_files
+from .hashing import DEFAULT_ALGORITHM, HashEngine, file_digest, new_hasher
 
-def compute_sha256(path: Path, *, chunk_size: int = 1 << 20) -> str:
+
+def compute_sha256(
+    path: Path,
+    *,
+    chunk_size: int = 1 << 20,
+    cache: DigestCache | None = None,
+    st: os.stat_result | None = None,
+    algorithm: str = DEFAULT_ALGORITHM,
+) -> str:
     """
-    Berechnet den SHA-256-Hash einer Datei und gibt ihn als 64-stelligen Hex-String zurück.
+    Berechnet den Hash einer Datei (Default SHA-256) als 64-stelligen Hex-String.
     - chunk_size: in Bytes (Default ~1 MB) -> ermöglicht hashing großer Dateien ohne viel RAM.
+    - cache: optionaler DigestCache; bei passender Stat-Signatur wird nicht gelesen.
+    - st: bereits vorhandenes stat-Ergebnis (spart einen Syscall).
+    - algorithm: "sha256" (Default), "blake2b" oder "blake2s" (siehe hashing.ALGORITHMS)
     """
     if chunk_size <= 0:
         raise ValueError("chunk_size must be > 0")
 
-    h = hashlib.sha256()
-    with path.open("rb") as f:
-        # Datei stückweise lesen, bis read() b"" liefert (EOF).
-        for chunk in iter(lambda: f.read(chunk_size), b""):
-            h.update(chunk)
+    path = path if isinstance(path, Path) else Path(path)
+    if cache is not None:
+        st = st or path.stat()
+        cached = cache.lookup(path, st, algorithm)
+        if cached is not None:
+            return cached
 
-    return h.hexdigest()  # lowercase 64-hex
+    # Datei stückweise in einen wiederverwendeten Puffer lesen (bzw. mmap)
+    digest = file_digest(path, algorithm, chunk_size=chunk_size)  # lowercase 64-hex
+    if cache is not None:
+        cache.store(path, st, digest, algorithm)
+    return digest
+
+
+def _raw_digest(digest: str | bytes) -> str | bytes:
+    """Hex-Digest als Bytes, wenn das verlustfrei umkehrbar ist; sonst unverändert."""
+    if isinstance(digest, bytes):
+        return digest
+    try:
+        raw = bytes.fromhex(digest)
+    except ValueError:
+        return digest
+    return raw if raw.hex() == digest else digest
 
 
-@dataclass
 class DuplicateGroup:
-    """Repräsentiert eine Gruppe von Dateien mit identischem Inhalt."""
+    """
+    Repräsentiert eine Gruppe von Dateien mit identischem Inhalt.
+
+    - size: Dateigröße in Bytes
+    - digest: Hex-Digest (Algorithmus siehe algorithm); mind. 2 files
+    - records: Stat-Daten aus find_duplicate_groups (gleiche Reihenfolge wie
+      files); choose_keeper braucht damit keinen weiteren stat-Aufruf.
+      Werden records übergeben, kommen die Pfade aus ihnen (files entfällt).
+
+    Intern kompakt, weil Gruppen bei Millionen Dateien den Speicher
+    dominieren: der Digest als rohe Bytes, Pfade und Stat-Daten als
+    zusammenhängender Bereich einer (mit anderen Gruppen geteilten)
+    PathTable. Hex-String, Path- und FileRecord-Objekte entstehen erst
+    beim Zugriff auf digest, files bzw. records.
+
+    - Digests, die kein kleingeschriebenes Hex sind (eigene Algorithmen,
+      Test-Attrappen), bleiben als Text in raw_digest.
+    - files und records sind Tupel, append/remove schlagen also laut fehl.
+      Geändert wird nur durch Zuweisen (group.files = [...]); Stat-Daten
+      bereits enthaltener Pfade bleiben.
+    """
+
+    __slots__ = ("size", "algorithm", "raw_digest", "_table", "_first", "_count")
+
+    def __init__(
+        self,
+        size: int,
+        digest: str | bytes,
+        files: Iterable[Path | str] = (),
+        algorithm: str = DEFAULT_ALGORITHM,
+        records: Iterable[FileRecord] = (),
+        *,
+        table: PathTable | None = None,
+    ):
+        self.size = size
+        self.algorithm = algorithm
+        self.raw_digest = _raw_digest(digest)
+        self._table = table if table is not None else PathTable()
+        # files und records beschreiben dieselben Dateien
+        self._fill(files, list(records))
+
+    def _fill(self, files: Iterable[Path | str], records: list[FileRecord]) -> None:
+        """Legt die Dateien als neuen Bereich am Ende der Tabelle ab."""
+        self._first = len(self._table)
+        if records:
+            for rec in records:
+                self._table.add_record(
+                    rec.path, rec.size, rec.mtime_ns, rec.ino, rec.dev
+                )
+            self._count = len(records)
+        else:
+            for path in files:
+                self._table.add(path)
+            # negativ: ohne Stat-Daten, records ist dann leer
+            self._count = self._first - len(self._table)
+
+    @property
+    def digest(self) -> str:
+        raw = self.raw_digest
+        return raw.hex() if isinstance(raw, bytes) else raw
+
+    @property
+    def files(self) -> tuple[Path, ...]:
+        return tuple(self._table[i] for i in self._range())
+
+    @files.setter
+    def files(self, paths: Iterable[Path | str]) -> None:
+        known = {rec.path: rec for rec in self.records}
+        paths = [p if isinstance(p, Path) else Path(p) for p in paths]
+        records = [known.get(p) for p in paths]
+        # der alte Bereich bleibt ungenutzt in der (geteilten) Tabelle
+        self._fill(paths, records if None not in records else [])
+
+    @property
+    def records(self) -> tuple[FileRecord, ...]:
+        if self._count < 0:
+            return ()
+        return tuple(self._table.record(i) for i in self._range())
+
+    def _range(self) -> range:
+        return range(self._first, self._first + abs(self._count))
+
+    def __len__(self) -> int:
+        return abs(self._count)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, DuplicateGroup):
+            return NotImplemented
+        return (self.size, self.raw_digest, self.algorithm, self.files) == (
+            other.size,
+            other.raw_digest,
+            other.algorithm,
+            other.files,
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"DuplicateGroup(size={self.size}, digest={self.digest!r}, "
+            f"files={self.files!r}, algorithm={self.algorithm!r})"
+        )
+
+
+@dataclass(slots=True)
+class DedupeStats:
+    """Zähler pro Stufe von find_duplicate_groups (Größe -> Teil-Hash -> Voll-Hash)."""
+
+    files_seen: int = 0  # reguläre Dateien insgesamt
+    size_candidates: int = 0  # Dateien in Größen-Buckets mit >= 2 Einträgen
+    partial_hashed: int = 0  # Dateien mit Teil-Hash (Anfang + Ende)
+    partial_unique: int = 0  # durch den Teil-Hash aussortiert
+    partial_cached: int = 0  # Teil-Hash aus dem DigestCache
+    cache_hits: int = 0  # Voll-Digest aus dem DigestCache
+    full_hashed: int = 0  # wirklich vollständig gelesen
+    bytes_read: int = 0
+    # nur iter_duplicate_groups_external: ausgelagerte Läufe und Bytes
+    spilled_runs: int = 0
+    spilled_bytes: int = 0
+    stages: StageTimes = field(default_factory=StageTimes, compare=False)
+    latencies: array = field(default_factory=lambda: array("d"), compare=False)
+
+    @property
+    def full_reads_avoided(self) -> int:
+        """Kandidaten, die nicht vollständig gelesen werden mussten."""
+        return self.size_candidates - self.full_hashed
+
+    def render(self) -> str:
+        spill = ""
+        if self.spilled_runs:
+            spill = (
+                f" | ausgelagert={self.spilled_runs} läufe, "
+                f"{self.spilled_bytes / (1024 * 1024):.2f} MB"
+            )
+        return (
+            f"Stufen: dateien={self.files_seen} | "
+            f"größen-kandidaten={self.size_candidates} | "
+            f"teil-hash={self.partial_hashed} (cache={self.partial_cached}, "
+            f"aussortiert={self.partial_unique}) | "
+            f"cache={self.cache_hits} | voll-hash={self.full_hashed} | "
+            f"vermieden={self.full_reads_avoided} | "
+            f"gelesen={self.bytes_read / (1024 * 1024):.2f} MB{spill}"
+        )
+
+    def __str__(self) -> str:
+        return self.render()
 
-    size: int  # Dateigröße in Bytes
-    digest: str  # SHA-256 Hash
-    files: list[Path]  # Liste der Pfade (mind. 2)
 
+# Größe des Blocks, der am Anfang und am Ende für den Teil-Hash gelesen wird.
+PARTIAL_BLOCK = 64 * 1024
 
-def find_duplicate_groups(paths: list[Path]) -> list[DuplicateGroup]:
+
+def compute_partial_digest(
+    path: Path,
+    size: int,
+    *,
+    block: int = PARTIAL_BLOCK,
+    algorithm: str = DEFAULT_ALGORITHM,
+) -> str:
+    """
+    Hash über die ersten und letzten `block` Bytes einer Datei.
+    Nur innerhalb eines Größen-Buckets vergleichbar (size geht nicht ein).
+    """
+    h = new_hasher(algorithm)
+    with path.open("rb") as f:
+        h.update(f.read(block))
+        if size > block:
+            f.seek(max(block, size - block))
+            h.update(f.read(block))
+    return h.hexdigest()
+
+
+def partial_algorithm(algorithm: str) -> str:
+    """Schlüssel, unter dem Teil-Hashes im DigestCache stehen."""
+    return f"{algorithm}-partial"
+
+
+def find_duplicate_groups(
+    paths: list[Path | FileRecord],
+    *,
+    cache: DigestCache | None = None,
+    stats: DedupeStats | None = None,
+    engine: HashEngine | None = None,
+) -> list[DuplicateGroup]:
     """
-    Findet Duplikate auf Byte-Ebene:
+    Findet Duplikate auf Byte-Ebene in drei Stufen:
     - Vorfilter: nach Dateigröße gruppieren
-    - Für Größen-Buckets mit >=2 Dateien: SHA-256-Hash berechnen
+    - Für Größen-Buckets mit >=2 Dateien: Teil-Hash über die ersten und
+      letzten 64 KiB (entfällt bei kleinen Dateien und vollständigen Cache-Treffern;
+      steht wie der Voll-Digest im DigestCache, siehe partial_algorithm)
+    - Nur bei Teil-Hash-Kollision: Digest über die ganze Datei
+      (Algorithmus aus engine.algorithm, über den optionalen DigestCache)
     - Dateien mit identischem (size, digest) zu DuplicateGroup bündeln
+
+    paths: Pfade oder FileRecords; für FileRecords wird nicht erneut ge-stat-et.
+    stats: optionales DedupeStats-Objekt, das die Zähler pro Stufe aufnimmt.
+    engine: optionale HashEngine für paralleles Hashing (Default: seriell).
+    Die Reihenfolge der Gruppen hängt nur von der Eingabe ab, nicht von den Workern.
     """
+    if stats is None:
+        stats = DedupeStats()
+    if engine is None:
+        engine = HashEngine()
+    algorithm = engine.algorithm
+    stages = stats.stages
+
     # 1) Leereingabe
     if not paths:
         return []
+    stages.start()
 
     # 2) Nach Größe gruppieren
-    size_buckets: dict[int, list[Path]] = defaultdict(list)
+    size_buckets: dict[int, list[FileRecord]] = defaultdict(list)
     for p in paths:
-        # nur reguläre Dateien berücksichtigen
-        if not isinstance(p, Path):
-
-            p = Path(p)
-        if p.is_file():
-            size_buckets[p.stat().st_size].append(p)
+        if not isinstance(p, FileRecord):
+            # nur reguläre Dateien berücksichtigen (ein stat pro Pfad)
+            try:
+                st = os.stat(p)
+            except OSError:
+                continue
+            if not stat.S_ISREG(st.st_mode):
+                continue
+            p = FileRecord.from_stat(p, st)
+        size_buckets[p.size].append(p)
+        stats.files_seen += 1
+    stages.lap("stat")
 
-    groups: list[DuplicateGroup] = []
-
-    # 3) Nur Buckets mit mindestens 2 Dateien weiterverarbeiten
-    hash_buckets: dict[tuple[int, str], list[Path]] = defaultdict(list)
+    # 3) Nur Buckets mit mindestens 2 Dateien weiterverarbeiten,
+    #    Cache-Treffer vorab (SQLite nur im aufrufenden Thread)
+    cached: dict[Path, str] = {}
+    candidates: list[tuple[int, list[FileRecord], bool]] = []
     for size, files in size_buckets.items():
         if len(files) < 2:
             continue
-        # 4) Hash pro Datei berechnen und nach (size, digest) gruppieren
-        for fp in files:
-            digest = compute_sha256(fp)
-            hash_buckets[(size, digest)].append(fp)
+        stats.size_candidates += len(files)
+
+        hits = 0
+        if cache is not None:
+            for rec in files:
+                digest = cache.lookup(rec.path, rec, algorithm)
+                if digest is not None:
+                    cached[rec.path] = digest
+                    hits += 1
+            stats.cache_hits += hits
 
-    # 5) DuplicateGroup-Objekte erzeugen (nur, wenn >=2 Dateien)
-    for (size, digest), same_files in hash_buckets.items():
-        if len(same_files) >= 2:
-            groups.append(DuplicateGroup(size=size, digest=digest, files=same_files))
+        # Teil-Hash nur, wenn er wirklich Lesezugriffe sparen kann
+        needs_partial = hits < len(files) and size > 2 * PARTIAL_BLOCK
+        candidates.append((size, files, needs_partial))
+    stages.lap("cache")
 
-    # 6) Rückgabe
+    # 4) Teil-Hash aus dem Cache bzw. über die Engine, danach Buckets aufteilen
+    partial_key = partial_algorithm(algorithm)
+    partials: dict[Path, str] = {}
+    partial_jobs: list[tuple[FileRecord, int]] = []
+    for size, files, needs in candidates:
+        if not needs:
+            continue
+        for rec in files:
+            digest = None
+            if cache is not None:
+                digest = cache.lookup(rec.path, rec, partial_key)
+            if digest is None:
+                partial_jobs.append((rec, size))
+            else:
+                partials[rec.path] = digest
+                stats.partial_cached += 1
+    computed = engine.map(
+        lambda job: compute_partial_digest(job[0].path, job[1], algorithm=algorithm),
+        partial_jobs,
+        sizes=[2 * PARTIAL_BLOCK] * len(partial_jobs),
+    )
+    for (rec, _size), digest in zip(partial_jobs, computed):
+        partials[rec.path] = digest
+        if cache is not None:
+            cache.store(rec.path, rec, digest, partial_key)
+    stats.partial_hashed += len(partial_jobs)
+    stats.bytes_read += len(partial_jobs) * 2 * PARTIAL_BLOCK
+
+    full_candidates: list[tuple[int, list[FileRecord]]] = []
+    for size, files, needs in candidates:
+        if needs:
+            sub: dict[str, list[FileRecord]] = defaultdict(list)
+            for entry in files:
+                sub[partials[entry.path]].append(entry)
+            survivors = [
+                e for bucket in sub.values() if len(bucket) >= 2 for e in bucket
+            ]
+            stats.partial_unique += len(files) - len(survivors)
+            files = survivors
+        if files:
+            full_candidates.append((size, files))
+    stages.lap("partial-hash")
+
+    # 5) Voll-Hash über die Engine (Ergebnisse in Eingabereihenfolge)
+    full_jobs = [
+        (rec.path, size)
+        for size, files in full_candidates
+        for rec in files
+        if rec.path not in cached
+    ]
+
+    def full_digest(job: tuple[Path, int]) -> str:
+        start = time.perf_counter()
+        digest = compute_sha256(job[0], algorithm=algorithm)
+        stats.latencies.append(time.perf_counter() - start)
+        return digest
+
+    full_digests = engine.map(
+        full_digest,
+        full_jobs,
+        sizes=[size for _, size in full_jobs],
+    )
+    digests = dict(zip((fp for fp, _ in full_jobs), full_digests))
+    stats.full_hashed += len(full_jobs)
+    stats.bytes_read += sum(size for _, size in full_jobs)
+
+    hash_buckets: dict[tuple[int, str], list[FileRecord]] = defaultdict(list)
+    for size, files in full_candidates:
+        for rec in files:
+            digest = cached.get(rec.path)
+            if digest is None:
+                digest = digests[rec.path]
+                if cache is not None:
+                    cache.store(rec.path, rec, digest, algorithm)
+            hash_buckets[(size, digest)].append(rec)
+    stages.lap("full-hash")
+
+    # 6) DuplicateGroup-Objekte erzeugen (nur, wenn >=2 Dateien)
+    groups = _make_groups(hash_buckets, algorithm)
+    stages.lap("group")
+
+    # 7) Rückgabe
     return groups
 
 
+def _make_groups(
+    hash_buckets: dict[tuple[int, str], list[FileRecord]], algorithm: str
+) -> list[DuplicateGroup]:
+    table = PathTable()  # Verzeichnisse über alle Gruppen nur einmal
+    return [
+        DuplicateGroup(
+            size=size,
+            digest=digest,
+            algorithm=algorithm,
+            records=same_files,
+            table=table,
+        )
+        for (size, digest), same_files in hash_buckets.items()
+        if len(same_files) >= 2
+    ]
+
+
+def stream_duplicate_groups(
+    records: Iterable[FileRecord],
+    *,
+    cache: DigestCache | None = None,
+    stats: DedupeStats | None = None,
+    engine: HashEngine | None = None,
+) -> list[DuplicateGroup]:
+    """
+    Wie find_duplicate_groups, aber über einen noch laufenden Durchlauf
+    (z. B. iter_files) auf der asyncio-Pipeline (siehe pipeline.py):
+
+    - Bekommt ein Größen-Bucket seine zweite Datei, werden seine Dateien
+      schon gehasht, während der Durchlauf weitere Ordner liest.
+    - Kollidiert ein Teil-Hash, startet sofort der Voll-Hash.
+    - Hashen läuft auf engine.jobs Threads je Stufe; Cache-Zugriffe
+      (SQLite, Voll- und Teil-Hashes) bleiben im aufrufenden Thread.
+
+    Gelesen werden dieselben Dateien wie von find_duplicate_groups. Die
+    Gruppen kommen so, als wäre die Eingabe nach Pfad sortiert gewesen –
+    unabhängig von der Reihenfolge des Durchlaufs.
+    """
+    from .pipeline import Pipeline
+
+    if stats is None:
+        stats = DedupeStats()
+    if engine is None:
+        engine = HashEngine()
+    algorithm = engine.algorithm
+    partial_key = partial_algorithm(algorithm)
+    stages = stats.stages
+
+    size_buckets: dict[int, list[FileRecord]] = {}
+    partial_sizes: set[int] = set()  # Größen, deren Bucket Teil-Hashes braucht
+    partial_buckets: dict[tuple[int, str], list[FileRecord]] = {}
+    partials: dict[Path, str] = {}
+    cached: dict[Path, str] = {}
+    digests: dict[Path, str] = {}
+
+    def by_size(rec: FileRecord) -> list[tuple[str, FileRecord]]:
+        stats.files_seen += 1
+        bucket = size_buckets.setdefault(rec.size, [])
+        bucket.append(rec)
+        if len(bucket) < 2:
+            return []
+        new = bucket if len(bucket) == 2 else bucket[-1:]
+        stats.size_candidates += len(new)
+        if cache is not None:
+            with stages.measure("cache"):
+                for r in new:
+                    digest = cache.lookup(r.path, r, algorithm)
+                    if digest is not None:
+                        cached[r.path] = digest
+                        stats.cache_hits += 1
+        if rec.size <= 2 * PARTIAL_BLOCK:
+            return [("full", r) for r in new if r.path not in cached]
+        if rec.size not in partial_sizes:
+            # wie needs_partial: erst, wenn nicht alles aus dem Cache kommt
+            if all(r.path in cached for r in bucket):
+                return []
+            partial_sizes.add(rec.size)
+            new = bucket
+        jobs = []
+        for r in new:
+            digest = None
+            if cache is not None:
+                with stages.measure("cache"):
+                    digest = cache.lookup(r.path, r, partial_key)
+            # Treffer laufen als fertiges Ergebnis an den Hash-Workern vorbei
+            jobs.append(("partial", r) if digest is None else ("cached", r, digest))
+        return jobs
+
+    def hashed(kind: str):
+        def run(job: tuple) -> tuple:
+            if job[0] != kind:
+                return job  # nur durchreichen
+            rec = job[1]
+            wall, cpu = time.perf_counter(), time.process_time()
+            if kind == "partial":
+                digest = compute_partial_digest(rec.path, rec.size, algorithm=algorithm)
+            else:
+                digest = compute_sha256(rec.path, algorithm=algorithm)
+                stats.latencies.append(time.perf_counter() - wall)
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            return kind, rec, digest, wall, cpu
+
+        return run
+
+    def on_partial(result: tuple) -> list[tuple]:
+        if result[0] == "cached":
+            _, rec, digest = result
+            stats.partial_cached += 1
+        elif result[0] == "partial":
+            _, rec, digest, wall, cpu = result
+            stages.add("partial-hash", wall, cpu)
+            stats.partial_hashed += 1
+            stats.bytes_read += 2 * PARTIAL_BLOCK
+            if cache is not None:
+                cache.store(rec.path, rec, digest, partial_key)
+        else:
+            return [result]
+        partials[rec.path] = digest
+        sub = partial_buckets.setdefault((rec.size, digest), [])
+        sub.append(rec)
+        if len(sub) < 2:
+            return []
+        new = sub if len(sub) == 2 else sub[-1:]
+        return [("full", r) for r in new if r.path not in cached]
+
+    def on_full(result: tuple) -> None:
+        _, rec, digest, wall, cpu = result
+        stages.add("full-hash", wall, cpu)
+        stats.full_hashed += 1
+        stats.bytes_read += rec.size
+        digests[rec.path] = digest
+        if cache is not None:
+            cache.store(rec.path, rec, digest, algorithm)
+
+    pipeline = Pipeline(records)
+    pipeline.map(by_size, inline=True, flat=True)
+    pipeline.map(hashed("partial"), workers=engine.jobs)
+    pipeline.map(on_partial, inline=True, flat=True)
+    pipeline.map(hashed("full"), workers=engine.jobs)
+    pipeline.run(sink=on_full)
+
+    # Gruppieren wie find_duplicate_groups über die nach Pfad sortierte Eingabe
+    stages.start()
+    candidates = sorted(
+        (
+            sorted(files, key=lambda rec: rec.path)
+            for files in size_buckets.values()
+            if len(files) >= 2
+        ),
+        key=lambda files: files[0].path,
+    )
+    hash_buckets: dict[tuple[int, str], list[FileRecord]] = defaultdict(list)
+    for files in candidates:
+        size = files[0].size
+        if size in partial_sizes:
+            sub: dict[str, list[FileRecord]] = defaultdict(list)
+            for rec in files:
+                sub[partials[rec.path]].append(rec)
+            survivors = [e for b in sub.values() if len(b) >= 2 for e in b]
+            stats.partial_unique += len(files) - len(survivors)
+            files = survivors
+        for rec in files:
+            digest = cached.get(rec.path) or digests[rec.path]
+            hash_buckets[(size, digest)].append(rec)
+    groups = _make_groups(hash_buckets, algorithm)
+    stages.lap("group")
+    return groups
+
+
+# iter_duplicate_groups_external: (size, dev, ino, mtime_ns, pfad-id) je Datei
+_SPILL_FORMAT = "<QQQqQ"
+# grobe Kosten im Speicher: ein Tupel im Lauf-Puffer bzw. ein FileRecord
+# samt Path in einem Hash-Block
+_SPILL_ENTRY_BYTES = 200
+_CANDIDATE_BYTES = 500
+
+
+def iter_duplicate_groups_external(
+    records: Iterable[FileRecord],
+    *,
+    max_memory: int,
+    cache: DigestCache | None = None,
+    stats: DedupeStats | None = None,
+    engine: HashEngine | None = None,
+    spill_dir: Path | str | None = None,
+) -> Iterator[DuplicateGroup]:
+    """
+    Duplikatsuche mit begrenztem Speicher für sehr große Bestände.
+
+    - Jede Datei wird als (size, dev, ino, mtime_ns, pfad-id) gesammelt und
+      in sortierten Läufen auf die Platte ausgelagert; die Pfade selbst
+      stehen in einer Pfad-Datei (spill.PathStore).
+    - Ein externer Merge liefert alle Einträge nach Größe sortiert.
+    - Nur Größen mit >= 2 Dateien werden gehasht, blockweise über
+      find_duplicate_groups (Teil-Hash, Cache, Engine wie gewohnt).
+    - Gruppen werden geliefert, sobald ihr Block fertig ist.
+
+    max_memory: ungefähre Obergrenze in Bytes, je zur Hälfte für den
+    Lauf-Puffer und die Hash-Blöcke. Alle Dateien einer Größe landen
+    immer im selben Block.
+    spill_dir: Ort der temporären Dateien (default: tempfile).
+    """
+    from .spill import PathStore, RunSorter
+
+    if max_memory <= 0:
+        raise ValueError("max_memory must be > 0")
+    if stats is None:
+        stats = DedupeStats()
+    budget = max_memory // 2
+
+    with tempfile.TemporaryDirectory(prefix="sss-dedupe-", dir=spill_dir) as tmp:
+        with PathStore(Path(tmp) / "paths.bin") as paths:
+            sorter = RunSorter(
+                _SPILL_FORMAT,
+                max_items=max(1, budget // _SPILL_ENTRY_BYTES),
+                directory=tmp,
+            )
+            for rec in records:
+                sorter.add(
+                    (rec.size, rec.dev, rec.ino, rec.mtime_ns, paths.add(rec.path))
+                )
+
+            block: list[FileRecord] = []
+            limit = max(2, budget // _CANDIDATE_BYTES)
+            for _size, run in itertools.groupby(sorter.merged(), key=itemgetter(0)):
+                first = next(run)
+                second = next(run, None)
+                if second is None:
+                    stats.files_seen += 1
+                    continue
+                for size, dev, ino, mtime_ns, path_id in itertools.chain(
+                    (first, second), run
+                ):
+                    block.append(
+                        FileRecord(paths.get(path_id), size, mtime_ns, ino, dev)
+                    )
+                if len(block) >= limit:
+                    yield from find_duplicate_groups(
+                        block, cache=cache, stats=stats, engine=engine
+                    )
+                    block = []
+            stats.spilled_runs = sorter.runs
+            stats.spilled_bytes = sorter.bytes_spilled + paths.size
+            if block:
+                yield from find_duplicate_groups(
+                    block, cache=cache, stats=stats, engine=engine
+                )
+
+
 def choose_keeper(group: DuplicateGroup, *, policy: str = "newest") -> Path:
     """
     Wählt eine Datei aus der Duplikatgruppe als 'Keeper'.
     Standard-Policy: 'newest' -> Datei mit größtem mtime.
+    Weitere: 'oldest', 'shortest_path', 'largest' (größte Datei, z. B. für
+    ähnliche Bilder mit unterschiedlicher Auflösung).
     """
     if not group.files:
         raise ValueError("DuplicateGroup.files ist leer")
 
     files = [p if isinstance(p, Path) else Path(p) for p in group.files]
 
-    if policy == "newest":
-        return max(files, key=lambda p: p.stat().st_mtime)
-    elif policy == "oldest":
-        return min(files, key=lambda p: p.stat().st_mtime)
+    if policy in ("newest", "oldest", "largest"):
+        # Stat-Daten aus den FileRecords der Gruppe; nur ohne sie wird ge-stat-et
+        records = group.records
+        if len(records) != len(files):
+            records = [
+                p if isinstance(p, FileRecord) else FileRecord.from_path(p)
+                for p in group.files
+            ]
+        if policy == "largest":
+            return files[max(range(len(files)), key=lambda i: records[i].size)]
+        pick = max if policy == "newest" else min
+        return files[pick(range(len(files)), key=lambda i: records[i].mtime_ns)]
     elif policy == "shortest_path":
         return min(files, key=lambda p: (len(str(p)), str(p)))
     else:
         raise ValueError(f"Unbekannte Policy: {policy!r}")
 
 
+ACTIONS = ("move", *mover.LINK_ACTIONS)
+
+
 @dataclass
 class DedupAction:
     src: Path
-    action: Literal["move"]
+    # move: src (Duplikat) -> dst; hardlink/reflink: dst (Duplikat) wird
+    # durch einen Link auf src (Keeper) ersetzt
+    action: Literal["move", "hardlink", "reflink"]
     dst: Path
     reason: str
 
 
 def plan_moves(
-    group: DuplicateGroup, keeper: Path, *, target_dir: Path
+    group: DuplicateGroup,
+    keeper: Path,
+    *,
+    target_dir: Path | None = None,
+    action: str = "move",
 ) -> list[DedupAction]:
     """
     Erzeuge einen Dry-Run-Plan: Alle Nicht-Keeper einer Gruppe
     werden 'virtuell' nach target_dir/<digest[:8]>/<original_name> verschoben.
+
+    action="hardlink"/"reflink": statt zu verschieben wird jedes Duplikat
+    an seinem Platz durch einen Link auf den Keeper ersetzt (src=Keeper,
+    dst=Duplikat); target_dir wird dann nicht gebraucht.
+
+    Ein ganzes Verzeichnis plant plan_directory().
     """
+    if action not in ACTIONS:
+        raise ValueError(f"Unsupported action: {action!r}")
+    if target_dir is None and action == "move":
+        raise TypeError("plan_moves(..., action='move') braucht target_dir")
+
     # Normalisiere Typen
     keeper = keeper if isinstance(keeper, Path) else Path(keeper)
     files = [p if isinstance(p, Path) else Path(p) for p in group.files]
 
     digest_prefix = group.digest[:8]
-    base = target_dir / digest_prefix
 
     actions: list[DedupAction] = []
     for src in files:
         if src == keeper:
             continue
-        dst = base / src.name
         reason = f"duplicate of {keeper.name} ({digest_prefix})"
-        actions.append(DedupAction(src=src, action="move", dst=dst, reason=reason))
+        if action == "move":
+            dst = target_dir / digest_prefix / src.name
+            actions.append(DedupAction(src=src, action="move", dst=dst, reason=reason))
+        else:
+            actions.append(
+                DedupAction(src=keeper, action=action, dst=src, reason=reason)
+            )
 
     return actions
 
 
-def execute_actions(actions, summary) -> None:
+def plan_directory(
+    directory: Path,
+    *,
+    target_dir: Path | None = None,
+    action: str = "move",
+    policy: str = "newest",
+    cache: DigestCache | None = None,
+    stats: DedupeStats | None = None,
+    engine: HashEngine | None = None,
+    max_memory: int | None = None,
+) -> list[DedupAction]:
     """
-    Führt die geplanten Aktionen aus.
-    Aktuell: nur 'move' wird unterstützt, minimal für den CLI-Test.
+    Plant die Duplikat-Moves für alle Dateien direkt in directory.
+    Ziel ist standardmäßig <directory>/duplicates/<digest[:8]>/<name>.
 
-    actions: Iterable von DedupAction
-    summary: Summary-Objekt (wird vorerst nicht benutzt)
+    max_memory: Duplikatsuche mit begrenztem Speicher über Lauf-Dateien
+    auf der Platte (iter_duplicate_groups_external) statt der Pipeline.
+    """
+    directory = directory if isinstance(directory, Path) else Path(directory)
+    target_dir = target_dir or (directory / "duplicates")
+
+    stats = stats if stats is not None else DedupeStats()
+
+    # Hashen überlappt den Durchlauf; Ausführen erst danach, weil die
+    # Keeper-Wahl vollständige Gruppen braucht
+    records = stats.stages.wrap("walk", iter_files(directory))
+    if max_memory is not None:
+        groups = iter_duplicate_groups_external(
+            records, max_memory=max_memory, cache=cache, stats=stats, engine=engine
+        )
+    else:
+        groups = stream_duplicate_groups(
+            records, cache=cache, stats=stats, engine=engine
+        )
+
+    actions: list[DedupAction] = []
+    for group in groups:
+        with stats.stages.measure("plan"):
+            keeper = choose_keeper(group, policy=policy)
+            actions.extend(
+                plan_moves(group, keeper, target_dir=target_dir, action=action)
+            )
+    return actions
+
+
+def plan_against(
+    directory: Path,
+    index,
+    *,
+    target_dir: Path | None = None,
+    action: str = "move",
+    cache: DigestCache | None = None,
+    stats: DedupeStats | None = None,
+    engine: HashEngine | None = None,
+) -> list[DedupAction]:
     """
-    for act in actions:
-        if act.action == "move":
-            src = Path(act.src)
-            dst = Path(act.dst)
+    Plant Aktionen für Dateien direkt in directory, die es im Archiv schon
+    gibt (index: digestindex.DigestIndex). Keeper ist immer die Archivdatei.
 
-            dst.parent.mkdir(parents=True, exist_ok=True)
-            src.replace(dst)  # Datei wirklich verschieben
+    - Gehasht werden nur Dateien, deren Größe im Archiv vorkommt.
+    - Pro Datei eine Binärsuche im Index; ein Treffer zählt nur, wenn die
+      Archivdatei per stat noch zu size und mtime_ns passt.
+    - Ist die Datei schon ein Hardlink auf die Archivdatei, passiert nichts.
 
-            # TODO: Hier könntest du später summary.update(...) o.ä. aufrufen
+    Duplikate innerhalb von directory findet weiterhin plan_directory.
+    """
+    if action not in ACTIONS:
+        raise ValueError(f"Unsupported action: {action!r}")
+    if stats is None:
+        stats = DedupeStats()
+    if engine is None:
+        engine = HashEngine(algorithm=index.algorithm)
+    algorithm = engine.algorithm
+    if algorithm != index.algorithm:
+        raise ValueError(f"Index nutzt {index.algorithm!r}, Engine {algorithm!r}")
+    directory = directory if isinstance(directory, Path) else Path(directory)
+    target_dir = target_dir or (directory / "duplicates")
+    stages = stats.stages
+
+    stages.start()
+    candidates: list[FileRecord] = []
+    for rec in iter_files(directory):
+        stats.files_seen += 1
+        if index.has_size(rec.size):
+            candidates.append(rec)
+    stats.size_candidates = len(candidates)
+    stages.lap("walk")
+
+    digests: dict[Path, str] = {}
+    if cache is not None:
+        for rec in candidates:
+            digest = cache.lookup(rec.path, rec, algorithm)
+            if digest is not None:
+                digests[rec.path] = digest
+                stats.cache_hits += 1
+    stages.lap("cache")
+
+    todo = [rec for rec in candidates if rec.path not in digests]
+    results = engine.map(
+        lambda rec: compute_sha256(rec.path, algorithm=algorithm),
+        todo,
+        sizes=[rec.size for rec in todo],
+    )
+    for rec, digest in zip(todo, results):
+        digests[rec.path] = digest
+        if cache is not None:
+            cache.store(rec.path, rec, digest, algorithm)
+    stats.full_hashed += len(todo)
+    stats.bytes_read += sum(rec.size for rec in todo)
+    stages.lap("full-hash")
+
+    actions: list[DedupAction] = []
+    for rec in candidates:
+        digest = digests[rec.path]
+        for keeper, mtime_ns in index.lookup(rec.size, digest):
+            try:
+                st = os.stat(keeper)
+            except OSError:
+                continue  # veralteter Eintrag
+            if (st.st_size, st.st_mtime_ns) != (rec.size, mtime_ns):
+                continue
+            if rec.ino and rec.dev:
+                linked = (st.st_ino, st.st_dev) == (rec.ino, rec.dev)
+            else:
+                linked = os.path.samefile(keeper, rec.path)  # Windows: ino fehlt
+            if linked:
+                break  # schon verlinkt
+            group = DuplicateGroup(rec.size, digest, [keeper, rec.path], algorithm)
+            actions.extend(
+                plan_moves(group, keeper, target_dir=target_dir, action=action)
+            )
+            break
+    stages.lap("lookup")
+    return actions
+
+
+def execute_actions(actions, summary, *, journal=None) -> MoveReport:
+    """
+    Führt die geplanten Aktionen gebündelt aus (mover.execute_actions):
+    'move', 'hardlink' und 'reflink'.
+
+    actions: Iterable von DedupAction
+    summary: Summary-Objekt; zählt verschobene und verlinkte Dateien
+    journal: optionales journal.Journal (Write-Ahead, fortsetzbar)
+    """
+    report = mover.execute_actions(list(actions), journal=journal)
+    summary.inc_moved(len(report.moved))
+    summary.inc_linked(len(report.linked))
+    return report
@@ -0,0 +1,394 @@
+"""Persistenter Digest-Index eines Archivs (z. B. _by_date) für `dedupe --against`.
+
+Damit neue Dateien gegen ein großes Archiv geprüft werden können, ohne das
+Archiv jedes Mal neu zu hashen. Ablage in <archiv>/.sss-index/:
+
+- digests.idx: Kopf + nach (size, digest) sortierte Datensätze fester
+  Breite (size, digest, mtime_ns, pfad-id). Die Datei wird per mmap
+  geöffnet und binär durchsucht; gelesen werden nur die berührten Seiten.
+- delta-<gen>.bin: später hinzugekommene Datensätze im selben Format,
+  unsortiert. Beim Öffnen in ein dict geladen und ab DELTA_LIMIT
+  Einträgen in digests.idx eingemischt.
+- pending-*.jsonl: von mover (safe_move, execute_moves, resume) ins Archiv
+  verschobene Dateien, noch ohne Digest (verschieben liest keine Inhalte).
+  Jeder Aufruf schreibt eine eigene Datei, atomar per os.replace; beim
+  nächsten Öffnen werden genau die gelesenen Dateien gehasht und gelöscht,
+  was währenddessen dazukommt, bleibt liegen. Gehasht wird meist per
+  DigestCache-Treffer unter dem alten Pfad, denn ein rename ändert die
+  Stat-Signatur nicht.
+- paths-<gen>.bin: Pfade relativ zum Archiv (spill.PathStore-Format).
+
+Ein Neuaufbau (build) erhöht die Generation gen; alte delta-/paths-Dateien
+gelten dann nicht mehr. Treffer prüft der Aufrufer per stat gegen size und
+mtime_ns, veraltete Einträge fallen so heraus.
+"""
+
+import heapq
+import itertools
+import json
+import mmap
+import os
+import struct
+import time
+from collections.abc import Iterable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .scanner import FileRecord, iter_files
+from .spill import PathStore
+
+if TYPE_CHECKING:
+    # mover lädt dieses Modul nach jeder Verschiebung: kein hashlib/sqlite3
+    from .hashcache import DigestCache
+    from .hashing import HashEngine
+
+INDEX_DIR = ".sss-index"
+# Spiegel von hashing.DEFAULT_ALGORITHM (hashing lädt hashlib)
+DEFAULT_ALGORITHM = "sha256"
+# so viele Delta-Einträge, dann wird in digests.idx eingemischt
+DELTA_LIMIT = 4096
+
+_MAGIC = b"SSSDIDX1"
+_HEADER = struct.Struct(">8s16sQQ")  # magic, algorithm, gen, count
+# big-endian: Bytevergleich der ersten 40 Bytes = Sortierung nach (size, digest)
+_RECORD = struct.Struct(">Q32sqQ")  # size, digest, mtime_ns, pfad-id
+_SIZE = struct.Struct(">Q")
+_KEY = _SIZE.size + 32
+_PENDING = "pending-*.jsonl"
+_pending_ids = itertools.count()
+
+
+def index_dir(archive: Path | str) -> Path:
+    return Path(archive) / INDEX_DIR
+
+
+def add_pending(archive: Path | str, moved: Iterable[tuple[Path, Path]]) -> int:
+    """
+    Merkt (quelle, ziel)-Paare frisch ins Archiv verschobener Dateien für
+    den Index vor. Liest keine Inhalte; Ziele außerhalb des Archivs zählen nicht.
+    """
+    root = os.path.abspath(archive)
+    lines = []
+    for src, dst in moved:
+        rel = os.path.relpath(dst, root)
+        if rel.startswith(os.pardir):
+            continue
+        lines.append(json.dumps([os.path.abspath(src), rel]) + "\n")
+    if lines:
+        # eigene Datei je Aufruf: resolve_pending löscht nie, was es nicht las
+        name = f"pending-{time.time_ns()}-{os.getpid()}-{next(_pending_ids)}"
+        tmp = index_dir(archive) / f"{name}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.writelines(lines)
+        os.replace(tmp, tmp.with_suffix(".jsonl"))
+    return len(lines)
+
+
+def find_archive(directory: Path | str) -> Path | None:
+    """Nächstes Verzeichnis ab directory aufwärts, das einen Index hat."""
+    current = os.path.abspath(directory)
+    while True:
+        if os.path.isdir(os.path.join(current, INDEX_DIR)):
+            return Path(current)
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+def note_moved(moved: Iterable[tuple[Path, Path]]) -> int:
+    """
+    add_pending für alle Ziele, die unterhalb eines Archivs mit Index
+    liegen (Aufruf aus mover nach erfolgreichen Verschiebungen).
+    """
+    archives: dict[str, Path | None] = {}
+    by_archive: dict[Path, list[tuple[Path, Path]]] = {}
+    for src, dst in moved:
+        parent = os.path.dirname(os.path.abspath(dst))
+        if parent not in archives:
+            archives[parent] = find_archive(parent)
+        archive = archives[parent]
+        if archive is not None:
+            by_archive.setdefault(archive, []).append((src, dst))
+    return sum(add_pending(archive, pairs) for archive, pairs in by_archive.items())
+
+
+class DigestIndex:
+    """
+    Sortierter Digest-Index über alle Dateien unterhalb von archive.
+
+    Meist über DigestIndex.open(): baut den Index beim ersten Mal auf,
+    hasht danach nur vorgemerkte Dateien (pending) und mischt das Delta ein.
+    """
+
+    def __init__(self, archive: Path | str, *, algorithm: str = DEFAULT_ALGORITHM):
+        self.root = Path(os.path.abspath(archive))
+        self.dir = index_dir(self.root)
+        self.algorithm = algorithm
+        self.hashed = 0  # in diesem Lauf gelesene Dateien
+        self._gen = 0
+        self._count = 0
+        self._file = None
+        self._mm: mmap.mmap | bytes = b""
+        self._paths: PathStore | None = None
+        self._delta: dict[bytes, list[tuple[int, int]]] = {}
+        self._delta_sizes: set[int] = set()
+        self._delta_count = 0
+
+    @classmethod
+    def open(
+        cls,
+        archive: Path | str,
+        *,
+        algorithm: str = DEFAULT_ALGORITHM,
+        cache: "DigestCache | None" = None,
+        engine: "HashEngine | None" = None,
+        rebuild: bool = False,
+    ) -> "DigestIndex":
+        index = cls(archive, algorithm=algorithm)
+        if rebuild or not index._load():
+            index.build(cache=cache, engine=engine)
+        index.resolve_pending(cache=cache, engine=engine)
+        if index._delta_count >= DELTA_LIMIT:
+            index.compact()
+        return index
+
+    # -- Dateien -----------------------------------------------------------
+
+    def _idx_path(self) -> Path:
+        return self.dir / "digests.idx"
+
+    def _gen_path(self, kind: str, gen: int | None = None) -> Path:
+        return self.dir / f"{kind}-{self._gen if gen is None else gen}.bin"
+
+    def _load(self) -> bool:
+        """Öffnet einen vorhandenen, passenden Index; False sonst."""
+        self.close()
+        try:
+            f = open(self._idx_path(), "rb")
+        except FileNotFoundError:
+            return False
+        head = f.read(_HEADER.size)
+        ok = len(head) == _HEADER.size
+        if ok:
+            magic, algo, gen, count = _HEADER.unpack(head)
+            ok = magic == _MAGIC and algo.rstrip(b"\0").decode() == self.algorithm
+        if not ok:
+            f.close()
+            return False
+        self._file, self._gen, self._count = f, gen, count
+        self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._paths = PathStore(self._gen_path("paths"), append=True)
+        self._delta, self._delta_sizes, self._delta_count = {}, set(), 0
+        delta = self._gen_path("delta")
+        if delta.exists():
+            data = delta.read_bytes()
+            usable = len(data) - len(data) % _RECORD.size  # halber Datensatz
+            for size, digest, mtime_ns, path_id in _RECORD.iter_unpack(data[:usable]):
+                self._remember(size, digest, mtime_ns, path_id)
+        return True
+
+    def _remember(self, size: int, digest: bytes, mtime_ns: int, path_id: int):
+        key = _SIZE.pack(size) + digest
+        self._delta.setdefault(key, []).append((mtime_ns, path_id))
+        self._delta_sizes.add(size)
+        self._delta_count += 1
+
+    def _write_index(self, gen: int, count: int, rows: Iterable[tuple]) -> None:
+        tmp = self.dir / "digests.idx.tmp"
+        with open(tmp, "wb") as f:
+            algo = self.algorithm.encode()
+            f.write(_HEADER.pack(_MAGIC, algo, gen, count))
+            pack = _RECORD.pack
+            f.writelines(pack(*row) for row in rows)
+        self.close()  # gemappte Dateien lassen sich nicht überall ersetzen
+        os.replace(tmp, self._idx_path())
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+        self._mm = b""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._paths is not None:
+            self._paths.close()
+            self._paths = None
+
+    def __enter__(self) -> "DigestIndex":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count + self._delta_count
+
+    # -- Aufbauen und Aktualisieren ----------------------------------------
+
+    def _hash(
+        self,
+        items: list[tuple[FileRecord, Path | None]],
+        cache: "DigestCache | None",
+        engine: "HashEngine | None",
+    ) -> list[bytes]:
+        """Digests für (record, alter_pfad); Cache zuerst, auch unter alter_pfad."""
+        from .hashing import HashEngine, file_digest
+
+        algorithm = self.algorithm
+        engine = engine or HashEngine(algorithm=algorithm)
+        digests: list[str | None] = [None] * len(items)
+        todo = []
+        for i, (rec, alias) in enumerate(items):
+            if cache is not None:
+                digests[i] = cache.lookup(rec.path, rec, algorithm)
+                if digests[i] is None and alias is not None:
+                    digests[i] = cache.lookup(alias, rec, algorithm)
+            if digests[i] is None:
+                todo.append(i)
+        results = engine.map(
+            lambda i: file_digest(items[i][0].path, algorithm),
+            todo,
+            sizes=[items[i][0].size for i in todo],
+        )
+        for i, digest in zip(todo, results):
+            digests[i] = digest
+            if cache is not None:
+                cache.store(items[i][0].path, items[i][0], digest, algorithm)
+        self.hashed += len(todo)
+        return [bytes.fromhex(d) for d in digests]
+
+    def build(
+        self,
+        *,
+        cache: "DigestCache | None" = None,
+        engine: "HashEngine | None" = None,
+    ) -> None:
+        """Baut den Index aus allen Dateien unterhalb des Archivs neu auf."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        # vor dem Durchlauf vorgemerkt = im Neuaufbau enthalten; später
+        # vorgemerkte Dateien bleiben für resolve_pending liegen
+        pending = list(self.dir.glob(_PENDING))
+        records = list(iter_files(self.root, recursive=True, exclude=[self.dir]))
+        digests = self._hash([(rec, None) for rec in records], cache, engine)
+
+        # neue Generation über allen vorhandenen, auch nicht ladbaren
+        stale = [*self.dir.glob("paths-*.bin"), *self.dir.glob("delta-*.bin")]
+        gen = 1 + max((int(p.stem.split("-")[1]) for p in stale), default=0)
+        rows = []
+        with PathStore(self._gen_path("paths", gen)) as paths:
+            for rec, digest in zip(records, digests):
+                path_id = paths.add(os.path.relpath(rec.path, self.root))
+                rows.append((rec.size, digest, rec.mtime_ns, path_id))
+        rows.sort()
+        self._write_index(gen, len(rows), rows)
+        for path in stale + pending:
+            path.unlink(missing_ok=True)
+        self._load()
+
+    def add(self, items: Iterable[tuple[FileRecord, bytes]]) -> None:
+        """Hängt Archivdateien mit ihrem (rohen) Digest an das Delta an."""
+        rows = [
+            (
+                rec.size,
+                digest,
+                rec.mtime_ns,
+                self._paths.add(os.path.relpath(rec.path, self.root)),
+            )
+            for rec, digest in items
+        ]
+        with open(self._gen_path("delta"), "ab") as f:
+            f.writelines(_RECORD.pack(*row) for row in rows)
+        for row in rows:
+            self._remember(*row)
+
+    def resolve_pending(
+        self,
+        *,
+        cache: "DigestCache | None" = None,
+        engine: "HashEngine | None" = None,
+    ) -> int:
+        """
+        Hasht vorgemerkte Dateien (siehe add_pending) und übernimmt sie.
+        Gelöscht werden nur die hier gelesenen pending-Dateien.
+        """
+        files = sorted(self.dir.glob(_PENDING))
+        items = []
+        for pending in files:
+            try:
+                lines = pending.read_text(encoding="utf-8").splitlines()
+            except FileNotFoundError:
+                continue  # von einem parallelen Lauf übernommen
+            for line in lines:
+                try:
+                    src, rel = json.loads(line)
+                    rec = FileRecord.from_path(self.root / rel)
+                except (ValueError, OSError):
+                    continue  # Datei schon wieder weg
+                items.append((rec, Path(src)))
+        if items:
+            digests = self._hash(items, cache, engine)
+            self.add(zip((rec for rec, _src in items), digests))
+        for pending in files:
+            pending.unlink(missing_ok=True)
+        return len(items)
+
+    def compact(self) -> None:
+        """Mischt das Delta in die sortierte Index-Datei ein."""
+        if not self._delta_count:
+            return
+        delta = sorted(
+            (_SIZE.unpack(key[: _SIZE.size])[0], key[_SIZE.size :], mtime_ns, path_id)
+            for key, entries in self._delta.items()
+            for mtime_ns, path_id in entries
+        )
+        main = (
+            _RECORD.unpack_from(self._mm, _HEADER.size + i * _RECORD.size)
+            for i in range(self._count)
+        )
+        self._write_index(self._gen, self._count + len(delta), heapq.merge(main, delta))
+        self._gen_path("delta").unlink(missing_ok=True)
+        self._load()
+
+    # -- Suchen ------------------------------------------------------------
+
+    def _lower_bound(self, key: bytes) -> int:
+        """Erster Datensatz, dessen Schlüsselpräfix >= key ist."""
+        mm, width = self._mm, len(key)
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            off = _HEADER.size + mid * _RECORD.size
+            if mm[off : off + width] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _prefix_at(self, i: int, width: int) -> bytes:
+        off = _HEADER.size + i * _RECORD.size
+        return self._mm[off : off + width]
+
+    def has_size(self, size: int) -> bool:
+        """Gibt es im Archiv eine Datei dieser Größe? (Binärsuche)"""
+        if size in self._delta_sizes:
+            return True
+        prefix = _SIZE.pack(size)
+        i = self._lower_bound(prefix)
+        return i < self._count and self._prefix_at(i, _SIZE.size) == prefix
+
+    def lookup(self, size: int, digest: bytes | str) -> list[tuple[Path, int]]:
+        """Archivdateien mit diesem Inhalt als (pfad, mtime_ns); ungeprüft."""
+        if isinstance(digest, str):
+            digest = bytes.fromhex(digest)
+        key = _SIZE.pack(size) + digest
+        found = []
+        i = self._lower_bound(key)
+        while i < self._count and self._prefix_at(i, _KEY) == key:
+            _size, _digest, mtime_ns, path_id = _RECORD.unpack_from(
+                self._mm, _HEADER.size + i * _RECORD.size
+            )
+            found.append((mtime_ns, path_id))
+            i += 1
+        found += self._delta.get(key, [])
+        return [(self.root / self._paths.get(path_id), m) for m, path_id in found]
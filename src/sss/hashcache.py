@@ -0,0 +1,228 @@
+"""Persistenter Digest-Cache (SQLite).
+
+Speichert pro Datei und Algorithmus den zuletzt berechneten Hash zusammen mit
+der Stat-Signatur (st_dev, st_ino, st_size, st_mtime_ns). Solange sich die
+Signatur nicht ändert, wird der Hash aus dem Cache geliefert und die Datei
+nicht erneut gelesen. Digests verschiedener Algorithmen werden nie vermischt.
+"""
+
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+from .cachedir import default_cache_dir
+
+if TYPE_CHECKING:
+    from .scanner import FileRecord
+
+SCHEMA_VERSION = 2
+
+# Nach so vielen Schreibvorgängen wird automatisch committet.
+_COMMIT_EVERY = 1000
+
+
+def default_cache_path() -> Path:
+    return default_cache_dir() / "digests.sqlite"
+
+
+def stat_signature(st: "os.stat_result | FileRecord") -> tuple[int, int, int, int]:
+    """Signatur, über die ein Cache-Eintrag invalidiert wird."""
+    if isinstance(st, os.stat_result):
+        return (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+    return (st.dev, st.ino, st.size, st.mtime_ns)
+
+
+def signature_matches(stored: tuple, current: tuple) -> bool:
+    """
+    Vergleicht zwei Signaturen (dev, ino, size, mtime_ns). Ist dev/ino auf
+    einer Seite 0 (Windows: FileRecord aus DirEntry), zählen nur Größe und
+    mtime – sonst würde jeder Eintrag aus einem scan gegen os.stat verfehlen.
+    """
+    if stored[2:] != current[2:]:
+        return False
+    if 0 in stored[:2] or 0 in current[:2]:
+        return True
+    return stored[:2] == current[:2]
+
+
+class DigestCache:
+    """
+    SQLite-gestützter Cache für Datei-Digests.
+
+    - Die Verbindung wird erst beim ersten Zugriff geöffnet.
+    - max_entries: Obergrenze; beim Schließen werden die am längsten
+      nicht benutzten Einträge verworfen.
+    """
+
+    def __init__(
+        self, path: Path | str | None = None, *, max_entries: int | None = None
+    ):
+        if max_entries is not None and max_entries < 0:
+            raise ValueError("max_entries must be >= 0")
+        self.path = Path(path) if path is not None else default_cache_path()
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn: sqlite3.Connection | None = None
+        self._pending = 0
+        self._touched: set[tuple[str, str]] = set()
+
+    # -- Verbindung --------------------------------------------------------
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is not None:
+            return self._conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path))
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            # Altes/unbekanntes Schema: Cache ist nur ein Cache -> neu anlegen.
+            conn.execute("DROP TABLE IF EXISTS digests")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS digests (
+                path     TEXT NOT NULL,
+                algo     TEXT NOT NULL,
+                dev      INTEGER NOT NULL,
+                ino      INTEGER NOT NULL,
+                size     INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest   TEXT NOT NULL,
+                used_at  INTEGER NOT NULL,
+                PRIMARY KEY (path, algo)
+            )
+            """)
+        conn.execute("CREATE INDEX IF NOT EXISTS digests_used ON digests(used_at)")
+        conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+        conn.commit()
+        self._conn = conn
+        return conn
+
+    @staticmethod
+    def _key(path: Path | str) -> str:
+        # abspath statt resolve(): keine zusätzlichen Syscalls
+        return os.path.abspath(path)
+
+    # -- Zugriff -----------------------------------------------------------
+
+    def lookup(
+        self,
+        path: Path | str,
+        st: "os.stat_result | FileRecord",
+        algorithm: str = "sha256",
+    ) -> str | None:
+        """Liefert den gecachten Digest, falls die Stat-Signatur passt."""
+        key = self._key(path)
+        row = (
+            self._connect()
+            .execute(
+                "SELECT dev, ino, size, mtime_ns, digest FROM digests"
+                " WHERE path = ? AND algo = ?",
+                (key, algorithm),
+            )
+            .fetchone()
+        )
+        if row is None or not signature_matches(tuple(row[:4]), stat_signature(st)):
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._touched.add((key, algorithm))
+        return row[4]
+
+    def store(
+        self,
+        path: Path | str,
+        st: "os.stat_result | FileRecord",
+        digest: str,
+        algorithm: str = "sha256",
+    ) -> None:
+        """Speichert den Digest zur gegebenen Stat-Signatur."""
+        dev, ino, size, mtime_ns = stat_signature(st)
+        self._connect().execute(
+            "INSERT OR REPLACE INTO digests VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                self._key(path),
+                algorithm,
+                dev,
+                ino,
+                size,
+                mtime_ns,
+                digest,
+                int(time.time()),
+            ),
+        )
+        self._pending += 1
+        if self._pending >= _COMMIT_EVERY:
+            self.commit()
+
+    def __len__(self) -> int:
+        return self._connect().execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+    # -- Pflege ------------------------------------------------------------
+
+    def prune(self, *, max_entries: int | None = None) -> int:
+        """
+        Entfernt veraltete Einträge (Datei fehlt oder Signatur geändert) und
+        kürzt danach auf max_entries (LRU). Gibt die Zahl entfernter Einträge zurück.
+        """
+        conn = self._connect()
+        stale = []
+        for key, algo, dev, ino, size, mtime_ns in conn.execute(
+            "SELECT path, algo, dev, ino, size, mtime_ns FROM digests"
+        ):
+            try:
+                st = os.stat(key)
+            except OSError:
+                stale.append((key, algo))
+                continue
+            if not signature_matches((dev, ino, size, mtime_ns), stat_signature(st)):
+                stale.append((key, algo))
+        conn.executemany("DELETE FROM digests WHERE path = ? AND algo = ?", stale)
+        removed = len(stale) + self._evict(max_entries)
+        conn.commit()
+        return removed
+
+    def _evict(self, max_entries: int | None) -> int:
+        if max_entries is None:
+            return 0
+        cur = self._connect().execute(
+            """
+            DELETE FROM digests WHERE rowid IN (
+                SELECT rowid FROM digests ORDER BY used_at DESC, path, algo
+                LIMIT -1 OFFSET ?
+            )
+            """,
+            (max_entries,),
+        )
+        return cur.rowcount
+
+    def commit(self) -> None:
+        if self._conn is None:
+            return
+        if self._touched:
+            now = int(time.time())
+            self._conn.executemany(
+                "UPDATE digests SET used_at = ? WHERE path = ? AND algo = ?",
+                ((now, key, algo) for key, algo in self._touched),
+            )
+            self._touched.clear()
+        self._conn.commit()
+        self._pending = 0
+
+    def close(self) -> None:
+        if self._conn is None:
+            return
+        self.commit()
+        if self._evict(self.max_entries):
+            self._conn.commit()
+        self._conn.close()
+        self._conn = None
+
+    def __enter__(self) -> "DigestCache":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,209 @@
+"""Gemeinsame Hashing-Engine für dedupe und metadata.
+
+hashlib gibt bei großen update()-Aufrufen den GIL frei, daher reicht ein
+Thread-Pool, um mehrere Kerne mit schnellem Storage auszulasten.
+
+file_digest() ist die gemeinsame Leseroutine: ein wiederverwendeter Puffer
+pro Thread (readinto, keine neuen bytes-Objekte je Chunk), mmap für große
+Dateien und posix_fadvise-Hinweise, damit ein Lauf über das ganze Archiv
+nicht den kompletten Page-Cache verdrängt.
+"""
+
+import hashlib
+import mmap
+import os
+import threading
+from pathlib import Path
+from collections.abc import Callable, Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+# Unterstützte Digest-Algorithmen. BLAKE2b mit 32 Byte Ausgabe, damit alle
+# Digests gleich lang sind (64 Hex-Zeichen) wie bei SHA-256.
+ALGORITHMS: dict[str, Callable[[], "hashlib._Hash"]] = {
+    "sha256": hashlib.sha256,
+    "blake2b": lambda: hashlib.blake2b(digest_size=32),
+    "blake2s": hashlib.blake2s,
+}
+DEFAULT_ALGORITHM = "sha256"
+
+
+def new_hasher(algorithm: str = DEFAULT_ALGORITHM) -> "hashlib._Hash":
+    """Neues Hash-Objekt für den angegebenen Algorithmus."""
+    try:
+        return ALGORITHMS[algorithm]()
+    except KeyError:
+        raise ValueError(
+            f"Unbekannter Digest-Algorithmus: {algorithm!r} "
+            f"(erlaubt: {', '.join(ALGORITHMS)})"
+        ) from None
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+# Ab dieser Größe wird die Datei per mmap statt per readinto gelesen.
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+_buffers = threading.local()
+
+
+def _buffer(size: int) -> memoryview:
+    """Wiederverwendeter Lesepuffer des aktuellen Threads."""
+    buf = getattr(_buffers, "buf", None)
+    if buf is None or len(buf) < size:
+        buf = bytearray(size)
+        _buffers.buf = buf
+    return memoryview(buf)[:size]
+
+
+def _fadvise(fd: int, advice_name: str) -> None:
+    # Nur ein Hinweis an den Kernel; fehlt auf Windows/macOS.
+    advice = getattr(os, advice_name, None)
+    if advice is None or not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, advice)
+    except OSError:
+        pass
+
+
+def file_digest(
+    path: Path | str,
+    algorithm: str = DEFAULT_ALGORITHM,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    drop_cache: bool = True,
+) -> str:
+    """
+    Hex-Digest über den gesamten Dateiinhalt.
+
+    - chunk_size: Bytes pro update()-Aufruf
+    - mmap_threshold: ab dieser Dateigröße wird gemappt statt gelesen
+    - drop_cache: gelesene Seiten danach per POSIX_FADV_DONTNEED freigeben
+    """
+    digest, _head = file_digest_head(
+        path,
+        algorithm,
+        head_size=0,
+        chunk_size=chunk_size,
+        mmap_threshold=mmap_threshold,
+        drop_cache=drop_cache,
+    )
+    return digest
+
+
+def file_digest_head(
+    path: Path | str,
+    algorithm: str = DEFAULT_ALGORITHM,
+    *,
+    head_size: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    mmap_threshold: int = MMAP_THRESHOLD,
+    drop_cache: bool = True,
+) -> tuple[str, bytes]:
+    """
+    Wie file_digest, liefert zusätzlich die ersten head_size Bytes – aus
+    demselben Lesedurchlauf, ohne die Datei ein zweites Mal zu öffnen.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be > 0")
+
+    h = new_hasher(algorithm)
+    head = bytearray()
+    with open(path, "rb", buffering=0) as f:
+        fd = f.fileno()
+        _fadvise(fd, "POSIX_FADV_SEQUENTIAL")
+        size = os.fstat(fd).st_size
+        if size >= mmap_threshold > 0:
+            with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+                with memoryview(mm) as view:
+                    head += view[:head_size]
+                    for off in range(0, size, chunk_size):
+                        h.update(view[off : off + chunk_size])
+        else:
+            buf = _buffer(chunk_size)
+            while n := f.readinto(buf):
+                if len(head) < head_size:
+                    head += buf[: min(n, head_size - len(head))]
+                h.update(buf[:n])
+        if drop_cache:
+            _fadvise(fd, "POSIX_FADV_DONTNEED")
+    return h.hexdigest(), bytes(head)
+
+
+class _ByteBudget:
+    """Begrenzt die Summe der Bytes, die gerade gehasht werden."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._available = limit
+        self._cond = threading.Condition()
+
+    def acquire(self, n: int) -> None:
+        with self._cond:
+            while self._available < n:
+                self._cond.wait()
+            self._available -= n
+
+    def release(self, n: int) -> None:
+        with self._cond:
+            self._available += n
+            self._cond.notify_all()
+
+
+class HashEngine:
+    """
+    Führt Hash-Funktionen parallel auf einem Thread-Pool aus.
+
+    - jobs: Anzahl Worker (1 = alles im aufrufenden Thread)
+    - algorithm: Digest-Algorithmus, den die Aufrufer verwenden (siehe ALGORITHMS)
+    - max_inflight_bytes: Obergrenze für gleichzeitig bearbeitete Bytes;
+      eine einzelne größere Datei wird trotzdem (allein) bearbeitet.
+
+    Ergebnisse kommen immer in Eingabereihenfolge zurück, egal welcher
+    Worker zuerst fertig wird.
+    """
+
+    def __init__(
+        self,
+        jobs: int = 1,
+        *,
+        algorithm: str = DEFAULT_ALGORITHM,
+        max_inflight_bytes: int = DEFAULT_MAX_INFLIGHT_BYTES,
+    ):
+        if jobs < 1:
+            raise ValueError("jobs must be >= 1")
+        new_hasher(algorithm)  # unbekannte Algorithmen früh ablehnen
+        if max_inflight_bytes <= 0:
+            raise ValueError("max_inflight_bytes must be > 0")
+        self.jobs = jobs
+        self.algorithm = algorithm
+        self.max_inflight_bytes = max_inflight_bytes
+
+    def map(
+        self,
+        fn: Callable[[T], R],
+        items: Iterable[T],
+        *,
+        sizes: Iterable[int],
+    ) -> list[R]:
+        """Wendet fn auf alle items an; sizes liefert die Bytes je item."""
+        items = list(items)
+        if self.jobs == 1 or len(items) < 2:
+            return [fn(item) for item in items]
+
+        budget = _ByteBudget(self.max_inflight_bytes)
+        futures: list[Future] = []
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            for item, size in zip(items, sizes, strict=True):
+                cost = min(size, budget.limit)
+                budget.acquire(cost)
+                fut = pool.submit(fn, item)
+                fut.add_done_callback(lambda _f, c=cost: budget.release(c))
+                futures.append(fut)
+            return [fut.result() for fut in futures]
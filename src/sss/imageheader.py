@@ -0,0 +1,111 @@
+"""Format und Abmessungen direkt aus dem Dateikopf lesen.
+
+Unterstützt PNG (IHDR), JPEG (SOFn-Marker), GIF, BMP und WebP
+(VP8/VP8L/VP8X), ohne Pillow zu importieren. Gelesen werden nur die ersten
+HEADER_BYTES; bei JPEGs mit großem EXIF-Block wird gezielt von Segment zu
+Segment gesprungen, statt die Datei zu dekodieren.
+"""
+
+import struct
+from typing import BinaryIO
+
+HEADER_BYTES = 4096
+
+# SOFn: C0-CF ohne DHT (C4), JPG (C8) und DAC (CC)
+_JPEG_SOF = frozenset(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+# Marker ohne Längenfeld
+_JPEG_STANDALONE = frozenset([0x01, 0xD8, *range(0xD0, 0xD8)])
+
+
+def parse_image_header(head: bytes) -> tuple[str, int, int] | None:
+    """
+    Liefert (format, breite, höhe) aus den ersten Bytes einer Datei oder None,
+    wenn das Format unbekannt ist bzw. die Bytes nicht ausreichen.
+    format ist wie bei Pillow: "PNG", "JPEG", "GIF", "BMP", "WEBP".
+    """
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        if len(head) >= 24 and head[12:16] == b"IHDR":
+            w, h = struct.unpack(">II", head[16:24])
+            return "PNG", w, h
+        return None
+
+    if head.startswith(b"\xff\xd8"):
+        size = _jpeg_size(lambda pos, n: head[pos : pos + n])
+        return ("JPEG", *size) if size else None
+
+    if head[:6] in (b"GIF87a", b"GIF89a") and len(head) >= 10:
+        w, h = struct.unpack("<HH", head[6:10])
+        return "GIF", w, h
+
+    if head.startswith(b"BM") and len(head) >= 26:
+        (dib_size,) = struct.unpack("<I", head[14:18])
+        if dib_size == 12:  # OS/2 BITMAPCOREHEADER
+            w, h = struct.unpack("<HH", head[18:22])
+        else:
+            w, h = struct.unpack("<ii", head[18:26])
+        return "BMP", abs(w), abs(h)  # negative Höhe = top-down
+
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return _webp_size(head)
+
+    return None
+
+
+def read_image_header(f: BinaryIO) -> tuple[str, int, int] | None:
+    """
+    Wie parse_image_header, aber auf einer geöffneten Binärdatei.
+    Liest HEADER_BYTES; nur bei JPEG wird bei Bedarf weiter gesprungen.
+    """
+    head = f.read(HEADER_BYTES)
+    info = parse_image_header(head)
+    if info is not None or not head.startswith(b"\xff\xd8"):
+        return info
+
+    def read_at(pos: int, n: int) -> bytes:
+        if pos + n <= len(head):
+            return head[pos : pos + n]
+        f.seek(pos)
+        return f.read(n)
+
+    size = _jpeg_size(read_at)
+    return ("JPEG", *size) if size else None
+
+
+def _jpeg_size(read_at) -> tuple[int, int] | None:
+    """Läuft die Marker-Segmente ab bis zum ersten SOFn."""
+    pos = 2
+    while True:
+        seg = read_at(pos, 9)
+        if len(seg) < 4 or seg[0] != 0xFF:
+            return None
+        marker = seg[1]
+        if marker == 0xFF:  # Füllbyte
+            pos += 1
+            continue
+        if marker in _JPEG_STANDALONE:
+            pos += 2
+            continue
+        if marker in _JPEG_SOF:
+            if len(seg) < 9:
+                return None
+            h, w = struct.unpack(">HH", seg[5:9])
+            return w, h
+        if marker in (0xD9, 0xDA):  # EOI/SOS vor einem SOF -> kaputt
+            return None
+        (length,) = struct.unpack(">H", seg[2:4])
+        pos += 2 + length
+
+
+def _webp_size(head: bytes) -> tuple[str, int, int] | None:
+    chunk = head[12:16]
+    if chunk == b"VP8 " and len(head) >= 30 and head[23:26] == b"\x9d\x01\x2a":
+        w, h = struct.unpack("<HH", head[26:30])
+        return "WEBP", w & 0x3FFF, h & 0x3FFF
+    if chunk == b"VP8L" and len(head) >= 25 and head[20] == 0x2F:
+        (bits,) = struct.unpack("<I", head[21:25])
+        return "WEBP", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8X" and len(head) >= 30:
+        w = int.from_bytes(head[24:27], "little") + 1
+        h = int.from_bytes(head[27:30], "little") + 1
+        return "WEBP", w, h
+    return None
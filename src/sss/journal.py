@@ -0,0 +1,193 @@
+"""Write-Ahead-Journal für Verschiebe-Läufe (JSON Lines, nur anhängen).
+
+Bevor eine Datei bewegt wird, steht ihre Absicht (quelle, ziel) im Journal
+und ist per fsync auf der Platte; danach folgt ein done- bzw. failed-Eintrag.
+Hat der Lauf den Zielnamen selbst belegt (Platzhalter, unique), steht
+dazwischen ein claimed-Eintrag: nur dann gehört ein vorhandenes Ziel sicher
+zu dieser Absicht und nicht einem anderen Prozess.
+fsync passiert blockweise (sync_every Absichten), nicht pro Datei.
+
+Bricht ein Lauf ab, kennt `sss resume <journal>` alle offenen Aktionen samt
+endgültigem Zielnamen und kann sie zu Ende führen oder zurückrollen – ohne
+den Quellbaum erneut zu durchlaufen oder zu hashen.
+
+Format, eine JSON-Zeile pro Eintrag:
+    {"op": "begin", "version": 1, "command": "scan", "unique": true, ...}
+    {"op": "intent", "i": 0, "src": "...", "dst": "..."}
+    {"op": "claimed", "i": 0}
+    {"op": "done", "i": 0}
+    {"op": "failed", "i": 1, "error": "..."}
+    {"op": "end"}
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from .cachedir import default_cache_dir
+
+JOURNAL_VERSION = 1
+DEFAULT_SYNC_EVERY = 1000
+
+
+def default_journal_dir() -> Path:
+    return default_cache_dir() / "journals"
+
+
+def new_journal_path(command: str) -> Path:
+    """Eindeutiger Journal-Pfad im Default-Verzeichnis."""
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return default_journal_dir() / f"{stamp}-{command}-{os.getpid()}.jsonl"
+
+
+class Journal:
+    """
+    Schreibt ein Journal. Mit `with` wird beim sauberen Verlassen ein
+    end-Eintrag geschrieben; bei einer Exception bleibt das Journal offen
+    und damit fortsetzbar.
+
+    - command: Name des Laufs (nur zur Anzeige)
+    - unique: True, wenn Zielnamen per O_EXCL reserviert wurden (scan);
+      dann darf resume --rollback Platzhalter im Ziel löschen
+    - sync_every: so viele Absichten werden gesammelt, bevor fsync läuft
+    """
+
+    def __init__(
+        self,
+        path: Path | str,
+        *,
+        command: str,
+        unique: bool,
+        sync_every: int = DEFAULT_SYNC_EVERY,
+        _append: bool = False,
+    ):
+        if sync_every < 1:
+            raise ValueError("sync_every must be >= 1")
+        self.path = Path(path)
+        self.sync_every = sync_every
+        self.sync_seconds = 0.0  # Gesamtdauer aller sync()-Aufrufe
+        self._next = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._f = open(self.path, "a" if _append else "x", encoding="utf-8")
+        if not _append:
+            self._write(
+                op="begin",
+                version=JOURNAL_VERSION,
+                command=command,
+                unique=unique,
+                started=time.time(),
+            )
+            self.sync()
+
+    @classmethod
+    def reopen(cls, state: "JournalState") -> "Journal":
+        """Hängt an ein bestehendes Journal an (für resume)."""
+        journal = cls(
+            state.path, command=state.command, unique=state.unique, _append=True
+        )
+        journal._next = max(state.intents, default=-1) + 1
+        return journal
+
+    def _write(self, **record) -> None:
+        self._f.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+    def intent(self, src: Path, dst: Path) -> int:
+        """Protokolliert eine geplante Verschiebung; liefert ihren Index."""
+        i = self._next
+        self._next += 1
+        self._write(op="intent", i=i, src=os.fspath(src), dst=os.fspath(dst))
+        return i
+
+    def claimed(self, i: int) -> None:
+        """Der Zielname der Absicht i ist von diesem Lauf belegt (O_EXCL)."""
+        self._write(op="claimed", i=i)
+
+    def done(self, i: int) -> None:
+        self._write(op="done", i=i)
+
+    def failed(self, i: int, exc: BaseException) -> None:
+        self._write(op="failed", i=i, error=str(exc))
+
+    def sync(self) -> None:
+        start = time.perf_counter()
+        self._f.flush()
+        os.fsync(self._f.fileno())
+        self.sync_seconds += time.perf_counter() - start
+
+    def close(self, *, complete: bool = True) -> None:
+        if self._f.closed:
+            return
+        if complete:
+            self._write(op="end")
+        self.sync()
+        self._f.close()
+
+    def __enter__(self) -> "Journal":
+        return self
+
+    def __exit__(self, exc_type, *exc) -> None:
+        self.close(complete=exc_type is None)
+
+
+@dataclass(slots=True, kw_only=True)
+class JournalState:
+    """Gelesener Zustand eines Journals."""
+
+    path: Path
+    command: str
+    unique: bool
+    intents: dict[int, tuple[Path, Path]] = field(default_factory=dict)
+    finished: set[int] = field(default_factory=set)
+    claimed: set[int] = field(default_factory=set)
+    complete: bool = False
+
+    @property
+    def pending(self) -> list[tuple[int, Path, Path]]:
+        """Absichten ohne done/failed, in Journal-Reihenfolge."""
+        return [
+            (i, src, dst)
+            for i, (src, dst) in self.intents.items()
+            if i not in self.finished
+        ]
+
+
+def read_journal(path: Path | str) -> JournalState:
+    """
+    Liest ein Journal. Eine abgeschnittene letzte Zeile (Absturz mitten im
+    Schreiben) wird ignoriert; kaputte Zeilen davor sind ein ValueError.
+    """
+    path = Path(path)
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().split("\n")
+    if lines and lines[-1] == "":
+        lines.pop()
+
+    records = []
+    for n, line in enumerate(lines, 1):
+        try:
+            records.append(json.loads(line))
+        except json.JSONDecodeError:
+            if n == len(lines):
+                break
+            raise ValueError(f"{path}:{n}: kaputter Journal-Eintrag") from None
+
+    if not records or records[0].get("op") != "begin":
+        raise ValueError(f"{path}: kein sss-Journal")
+    head = records[0]
+    if head.get("version") != JOURNAL_VERSION:
+        raise ValueError(f"{path}: unbekannte Journal-Version {head.get('version')}")
+
+    state = JournalState(path=path, command=head["command"], unique=head["unique"])
+    for rec in records[1:]:
+        op = rec.get("op")
+        if op == "intent":
+            state.intents[rec["i"]] = (Path(rec["src"]), Path(rec["dst"]))
+        elif op == "claimed":
+            state.claimed.add(rec["i"])
+        elif op in ("done", "failed"):
+            state.finished.add(rec["i"])
+        elif op == "end":
+            state.complete = True
+    return state
@@ -1,12 +1,24 @@
 """Utility module for extracting file metadata:
 - file extension, size, sha256 hash, MIME type
-- optional image width/height via Pillow
+- optional image width/height, parsed from the file header
+  (Pillow is only imported for formats the header parser doesn't know)
+
+extract_metadata reads each file once: the image header is parsed from
+the first bytes of the same read that feeds the digest.
 """
 
 from pathlib import Path
-import hashlib
+import io
 import mimetypes
-from PIL import Image, UnidentifiedImageError
+import os
+
+from .hashcache import DigestCache
+from .hashing import HashEngine, file_digest, file_digest_head
+from .imageheader import read_image_header
+
+# Prefix kept from the hashing pass for the header parser. Large enough
+# for JPEGs whose SOF marker sits behind an EXIF block with a thumbnail.
+HEAD_SCAN_BYTES = 64 * 1024
 
 
 def get_file_ext(path: Path | str) -> str:
@@ -21,14 +33,46 @@ def get_file_size(path: Path | str) -> int:
     return p.stat().st_size
 
 
-def get_sha256(path: Path | str) -> str:
-    """Return SHA-256 hex digest of file content."""
+def get_sha256(path: Path | str, *, cache: DigestCache | None = None) -> str:
+    """Return SHA-256 hex digest of file content.
+
+    With a DigestCache, a cached digest is returned as long as the file's
+    stat signature is unchanged.
+    """
     p = Path(path)
-    h = hashlib.sha256()
-    with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
+    if cache is not None:
+        st = p.stat()
+        cached = cache.lookup(p, st)
+        if cached is not None:
+            return cached
+    digest = file_digest(p, "sha256")
+    if cache is not None:
+        cache.store(p, st, digest)
+    return digest
+
+
+def get_sha256_many(
+    paths: list[Path | str], *, jobs: int = 1, cache: DigestCache | None = None
+) -> list[str]:
+    """Return SHA-256 hex digests for many files, in input order.
+
+    Cache lookups happen on the calling thread; only misses are hashed
+    on the shared HashEngine.
+    """
+    ps = [Path(p) for p in paths]
+    stats = [p.stat() for p in ps]
+    digests: list[str | None] = [
+        cache.lookup(p, st) if cache is not None else None for p, st in zip(ps, stats)
+    ]
+    todo = [i for i, d in enumerate(digests) if d is None]
+    fresh = HashEngine(jobs).map(
+        lambda i: get_sha256(ps[i]), todo, sizes=[stats[i].st_size for i in todo]
+    )
+    for i, digest in zip(todo, fresh):
+        digests[i] = digest
+        if cache is not None:
+            cache.store(ps[i], stats[i], digest)
+    return digests
 
 
 def get_mime_type(path: Path | str) -> str:
@@ -41,26 +85,82 @@ def get_mime_type(path: Path | str) -> str:
 
 
 def get_image_size(path: Path | str) -> tuple[int, int]:
-    """Return (width, height) for image files."""
+    """Return (width, height) for image files.
+
+    PNG, JPEG, GIF, BMP and WebP are read from the first few KB of the
+    file; anything else falls back to Pillow. Raises OSError (Pillow's
+    UnidentifiedImageError) if the file is not a readable image.
+    """
     p = Path(path)
-    with Image.open(p) as img:
+    with p.open("rb") as f:
+        info = read_image_header(f)
+    if info is not None:
+        _fmt, w, h = info
+        return w, h
+    return _pillow_image_size(p)
+
+
+def _pillow_image_size(path: Path) -> tuple[int, int]:
+    from PIL import Image
+
+    with Image.open(path) as img:
         return img.size  # (width, height)
 
 
-def extract_metadata(path: Path | str) -> dict:
-    """Collect basic metadata (ext, size, sha256, mime, optional width/height)."""
-    p = Path(path)
+def _extract(p: Path, st: os.stat_result, digest: str | None) -> dict:
+    """Metadata for one file; digest is None unless it came from the cache."""
+    mime = get_mime_type(p)
+    is_image = mime.startswith("image/")
+    head = None
+    if digest is None:
+        digest, head = file_digest_head(
+            p, "sha256", head_size=HEAD_SCAN_BYTES if is_image else 0
+        )
     md = {
         "ext": get_file_ext(p),
-        "size": get_file_size(p),
-        "sha256": get_sha256(p),
-        "mime": get_mime_type(p),
+        "size": st.st_size,
+        "sha256": digest,
+        "mime": mime,
     }
-    if md["mime"].startswith("image/"):
+    if is_image:
         try:
-            w, h = get_image_size(p)
+            info = read_image_header(io.BytesIO(head)) if head is not None else None
+            if info is not None:
+                _fmt, w, h = info
+            else:  # cache hit, unusual JPEG layout or unknown format
+                w, h = get_image_size(p)
             md["width"] = w
             md["height"] = h
-        except UnidentifiedImageError:
+        except OSError:  # includes PIL.UnidentifiedImageError
             pass
     return md
+
+
+def extract_metadata(path: Path | str, *, cache: DigestCache | None = None) -> dict:
+    """Collect basic metadata (ext, size, sha256, mime, optional width/height)."""
+    return extract_metadata_many([path], cache=cache)[0]
+
+
+def extract_metadata_many(
+    paths: list[Path | str], *, jobs: int = 1, cache: DigestCache | None = None
+) -> list[dict]:
+    """Like extract_metadata for many files, in input order.
+
+    Files are read on a HashEngine thread pool (hashlib releases the GIL);
+    cache lookups and stores stay on the calling thread.
+    """
+    ps = [Path(p) for p in paths]
+    stats = [p.stat() for p in ps]
+    cached: list[str | None] = [
+        cache.lookup(p, st) if cache is not None else None for p, st in zip(ps, stats)
+    ]
+    results = HashEngine(jobs).map(
+        lambda i: _extract(ps[i], stats[i], cached[i]),
+        range(len(ps)),
+        sizes=[st.st_size for st in stats],
+    )
+    if cache is not None:
+        for p, st, digest, md in zip(ps, stats, cached, results):
+            if digest is None:
+                cache.store(p, st, md["sha256"])
+    return results
@@ -1,39 +1,656 @@
+from collections import defaultdict
+import contextlib
+from collections.abc import Iterable
+from dataclasses import dataclass, field
 from pathlib import Path
-from datetime import datetime
+import errno
+import os
 import shutil
-from .renamer import unique_path
-from .dedupe import DedupAction
+import stat
+import time
+from typing import TYPE_CHECKING
+from .dates import capture_date
+from .renamer import NameAllocator
+from .scanner import FileRecord
 
+if TYPE_CHECKING:
+    from .dates import DateResolver
 
-def build_target_path(file_path: Path, out_root: Path) -> Path:
-    ts = file_path.stat().st_mtime
-    dt = datetime.fromtimestamp(ts)
+    # nur für Annotationen: dedupe zieht hashlib/sqlite3 nach sich
+    from .dedupe import DedupAction
+    from .journal import Journal
+
+
+LINK_ACTIONS = ("hardlink", "reflink")
+
+
+def build_target_path(
+    file_path: Path | FileRecord,
+    out_root: Path,
+    *,
+    dates: "DateResolver | None" = None,
+) -> Path:
+    """
+    <out_root>/<jahr>/<monat> nach Aufnahmedatum (EXIF/PNG-Kopf, Dateiname,
+    sonst mtime; siehe dates). dates: DateResolver mit Cache, sonst wird
+    der Kopf jedes Mal gelesen.
+    """
+    # FileRecord bringt die mtime schon mit -> kein weiterer stat-Aufruf
+    dt = dates(file_path) if dates is not None else capture_date(file_path)
     year = f"{dt:%Y}"
     month = f"{dt:%m}"
     return out_root / year / month
 
 
-def safe_move(src: Path, dest_dir: Path) -> Path:
-    dest_path = unique_path(dest_dir, src.name)
+def safe_move(
+    src: Path | FileRecord,
+    dest_dir: Path,
+    *,
+    allocator: NameAllocator | None = None,
+    journal: "Journal | None" = None,
+) -> Path:
+    """
+    Verschiebt src nach dest_dir, ohne etwas zu überschreiben.
+    allocator: wiederverwendeter NameAllocator für dest_dir (z. B. in watch),
+    spart das erneute Listen des Ordners.
+    journal: Absicht vor dem Verschieben protokollieren (mit fsync).
+    """
+    if isinstance(src, FileRecord):
+        src = src.path
     dest_dir.mkdir(parents=True, exist_ok=True)
-    shutil.move(str(src), dest_path)
+    alloc = allocator or NameAllocator(dest_dir)
+    if journal is not None:
+        dest_path = alloc.dest_dir / alloc.next_name(src.name)
+        idx = journal.intent(src, dest_path)
+        journal.sync()
+        dest_path, idx = _occupy(alloc, src, src.name, dest_path, idx, journal)
+        try:
+            try:
+                os.replace(src, dest_path)
+            except OSError as exc:
+                if exc.errno != errno.EXDEV:
+                    raise
+                journal.sync()  # claimed vor der halben Kopie auf die Platte
+                _copy_then_unlink(src, dest_path)
+        except OSError as exc:
+            journal.failed(idx, exc)
+            with contextlib.suppress(OSError):
+                os.unlink(dest_path)
+            raise
+        journal.done(idx)
+        _note_index([(src, dest_path)])
+        return dest_path
+
+    dest_path, moved = _move_unique(src, alloc, src.name)
+    if not moved:
+        _copy_then_unlink(src, dest_path)
+    _note_index([(src, dest_path)])
     return dest_path
 
 
-def execute_actions(actions: list[DedupAction]) -> None:
+def _note_index(moved: list[tuple[Path, Path]]) -> None:
+    """Ziele in einem Archiv mit Digest-Index dort vormerken (dedupe --against)."""
+    if not moved:
+        return
+    from .digestindex import note_moved
+
+    # der Index ist nur ein Beschleuniger; was hier scheitert, holt
+    # dedupe --rebuild-index nach – die Verschiebung selbst gilt
+    with contextlib.suppress(OSError):
+        note_moved(moved)
+
+
+def _move_unique(src: Path, alloc: NameAllocator, name: str) -> tuple[Path, bool]:
     """
-    Führt die übergebenen DedupActions aus.
-    Aktuell unterstützen wir nur: action == 'move'.
+    Verschiebt src unter einem freien Namen in alloc.dest_dir.
+
+    Der Name wird atomar belegt: per Hardlink (danach Quelle löschen) oder,
+    wo Hardlinks nicht gehen, per O_EXCL-Platzhalter, den os.replace ersetzt.
+    Liefert (ziel, True) oder bei anderem Dateisystem (platzhalter, False);
+    dann muss der Aufrufer kopieren.
     """
-    for act in actions:
-        src = act.src if isinstance(act.src, Path) else Path(act.src)
-        dst = act.dst if isinstance(act.dst, Path) else Path(act.dst)
+    try:
+        dst = alloc.link(src, name)
+    except FileNotFoundError:
+        raise
+    except OSError as exc:
+        dst = alloc.claim(name)
+        if exc.errno == errno.EXDEV:
+            return dst, False
+        try:
+            os.replace(src, dst)
+        except OSError:
+            os.unlink(dst)
+            raise
+        return dst, True
+    try:
+        os.unlink(src)
+    except OSError:
+        os.unlink(dst)
+        raise
+    return dst, True
+
+
+DEFAULT_COPY_WORKERS = 4
+
+
+@dataclass(slots=True, kw_only=True)
+class MoveReport:
+    """Ergebnis von execute_moves."""
+
+    moved: list[tuple[Path, Path]] = field(default_factory=list)
+    renamed: int = 0
+    copied: int = 0
+    dirs: int = 0
+    # hardlink/reflink-Aktionen: (keeper, ersetztes Duplikat)
+    linked: list[tuple[Path, Path]] = field(default_factory=list)
+    hardlinks: int = 0
+    reflinks: int = 0
+    skipped: int = 0  # Link nicht möglich (anderes Gerät, ...), Datei bleibt
+    bytes_saved: int = 0
+    errors: list[tuple[Path, OSError]] = field(default_factory=list)
+    timings: dict[str, float] = field(default_factory=dict)
+
+    def render(self) -> str:
+        stages = ", ".join(f"{k} {v:.3f}s" for k, v in self.timings.items())
+        links = ""
+        if self.linked or self.skipped:
+            links = (
+                f"verlinkt={len(self.linked)} (reflink={self.reflinks}, "
+                f"hardlink={self.hardlinks}, übersprungen={self.skipped}, "
+                f"gespart={self.bytes_saved / (1024 * 1024):.2f} MB) | "
+            )
+        return (
+            f"Ausführung: verschoben={len(self.moved)} (rename={self.renamed}, "
+            f"kopiert={self.copied}) | {links}ordner={self.dirs} | "
+            f"fehler={len(self.errors)} | {stages}"
+        )
+
+    def merge(self, other: "MoveReport") -> None:
+        """Addiert einen weiteren Report (z. B. aus dem nächsten Bündel)."""
+        self.moved += other.moved
+        self.linked += other.linked
+        self.errors += other.errors
+        for name in (
+            "renamed",
+            "copied",
+            "dirs",
+            "hardlinks",
+            "reflinks",
+            "skipped",
+            "bytes_saved",
+        ):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        for stage, seconds in other.timings.items():
+            self.timings[stage] = self.timings.get(stage, 0.0) + seconds
 
-        # Zielordner anlegen, falls nötig
-        dst.parent.mkdir(parents=True, exist_ok=True)
 
-        if act.action == "move":
-            # Datei verschieben/umbenennen
-            src.replace(dst)
+def _copy_then_unlink(src: Path, dst: Path) -> None:
+    # wie shutil.move über Gerätegrenzen: erst vollständig kopieren, dann löschen
+    shutil.copy2(src, dst)
+    os.unlink(src)
+
+
+def execute_moves(
+    moves: Iterable[tuple[Path | FileRecord, Path]],
+    *,
+    unique: bool = True,
+    workers: int = DEFAULT_COPY_WORKERS,
+    journal: "Journal | None" = None,
+    allocators: dict[Path, NameAllocator | None] | None = None,
+) -> MoveReport:
+    """
+    Führt einen ganzen Plan (quelle, ziel) gebündelt pro Zielordner aus.
+
+    - Jeder Zielordner wird genau einmal angelegt.
+    - unique=True: Namenskonflikte (vorhandene Dateien oder frühere Einträge
+      im selben Plan) bekommen ein ' (n)'; ein NameAllocator pro Ordner
+      listet ihn einmal und belegt Namen atomar (siehe _move_unique).
+      unique=False: vorhandene Ziele werden per os.replace ersetzt.
+    - Bei EXDEV (anderes Dateisystem) wird auf einem Pool mit `workers`
+      Threads kopiert und die Quelle danach gelöscht.
+
+    - journal: Write-Ahead-Journal; jede Verschiebung wird vorher als
+      Absicht protokolliert (siehe _rename_journaled) und ist nach einem
+      Abbruch mit resume_journal fortsetzbar.
+    - allocators: über mehrere Aufrufe geteilter Zustand (Pipeline-Bündel);
+      bereits bekannte Zielordner werden weder neu angelegt noch neu gelistet.
+
+    Fehler einzelner Dateien brechen den Lauf nicht ab, sie landen in
+    report.errors. report.timings enthält die Dauer jeder Stufe; mit
+    journal steht die fsync-Zeit getrennt unter "fsync".
+    """
+    if workers < 1:
+        raise ValueError("workers must be >= 1")
+    report = MoveReport()
+    clock = time.perf_counter
+
+    def synced() -> float:
+        return journal.sync_seconds if journal is not None else 0.0
+
+    synced_before = synced()
+
+    # 1) nach Zielordner gruppieren
+    start = clock()
+    by_dir: dict[Path, list[tuple[Path, str]]] = defaultdict(list)
+    for src, dst in moves:
+        src = src.path if isinstance(src, FileRecord) else Path(src)
+        dst = Path(dst)
+        by_dir[dst.parent].append((src, dst.name))
+    report.timings["plan"] = clock() - start
+
+    # 2) Ordner einmal anlegen
+    start = clock()
+    resolved: list[tuple[Path, Path, str, NameAllocator | None]] = []
+    for dest_dir, entries in by_dir.items():
+        if allocators is not None and dest_dir in allocators:
+            alloc = allocators[dest_dir]
         else:
+            try:
+                os.makedirs(dest_dir, exist_ok=True)
+            except OSError as exc:
+                report.errors.extend((src, exc) for src, _name in entries)
+                continue
+            report.dirs += 1
+            alloc = NameAllocator(dest_dir) if unique else None
+            if allocators is not None:
+                allocators[dest_dir] = alloc
+        resolved.extend((src, dest_dir, name, alloc) for src, name in entries)
+    report.timings["mkdir"] = clock() - start
+
+    # 3) gleiches Gerät: rename bzw. Hardlink auf einen freien Namen
+    start, sync_start = clock(), synced()
+    cross_device: list[tuple[Path, Path, int | None]] = []
+    if journal is not None:
+        _rename_journaled(resolved, journal, report, cross_device)
+        resolved = []
+    for src, dest_dir, name, alloc in resolved:
+        try:
+            if alloc is not None:
+                dst, moved = _move_unique(src, alloc, name)
+            else:
+                dst, moved = dest_dir / name, True
+                try:
+                    os.replace(src, dst)
+                except OSError as exc:
+                    if exc.errno != errno.EXDEV:
+                        raise
+                    moved = False
+        except OSError as exc:
+            report.errors.append((src, exc))
+            continue
+        if not moved:
+            cross_device.append((src, dst, None))
+            continue
+        report.renamed += 1
+        report.moved.append((src, dst))
+    report.timings["rename"] = clock() - start - (synced() - sync_start)
+
+    # 4) anderes Gerät: kopieren auf einem begrenzten Pool
+    start, sync_start = clock(), synced()
+    if cross_device:
+        from concurrent.futures import ThreadPoolExecutor
+
+        if journal is not None:
+            journal.sync()  # claimed vor den halben Kopien auf die Platte
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                (src, dst, idx, pool.submit(_copy_then_unlink, src, dst))
+                for src, dst, idx in cross_device
+            ]
+            for src, dst, idx, fut in futures:
+                try:
+                    fut.result()
+                except OSError as exc:
+                    report.errors.append((src, exc))
+                    if idx is not None:
+                        journal.failed(idx, exc)
+                    if unique:
+                        # reservierten Platzhalter wieder freigeben
+                        with contextlib.suppress(OSError):
+                            os.unlink(dst)
+                    continue
+                if idx is not None:
+                    journal.done(idx)
+                report.copied += 1
+                report.moved.append((src, dst))
+    if journal is not None:
+        journal.sync()
+    report.timings["copy"] = clock() - start - (synced() - sync_start)
+    if journal is not None:
+        report.timings["fsync"] = synced() - synced_before
+    _note_index(report.moved)
+    return report
+
+
+def _occupy(
+    alloc: NameAllocator,
+    src: Path,
+    name: str,
+    dst: Path,
+    idx: int,
+    journal: "Journal",
+) -> tuple[Path, int]:
+    """
+    Legt den schon protokollierten (und per fsync gesicherten) Zielnamen dst
+    als Platzhalter an und protokolliert das (claimed). Hat ihn ein anderer
+    Prozess inzwischen belegt, wird die Absicht als failed markiert und der
+    nächste freie Name ebenso erst protokolliert, dann belegt. Liefert
+    (ziel, index der gültigen Absicht).
+    """
+    while True:
+        try:
+            alloc.take(dst.name)
+        except OSError as exc:
+            journal.failed(idx, exc)
+            if not isinstance(exc, FileExistsError):
+                raise
+        else:
+            journal.claimed(idx)
+            return dst, idx
+        dst = alloc.dest_dir / alloc.next_name(name)
+        idx = journal.intent(src, dst)
+        journal.sync()
+
+
+def _rename_journaled(
+    resolved: list[tuple[Path, Path, str, NameAllocator | None]],
+    journal: "Journal",
+    report: MoveReport,
+    cross_device: list[tuple[Path, Path, int | None]],
+) -> None:
+    """
+    Stufe 3 mit Write-Ahead-Journal.
+
+    Blockweise (journal.sync_every): erst alle Zielnamen (laut
+    NameAllocator) als Absicht schreiben, dann fsync, dann die Namen per
+    O_EXCL belegen und verschieben. Jeder Platzhalter im Ziel steht also
+    schon im Journal, bevor er entsteht; resume kann ihn immer aufräumen.
+    """
+    step = journal.sync_every
+    for lo in range(0, len(resolved), step):
+        planned = []
+        for src, dest_dir, name, alloc in resolved[lo : lo + step]:
+            dst = dest_dir / (alloc.next_name(name) if alloc is not None else name)
+            planned.append((src, dst, name, alloc, journal.intent(src, dst)))
+        journal.sync()
+
+        prepared = []
+        for src, dst, name, alloc, idx in planned:
+            if alloc is not None:
+                try:
+                    dst, idx = _occupy(alloc, src, name, dst, idx, journal)
+                except OSError as exc:
+                    report.errors.append((src, exc))
+                    continue
+            prepared.append((src, dst, alloc is not None, idx))
+
+        for src, dst, claimed, idx in prepared:
+            try:
+                os.replace(src, dst)
+            except OSError as exc:
+                if exc.errno == errno.EXDEV:
+                    cross_device.append((src, dst, idx))
+                    continue
+                report.errors.append((src, exc))
+                journal.failed(idx, exc)
+                if claimed:
+                    with contextlib.suppress(OSError):
+                        os.unlink(dst)
+                continue
+            journal.done(idx)
+            report.renamed += 1
+            report.moved.append((src, dst))
+
+
+def resume_journal(path: Path | str, *, rollback: bool = False) -> MoveReport:
+    """
+    Führt die offenen Aktionen eines abgebrochenen Laufs zu Ende
+    (rollback=False) oder macht sie rückgängig (rollback=True).
+
+    Der Zustand jeder offenen Aktion ergibt sich aus dem Dateisystem:
+    - Quelle noch da: nicht (fertig) verschoben -> verschieben bzw. den
+      reservierten Platzhalter/die halbe Kopie im Ziel löschen
+    - nur Ziel da: verschoben, aber nicht mehr quittiert -> quittieren bzw.
+      zurück an die Quelle legen
+    Bei unique gilt ein vorhandenes Ziel neben der Quelle nur als eigenes,
+    wenn es als claimed protokolliert oder ein leerer Platzhalter ist (siehe
+    _is_ours). Sonst gehört es einem anderen Prozess: es bleibt stehen, und
+    resume verschiebt unter den nächsten freien Namen.
+    Ergebnisse werden an dasselbe Journal angehängt, ein zweiter Abbruch
+    während resume ist also ebenfalls fortsetzbar.
+    """
+    from .journal import Journal, read_journal
+
+    state = read_journal(path)
+    report = MoveReport()
+    journal = Journal.reopen(state)
+    try:
+        for idx, src, dst in state.pending:
+            claimed = idx in state.claimed
+            try:
+                if rollback:
+                    _undo_move(
+                        src, dst, unique=state.unique, claimed=claimed, report=report
+                    )
+                else:
+                    dst, idx = _redo_move(
+                        src,
+                        dst,
+                        unique=state.unique,
+                        claimed=claimed,
+                        report=report,
+                        journal=journal,
+                        idx=idx,
+                    )
+            except OSError as exc:
+                report.errors.append((src, exc))
+                journal.failed(idx, exc)
+                continue
+            journal.done(idx)
+            report.moved.append((src, dst))
+    finally:
+        journal.close(complete=not report.errors)
+    if not rollback:
+        _note_index(report.moved)
+    return report
+
+
+def _is_ours(dst: Path, claimed: bool) -> bool:
+    """
+    Ob ein vorhandenes dst zur offenen Absicht gehört: als claimed
+    protokolliert oder ein leerer Platzhalter (beim Ersetzen geht dann
+    nichts verloren, auch wenn ihn ein anderer Prozess angelegt hat).
+    """
+    if claimed:
+        return True
+    st = os.lstat(dst)
+    return stat.S_ISREG(st.st_mode) and st.st_size == 0
+
+
+def _redo_move(
+    src: Path,
+    dst: Path,
+    *,
+    unique: bool,
+    claimed: bool,
+    report: MoveReport,
+    journal: "Journal",
+    idx: int,
+) -> tuple[Path, int]:
+    """Liefert (ziel, index der gültigen Absicht), siehe _occupy."""
+    if not os.path.lexists(src):
+        if os.path.lexists(dst):
+            return dst, idx  # schon verschoben, nur nicht mehr quittiert
+        raise FileNotFoundError(errno.ENOENT, "Quelle und Ziel fehlen", str(src))
+    os.makedirs(dst.parent, exist_ok=True)
+    if unique and not (os.path.lexists(dst) and _is_ours(dst, claimed)):
+        # Abbruch vor dem Belegen, oder ein anderer Prozess hat dst belegt:
+        # Namen jetzt (bzw. den nächsten freien) belegen, damit os.replace
+        # nichts Fremdes überschreibt
+        dst, idx = _occupy(NameAllocator(dst.parent), src, dst.name, dst, idx, journal)
+    try:
+        os.replace(src, dst)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        journal.sync()
+        _copy_then_unlink(src, dst)
+        report.copied += 1
+    else:
+        report.renamed += 1
+    return dst, idx
+
+
+def _undo_move(
+    src: Path, dst: Path, *, unique: bool, claimed: bool, report: MoveReport
+) -> None:
+    if os.path.lexists(src):
+        # Platzhalter oder halbe Kopie; bei unique=False oder fremdem dst
+        # (siehe _is_ours) bleibt es stehen
+        if unique and os.path.lexists(dst) and _is_ours(dst, claimed):
+            os.unlink(dst)
+        return
+    if not os.path.lexists(dst):
+        raise FileNotFoundError(errno.ENOENT, "Quelle und Ziel fehlen", str(src))
+    os.makedirs(src.parent, exist_ok=True)
+    try:
+        os.replace(dst, src)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        _copy_then_unlink(dst, src)
+        report.copied += 1
+    else:
+        report.renamed += 1
+
+
+# FICLONE aus linux/fs.h: dst teilt sich danach die Blöcke von src
+_FICLONE = 0x40049409
+
+# Fehler, bei denen Reflink bzw. Hardlink auf diesem Dateisystem nicht geht
+_NO_REFLINK = frozenset(
+    getattr(errno, e)
+    for e in ("EOPNOTSUPP", "ENOTSUP", "ENOTTY", "EINVAL", "EXDEV", "ENOSYS")
+    if hasattr(errno, e)
+)
+_NO_HARDLINK = frozenset(
+    getattr(errno, e)
+    for e in ("EXDEV", "EMLINK", "EPERM", "EOPNOTSUPP", "ENOTSUP")
+    if hasattr(errno, e)
+)
+
+
+def _reflink(src: Path, tmp: Path) -> None:
+    """Legt tmp als Reflink-Kopie von src an (nur Linux, z. B. btrfs/XFS)."""
+    import fcntl
+
+    with open(src, "rb") as fsrc:
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        try:
+            fcntl.ioctl(fd, _FICLONE, fsrc.fileno())
+        finally:
+            os.close(fd)
+
+
+def link_duplicate(keeper: Path, dup: Path, *, reflink: bool) -> str | None:
+    """
+    Ersetzt dup durch einen Hardlink bzw. Reflink auf keeper.
+
+    Der Link entsteht unter einem temporären Namen neben dup und wird per
+    os.replace atomar an dessen Stelle gesetzt; dup ist zu jedem Zeitpunkt
+    entweder die alte Datei oder der Link.
+
+    - reflink=True: FICLONE, sonst Rückfall auf Hardlink
+    - Liefert "reflink", "hardlink", "same" (schon dieselbe Datei) oder
+      None, wenn weder Reflink noch Hardlink möglich ist (dup bleibt).
+    - Haben keeper und dup nicht mehr dieselbe Größe, ist das ein OSError
+      (Datei wurde seit der Planung geändert).
+    """
+    st_keep, st_dup = os.stat(keeper), os.stat(dup)
+    if (st_keep.st_dev, st_keep.st_ino) == (st_dup.st_dev, st_dup.st_ino):
+        return "same"
+    if st_keep.st_size != st_dup.st_size:
+        raise OSError(errno.EINVAL, "Größe seit der Planung geändert", str(dup))
+
+    tmp = dup.with_name(f".{dup.name}.sss-{os.getpid()}.tmp")
+    kind = None
+    try:
+        if reflink and os.name == "posix":
+            try:
+                _reflink(keeper, tmp)
+            except (OSError, ImportError) as exc:
+                if isinstance(exc, OSError) and exc.errno not in _NO_REFLINK:
+                    raise
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(tmp)
+            else:
+                # Reflink ist eine eigene Datei: Rechte/Zeiten des Duplikats
+                shutil.copystat(dup, tmp)
+                kind = "reflink"
+        if kind is None:
+            try:
+                os.link(keeper, tmp)
+            except OSError as exc:
+                if exc.errno in _NO_HARDLINK:
+                    return None
+                raise
+            kind = "hardlink"
+        os.replace(tmp, dup)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+    return kind
+
+
+def _execute_links(actions: list["DedupAction"], report: MoveReport) -> None:
+    for act in actions:
+        try:
+            kind = link_duplicate(
+                Path(act.src), Path(act.dst), reflink=act.action == "reflink"
+            )
+        except OSError as exc:
+            report.errors.append((Path(act.dst), exc))
+            continue
+        if kind is None:
+            report.skipped += 1
+            continue
+        if kind == "hardlink":
+            report.hardlinks += 1
+        elif kind == "reflink":
+            report.reflinks += 1
+        if kind != "same":
+            report.bytes_saved += os.stat(act.dst).st_size
+        report.linked.append((Path(act.src), Path(act.dst)))
+
+
+def execute_actions(
+    actions: list["DedupAction"], *, journal: "Journal | None" = None
+) -> MoveReport:
+    """
+    Führt die übergebenen DedupActions aus. Der erste Fehler wird nach dem
+    Lauf erneut ausgelöst.
+
+    - move: gebündelt über execute_moves (src -> dst; belegte Ziele, auch
+      gleichnamige Dateien aus verschiedenen Ordnern, bekommen ein ' (n)',
+      nichts wird überschrieben; mit journal fortsetzbar)
+    - hardlink/reflink: dst (Duplikat) wird durch einen Link auf src
+      (Keeper) ersetzt, siehe link_duplicate. Das ist pro Datei atomar und
+      braucht daher kein Journal.
+    """
+    for act in actions:
+        if act.action not in LINK_ACTIONS and act.action != "move":
             raise ValueError(f"Unsupported action: {act.action!r}")
+
+    report = execute_moves(
+        ((a.src, a.dst) for a in actions if a.action == "move"),
+        unique=True,
+        journal=journal,
+    )
+    start = time.perf_counter()
+    _execute_links([a for a in actions if a.action in LINK_ACTIONS], report)
+    report.timings["link"] = time.perf_counter() - start
+    if report.errors:
+        raise report.errors[0][1]
+    return report
@@ -0,0 +1,75 @@
+"""Ausgabe für scan/dedupe: Text für Menschen oder JSON Lines für Skripte.
+
+- text: wie bisher, eine oder zwei Zeilen pro Datei
+- jsonl: ein kompakter JSON-Datensatz pro geplanter/ausgeführter Aktion,
+  am Ende ein {"type": "summary", ...}; keine Emoji, keine Datumsformate
+- quiet: pro Datei nichts, nur die Zusammenfassung
+
+Geschrieben wird direkt in den (gepufferten) stdout-Stream, ohne flush pro
+Zeile; geleert wird bei jeder Zusammenfassung. Die Ausgabe wird gestreamt,
+nichts wird für später gesammelt. (scan sortiert trotzdem standardmäßig
+und listet dafür erst den ganzen Ordner; ganz ohne Liste nur mit --no-sort.)
+"""
+
+import json
+import os
+import sys
+from typing import TextIO
+
+FORMATS = ("text", "jsonl")
+
+
+def _default(obj):
+    if isinstance(obj, os.PathLike):
+        return os.fspath(obj)
+    raise TypeError(f"not JSON serializable: {type(obj).__name__}")
+
+
+class Output:
+    """
+    - fmt: "text" oder "jsonl"
+    - quiet: nur Zusammenfassungen ausgeben
+    - stream: Ziel (default: sys.stdout zum Zeitpunkt der Erzeugung)
+    """
+
+    __slots__ = ("fmt", "quiet", "lines", "records", "_stream", "_encode")
+
+    def __init__(
+        self, fmt: str = "text", *, quiet: bool = False, stream: TextIO | None = None
+    ):
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown format {fmt!r} (allowed: {', '.join(FORMATS)})")
+        self.fmt = fmt
+        self.quiet = quiet
+        # Aufrufer prüfen das vor teurer Formatierung
+        self.lines = fmt == "text" and not quiet
+        self.records = fmt == "jsonl" and not quiet
+        self._stream = stream if stream is not None else sys.stdout
+        self._encode = json.JSONEncoder(
+            separators=(",", ":"), ensure_ascii=False, default=_default
+        ).encode
+
+    def line(self, text: str) -> None:
+        """Zeile für Menschen (nur Textformat, nicht mit --quiet)."""
+        if self.lines:
+            self._stream.write(text + "\n")
+
+    def record(self, kind: str, **fields) -> None:
+        """Ein Datensatz pro Aktion (nur jsonl, nicht mit --quiet); kind landet in "type"."""
+        if self.records:
+            self._stream.write(self._encode({"type": kind, **fields}) + "\n")
+
+    def summary(self, text: str | None, record: dict | None = None) -> None:
+        """
+        Zusammenfassung: als Text (auch mit --quiet) bzw. in jsonl als
+        summary-Datensatz, sofern text bzw. record angegeben ist.
+        """
+        if self.fmt == "text":
+            if text is not None:
+                self._stream.write(text + "\n")
+        elif record is not None:
+            self._stream.write(self._encode({"type": "summary", **record}) + "\n")
+        self.flush()
+
+    def flush(self) -> None:
+        self._stream.flush()
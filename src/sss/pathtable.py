@@ -0,0 +1,92 @@
+"""Kompakte Ablage vieler Pfade, z. B. für DuplicateGroup.
+
+Ein Path-Objekt kostet samt zwischengespeicherter Teile mehrere hundert
+Bytes – bei Millionen Dateien weit mehr als die Daten selbst. PathTable
+legt jedes Verzeichnis nur einmal ab (interniert) und hängt die
+Dateinamen hintereinander an ein bytearray; pro Datei bleiben ein
+Verzeichnis-Index und ein End-Offset in arrays, dazu die Stat-Daten eines
+FileRecord als Spalten. Path- und FileRecord-Objekte entstehen erst beim
+Lesen (table[i], table.record(i)).
+"""
+
+import os
+import sys
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+
+from .scanner import FileRecord
+
+
+class PathTable:
+    """Nur anhängen: add() liefert den Index, table[i] den Path."""
+
+    __slots__ = ("_dirs", "_dir_ids", "_dir_of", "_names", "_ends", "_stats", "_inodes")
+
+    def __init__(self):
+        self._dirs: list[str] = []
+        self._dir_ids: dict[str, int] = {}
+        self._dir_of = array("I")
+        self._names = bytearray()
+        self._ends = array("Q")
+        # je Datei hintereinander: (size, mtime_ns) bzw. (ino, dev)
+        self._stats = array("q")
+        self._inodes = array("Q")
+
+    def add(self, path: Path | str | os.PathLike) -> int:
+        """Pfad ohne Stat-Daten (Spalten bleiben 0)."""
+        return self.add_record(path, 0, 0, 0, 0)
+
+    def add_record(
+        self,
+        path: Path | str | os.PathLike,
+        size: int,
+        mtime_ns: int,
+        ino: int = 0,
+        dev: int = 0,
+    ) -> int:
+        self._stats.extend((size, mtime_ns))
+        self._inodes.extend((ino, dev))
+        head, name = os.path.split(os.fspath(path))
+        dir_id = self._dir_ids.get(head)
+        if dir_id is None:
+            dir_id = self._dir_ids[head] = len(self._dirs)
+            self._dirs.append(head)
+        self._dir_of.append(dir_id)
+        self._names += os.fsencode(name)
+        self._ends.append(len(self._names))
+        return len(self._ends) - 1
+
+    def name(self, i: int) -> str:
+        start = self._ends[i - 1] if i else 0
+        return os.fsdecode(bytes(self._names[start : self._ends[i]]))
+
+    def __getitem__(self, i: int) -> Path:
+        return Path(os.path.join(self._dirs[self._dir_of[i]], self.name(i)))
+
+    def record(self, i: int) -> FileRecord:
+        s, n = self._stats, self._inodes
+        return FileRecord(self[i], s[2 * i], s[2 * i + 1], n[2 * i], n[2 * i + 1])
+
+    def __len__(self) -> int:
+        return len(self._ends)
+
+    def __iter__(self) -> Iterator[Path]:
+        return (self[i] for i in range(len(self)))
+
+    @property
+    def dirs(self) -> int:
+        """Anzahl verschiedener Verzeichnisse."""
+        return len(self._dirs)
+
+    def nbytes(self) -> int:
+        """Ungefährer Speicherbedarf in Bytes (ohne den Dict-Overhead pro Eintrag)."""
+        return (
+            sys.getsizeof(self._names)
+            + self._dir_of.itemsize * len(self._dir_of)
+            + self._ends.itemsize * len(self._ends)
+            + self._stats.itemsize * len(self._stats)
+            + self._inodes.itemsize * len(self._inodes)
+            + sum(sys.getsizeof(d) for d in self._dirs)
+            + sys.getsizeof(self._dir_ids)
+        )
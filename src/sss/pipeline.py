@@ -0,0 +1,224 @@
+"""Asynchrone Stufen-Pipeline mit begrenzten Warteschlangen (asyncio).
+
+scan und dedupe arbeiten sonst in strikten Phasen: erst alles auflisten,
+dann planen, dann verschieben bzw. hashen. Hier laufen die Stufen
+gleichzeitig: Während der Verzeichnis-Durchlauf noch Dateien liefert,
+werden frühere schon gehasht, geplant oder verschoben.
+
+- Zwischen zwei Stufen liegt eine asyncio.Queue mit maxsize Einträgen.
+  Ist sie voll, wartet die vorige Stufe (Backpressure) – der Speicher
+  hängt also nicht von der Zahl der Dateien ab.
+- Blockierende Arbeit läuft in einem eigenen Thread-Pool pro Stufe.
+  Eine Stufe mit workers=1 ruft ihre Funktion immer im selben Thread auf
+  (wichtig für SQLite-Verbindungen, z. B. hashcache.DigestCache).
+- inline=True: die Funktion läuft im Event-Loop-Thread. Gedacht für
+  schnelle Buchführung und Ausgabe; so braucht dort nichts Locks.
+
+Beispiel:
+
+    pipeline = Pipeline(records)
+    pipeline.map(plan)
+    pipeline.map(show, inline=True)
+    pipeline.batch(1000).map(execute)
+    pipeline.run(sink=report)
+"""
+
+import asyncio
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+DEFAULT_MAXSIZE = 256
+# So viele Elemente holt der Quell-Thread pro Aufruf aus dem Iterator.
+_SOURCE_CHUNK = 64
+
+_DONE = object()
+
+
+@dataclass(slots=True, kw_only=True)
+class _Stage:
+    fn: Callable[[Any], Any] | None
+    workers: int = 1
+    inline: bool = False
+    flat: bool = False
+    finish: Callable[[], Any] | None = None
+    batch: int = 0  # > 0: Stufe bündelt statt abzubilden
+
+
+def _take(it: Iterator, n: int) -> list:
+    out = []
+    for item in it:
+        out.append(item)
+        if len(out) >= n:
+            break
+    return out
+
+
+class Pipeline:
+    """
+    Kette von Stufen über einer (blockierenden) Quelle, z. B. iter_files.
+
+    - source: beliebiges Iterable; es wird in einem eigenen Thread gelesen
+    - maxsize: Plätze je Warteschlange zwischen zwei Stufen
+    """
+
+    def __init__(self, source: Iterable, *, maxsize: int = DEFAULT_MAXSIZE):
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self._source = source
+        self._maxsize = maxsize
+        self._stages: list[_Stage] = []
+
+    def map(
+        self,
+        fn: Callable[[Any], Any],
+        *,
+        workers: int = 1,
+        inline: bool = False,
+        flat: bool = False,
+        finish: Callable[[], Any] | None = None,
+    ) -> "Pipeline":
+        """
+        Hängt eine Stufe an: fn(element) -> Ergebnis; None wird verworfen.
+
+        - workers: gleichzeitige Aufrufe (Threads); bei workers > 1 ist die
+          Reihenfolge der Ergebnisse nicht mehr die der Eingabe
+        - flat: fn liefert ein Iterable, dessen Elemente einzeln weitergehen
+        - finish: wird nach dem letzten Element aufgerufen (im Thread der
+          Stufe bzw. im Event-Loop bei inline); Ergebnis wie bei fn
+        """
+        if workers < 1:
+            raise ValueError("workers must be >= 1")
+        if inline and workers != 1:
+            raise ValueError("inline stages run with a single worker")
+        self._stages.append(
+            _Stage(fn=fn, workers=workers, inline=inline, flat=flat, finish=finish)
+        )
+        return self
+
+    def batch(self, max_items: int) -> "Pipeline":
+        """
+        Bündelt Elemente zu Listen. Ein Bündel geht weiter, sobald es
+        max_items hat oder gerade nichts nachkommt – ist die nächste Stufe
+        langsam, werden die Bündel also von selbst größer.
+        """
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1")
+        self._stages.append(_Stage(fn=None, batch=max_items))
+        return self
+
+    def run(self, sink: Callable[[Any], None] | None = None) -> None:
+        """Läuft bis die Quelle erschöpft ist; sink bekommt jedes Endergebnis."""
+        asyncio.run(self._run(sink))
+
+    # -- intern ------------------------------------------------------------
+
+    async def _run(self, sink: Callable[[Any], None] | None) -> None:
+        pools: list[ThreadPoolExecutor] = []
+
+        def pool(workers: int) -> ThreadPoolExecutor:
+            executor = ThreadPoolExecutor(max_workers=workers)
+            pools.append(executor)
+            return executor
+
+        inq: asyncio.Queue = asyncio.Queue(self._maxsize)
+        coros = [self._feed(inq, pool(1))]
+        for stage in self._stages:
+            outq: asyncio.Queue = asyncio.Queue(self._maxsize)
+            if stage.batch:
+                coros.append(self._batch(stage.batch, inq, outq))
+            else:
+                executor = None if stage.inline else pool(stage.workers)
+                active = [stage.workers]
+                coros += [
+                    self._work(stage, executor, inq, outq, active)
+                    for _ in range(stage.workers)
+                ]
+            inq = outq
+        coros.append(self._drain(inq, sink))
+
+        tasks = [asyncio.ensure_future(c) for c in coros]
+        try:
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        finally:
+            # laufende Aufrufe in den Threads werden noch zu Ende gebracht
+            for executor in pools:
+                executor.shutdown(wait=True)
+
+    async def _feed(self, outq: asyncio.Queue, executor: ThreadPoolExecutor) -> None:
+        loop = asyncio.get_running_loop()
+        it = iter(self._source)
+        while True:
+            chunk = await loop.run_in_executor(executor, _take, it, _SOURCE_CHUNK)
+            for item in chunk:
+                await outq.put(item)
+            if len(chunk) < _SOURCE_CHUNK:
+                break
+        await outq.put(_DONE)
+
+    @staticmethod
+    async def _call(executor: ThreadPoolExecutor | None, fn, *args) -> Any:
+        if executor is None:
+            return fn(*args)
+        return await asyncio.get_running_loop().run_in_executor(executor, fn, *args)
+
+    @staticmethod
+    async def _emit(stage: _Stage, outq: asyncio.Queue, result: Any) -> None:
+        if result is None:
+            return
+        if stage.flat:
+            for item in result:
+                await outq.put(item)
+        else:
+            await outq.put(result)
+
+    async def _work(
+        self,
+        stage: _Stage,
+        executor: ThreadPoolExecutor | None,
+        inq: asyncio.Queue,
+        outq: asyncio.Queue,
+        active: list[int],
+    ) -> None:
+        while True:
+            item = await inq.get()
+            if item is _DONE:
+                await inq.put(_DONE)  # für die übrigen Worker dieser Stufe
+                break
+            await self._emit(stage, outq, await self._call(executor, stage.fn, item))
+        active[0] -= 1
+        if active[0] == 0:
+            if stage.finish is not None:
+                result = await self._call(executor, stage.finish)
+                await self._emit(stage, outq, result)
+            await outq.put(_DONE)
+
+    @staticmethod
+    async def _batch(max_items: int, inq: asyncio.Queue, outq: asyncio.Queue) -> None:
+        buf: list = []
+        while True:
+            item = await inq.get()
+            if item is _DONE:
+                break
+            buf.append(item)
+            if len(buf) >= max_items or inq.empty():
+                await outq.put(buf)
+                buf = []
+        if buf:
+            await outq.put(buf)
+        await outq.put(_DONE)
+
+    @staticmethod
+    async def _drain(inq: asyncio.Queue, sink: Callable[[Any], None] | None) -> None:
+        while True:
+            item = await inq.get()
+            if item is _DONE:
+                return
+            if sink is not None:
+                sink(item)
@@ -1,6 +1,18 @@
+from collections.abc import Iterator
 from pathlib import Path
+import errno
+import itertools
+import os
 import re
 
+# "bild (12)" -> ("bild", "12")
+_NUMBERED = re.compile(r"^(?P<stem>.*) \((?P<n>\d+)\)$")
+
+_EXCL_FLAGS = os.O_CREAT | os.O_EXCL | os.O_WRONLY | getattr(os, "O_BINARY", 0)
+
+# linkat ohne AT_SYMLINK_FOLLOW: ein Symlink wird selbst verlinkt, nicht sein Ziel
+_LINK_NOFOLLOW = os.link in os.supports_follow_symlinks
+
 
 def sanitize_filename(name: str) -> str:
     """
@@ -12,18 +24,146 @@ def sanitize_filename(name: str) -> str:
     return name or "_"
 
 
-def unique_path(dest_dir: Path, filename: str) -> Path:
+def candidate_names(filename: str) -> Iterator[str]:
     """
-    Gibt einen eindeutigen Pfad in dest_dir zurück.
-    Beispiel: 'bild.png' -> 'bild (1).png' falls vorhanden.
+    Mögliche Zielnamen in Reihenfolge: 'bild.png', 'bild (1).png', ...
     """
-    dest_dir.mkdir(parents=True, exist_ok=True)
     p = Path(filename)
     stem = sanitize_filename(p.stem)
     suffix = p.suffix
-    candidate = dest_dir / f"{stem}{suffix}"
-    counter = 1
-    while candidate.exists():
-        candidate = dest_dir / f"{stem} ({counter}){suffix}"
-        counter += 1
-    return candidate
+    yield f"{stem}{suffix}"
+    for counter in itertools.count(1):
+        yield f"{stem} ({counter}){suffix}"
+
+
+def unique_path(dest_dir: Path, filename: str) -> Path:
+    """
+    Gibt einen eindeutigen Pfad in dest_dir zurück.
+    Beispiel: 'bild.png' -> 'bild (1).png' falls vorhanden.
+    Legt dest_dir nicht an; das ist Sache des Aufrufers.
+    Prüft jeden Kandidaten mit exists() – für viele Dateien in einem Ordner
+    NameAllocator verwenden.
+    """
+    for name in candidate_names(filename):
+        candidate = dest_dir / name
+        if not candidate.exists():
+            return candidate
+    raise AssertionError("unreachable")
+
+
+class NameAllocator:
+    """
+    Vergibt freie Dateinamen in einem Zielordner in O(1).
+
+    Der Ordner wird beim ersten Zugriff einmal gelistet; pro Namensstamm
+    merkt sich der Allocator den höchsten vergebenen Zähler. Ist der
+    Originalname frei, wird er genommen, sonst 'bild (<max+1>).png';
+    Lücken in der Zählung werden nicht aufgefüllt.
+
+    Das Wissen im Speicher ist nur eine Vorhersage: claim() und link()
+    belegen den Namen atomar (O_EXCL bzw. os.link) und nehmen bei
+    FileExistsError – ein anderer Prozess war schneller – den nächsten.
+    """
+
+    def __init__(self, dest_dir: Path):
+        self.dest_dir = Path(dest_dir)
+        self._taken: set[str] | None = None
+        self._next: dict[tuple[str, str], int] = {}
+
+    def _load(self) -> set[str]:
+        if self._taken is not None:
+            return self._taken
+        try:
+            names = os.listdir(self.dest_dir)
+        except FileNotFoundError:
+            names = []
+        self._taken = set()
+        for name in names:
+            self._mark(name)
+        return self._taken
+
+    def _mark(self, name: str) -> None:
+        key = os.path.normcase(name)
+        self._taken.add(key)
+        stem, suffix = os.path.splitext(key)
+        n = 1
+        m = _NUMBERED.match(stem)
+        if m:
+            stem, n = m["stem"], int(m["n"]) + 1
+        slot = (stem, suffix)
+        if self._next.get(slot, 0) < n:
+            self._next[slot] = n
+
+    def _reserve(self, filename: str) -> tuple[str, tuple[str, str], int]:
+        taken = self._load()
+        p = Path(filename)
+        stem = sanitize_filename(p.stem)
+        suffix = p.suffix
+        slot = (os.path.normcase(stem), os.path.normcase(suffix))
+        prev = self._next.get(slot, 0)
+        name = f"{stem}{suffix}"
+        n = max(prev, 1)
+        if os.path.normcase(name) in taken:
+            while True:
+                name = f"{stem} ({n}){suffix}"
+                n += 1
+                if os.path.normcase(name) not in taken:
+                    break
+        self._next[slot] = n
+        taken.add(os.path.normcase(name))
+        return name, slot, prev
+
+    def _release(self, name: str, slot: tuple[str, str], prev: int) -> None:
+        # Name doch nicht benutzt (z. B. Hardlinks nicht unterstützt)
+        self._taken.discard(os.path.normcase(name))
+        self._next[slot] = prev
+
+    def next_name(self, filename: str) -> str:
+        """Nächster freier Name laut Speicher (ohne ihn auf der Platte zu belegen)."""
+        return self._reserve(filename)[0]
+
+    def take(self, name: str) -> Path:
+        """
+        Legt genau diesen Namen (z. B. aus next_name) als leere Datei an
+        (O_EXCL). FileExistsError, wenn ihn inzwischen jemand belegt hat.
+        """
+        path = self.dest_dir / name
+        os.close(os.open(path, _EXCL_FLAGS, 0o666))
+        return path
+
+    def claim(self, filename: str) -> Path:
+        """Legt unter einem freien Namen eine leere Datei an (O_EXCL) und liefert den Pfad."""
+        while True:
+            name, slot, prev = self._reserve(filename)
+            try:
+                path = self.take(name)
+            except FileExistsError:
+                continue
+            except OSError:
+                self._release(name, slot, prev)
+                raise
+            return path
+
+    def link(self, src: Path | str, filename: str) -> Path:
+        """
+        Legt src per Hardlink unter einem freien Namen an und liefert den Pfad.
+        Ist src ein Symlink, wird der Link selbst verlinkt; wo das nicht geht,
+        ist das ein OSError wie bei fehlenden Hardlinks. OSError (z. B. EXDEV,
+        keine Hardlinks) wird weitergereicht.
+        """
+        if not _LINK_NOFOLLOW and os.path.islink(src):
+            raise OSError(errno.EOPNOTSUPP, "Symlink nicht verlinkbar", str(src))
+        while True:
+            name, slot, prev = self._reserve(filename)
+            path = self.dest_dir / name
+            try:
+                if _LINK_NOFOLLOW:
+                    os.link(src, path, follow_symlinks=False)
+                else:
+                    os.link(src, path)
+            except FileExistsError:
+                continue
+            except OSError:
+                self._release(name, slot, prev)
+                raise
+            return path
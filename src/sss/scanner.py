@@ -0,0 +1,133 @@
+"""Streaming-Verzeichnis-Scanner auf Basis von os.scandir.
+
+Liefert Dateien als leichte FileRecord-Objekte, sobald sie gefunden werden.
+Typ- und Stat-Informationen kommen aus dem DirEntry (unter Windows ohne
+zusätzlichen Syscall), Unterverzeichnisse werden erst nach dem aktuellen
+Verzeichnis besucht – es ist also immer nur ein Verzeichnis-Handle offen
+und der Speicherbedarf hängt nicht von der Anzahl der Einträge ab.
+"""
+
+import os
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg")
+
+
+class FileRecord:
+    """
+    Eine Datei mit den Daten aus genau einem stat-Aufruf.
+
+    scan, mover und dedupe reichen FileRecords weiter, statt dieselbe Datei
+    mehrfach zu stat'en. Unter Windows liefert DirEntry.stat() st_ino/st_dev
+    als 0, os.stat() aber die echten Werte; Signaturen deshalb nur mit
+    hashcache.signature_matches vergleichen, nie per ==.
+    """
+
+    __slots__ = ("path", "size", "mtime_ns", "ino", "dev")
+
+    def __init__(
+        self, path: Path, size: int, mtime_ns: int, ino: int = 0, dev: int = 0
+    ):
+        self.path = path
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.ino = ino
+        self.dev = dev
+
+    @classmethod
+    def from_stat(cls, path: Path | str, st: os.stat_result) -> "FileRecord":
+        path = path if isinstance(path, Path) else Path(path)
+        return cls(path, st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+
+    @classmethod
+    def from_entry(cls, entry: os.DirEntry) -> "FileRecord":
+        return cls.from_stat(entry.path, entry.stat())
+
+    @classmethod
+    def from_path(cls, path: Path | str) -> "FileRecord":
+        """Ein os.stat() auf path."""
+        return cls.from_stat(path, os.stat(path))
+
+    @property
+    def name(self) -> str:
+        return self.path.name
+
+    @property
+    def mtime(self) -> float:
+        """mtime in Sekunden (wie os.stat_result.st_mtime)."""
+        return self.mtime_ns / 1e9
+
+    def __fspath__(self) -> str:
+        return os.fspath(self.path)
+
+    def __repr__(self) -> str:
+        return f"FileRecord({str(self.path)!r}, size={self.size})"
+
+
+def iter_files(
+    root: Path | str,
+    *,
+    recursive: bool = False,
+    max_depth: int | None = None,
+    extensions: Iterable[str] | None = None,
+    exclude: Iterable[Path | str] = (),
+) -> Iterator[FileRecord]:
+    """
+    Läuft über root und liefert reguläre Dateien als FileRecord.
+
+    - recursive: auch Unterverzeichnisse besuchen
+    - max_depth: maximale Tiefe (0 = nur root); nur mit recursive relevant
+    - extensions: erlaubte Endungen, z. B. (".png", ".jpg"); None = alle
+    - exclude: Verzeichnisnamen (z. B. "_by_date") oder Pfade, die
+      übersprungen werden
+    """
+    if max_depth is not None and max_depth < 0:
+        raise ValueError("max_depth must be >= 0")
+    if not recursive:
+        max_depth = 0
+
+    exts = None if extensions is None else {e.lower() for e in extensions}
+    excluded_names = set()
+    excluded_paths = set()
+    for item in exclude:
+        item = os.fspath(item)
+        if os.sep in item or (os.altsep and os.altsep in item):
+            excluded_paths.add(os.path.normcase(os.path.abspath(item)))
+        else:
+            excluded_names.add(item)
+
+    stack: list[tuple[str, int]] = [(os.fspath(root), 0)]
+    while stack:
+        current, depth = stack.pop()
+        subdirs: list[str] = []
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue  # z. B. keine Berechtigung
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if max_depth is None or depth < max_depth:
+                            subdirs.append(entry.path)
+                        continue
+                    if not entry.is_file():
+                        continue
+                    if exts is not None:
+                        if os.path.splitext(entry.name)[1].lower() not in exts:
+                            continue
+                    record = FileRecord.from_entry(entry)
+                except OSError:
+                    continue  # Datei zwischenzeitlich verschwunden
+                yield record
+
+        for sub in reversed(subdirs):
+            name = os.path.basename(sub)
+            if name in excluded_names:
+                continue
+            if excluded_paths and (
+                os.path.normcase(os.path.abspath(sub)) in excluded_paths
+            ):
+                continue
+            stack.append((sub, depth + 1))
@@ -0,0 +1,178 @@
+"""Erkennung ähnlicher Bilder (perceptual hash + BK-Tree).
+
+Pro Bild wird ein 64-Bit-dHash berechnet. Derselbe Screenshot als PNG und
+JPEG oder in anderer Auflösung ergibt Hashes mit kleinem Hamming-Abstand.
+Die Hashes landen in einem BK-Tree, sodass eine Abfrage "alle Hashes mit
+Abstand <= t" nur einen kleinen Teil des Baums besucht statt alle Paare.
+Die Ergebnisse sind DuplicateGroups und passen damit zu plan_moves.
+"""
+
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .dedupe import DuplicateGroup
+from .hashing import HashEngine
+from .scanner import FileRecord
+
+HASH_SIZE = 8  # 8x8 Vergleiche -> 64 Bit
+DEFAULT_THRESHOLD = 6
+
+
+def dhash(path: Path | str, *, hash_size: int = HASH_SIZE) -> int:
+    """
+    Difference-Hash: Graustufenbild auf (hash_size+1) x hash_size verkleinern
+    und pro Zeile benachbarte Pixel vergleichen.
+    JPEGs werden per Image.draft bereits beim Dekodieren verkleinert.
+    """
+    from PIL import Image
+
+    with Image.open(path) as img:
+        img.draft("L", (hash_size * 8, hash_size * 8))
+        small = img.convert("L").resize(
+            (hash_size + 1, hash_size), Image.Resampling.BILINEAR
+        )
+        px = small.tobytes()
+
+    bits = 0
+    width = hash_size + 1
+    for row in range(hash_size):
+        base = row * width
+        for col in range(hash_size):
+            bits = (bits << 1) | (px[base + col] > px[base + col + 1])
+    return bits
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    BK-Tree über Hamming-Abstände.
+
+    Jeder Knoten ist [hash, items, children]; children ist nach Abstand zum
+    Knoten-Hash indiziert. Gleiche Hashes teilen sich einen Knoten.
+    """
+
+    __slots__ = ("_root", "_size")
+
+    def __init__(self):
+        self._root: list | None = None
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, value: int, item) -> None:
+        self._size += 1
+        if self._root is None:
+            self._root = [value, [item], {}]
+            return
+        node = self._root
+        while True:
+            dist = hamming(value, node[0])
+            if dist == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(dist)
+            if child is None:
+                node[2][dist] = [value, [item], {}]
+                return
+            node = child
+
+    def query(self, value: int, max_distance: int) -> Iterator[tuple[int, int, list]]:
+        """Liefert (abstand, hash, items) für alle Knoten mit abstand <= max_distance."""
+        if self._root is None:
+            return
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            dist = hamming(value, node[0])
+            if dist <= max_distance:
+                yield dist, node[0], node[1]
+            # Dreiecksungleichung: nur Kinder im Band [dist-t, dist+t] können passen
+            lo, hi = dist - max_distance, dist + max_distance
+            for d, child in node[2].items():
+                if lo <= d <= hi:
+                    stack.append(child)
+
+
+def _safe_dhash(path: Path) -> int | None:
+    try:
+        return dhash(path)
+    except (OSError, ValueError):
+        return None  # kein (lesbares) Bild
+
+
+def find_similar_groups(
+    paths: Iterable[Path | FileRecord],
+    *,
+    threshold: int = DEFAULT_THRESHOLD,
+    engine: HashEngine | None = None,
+) -> list[DuplicateGroup]:
+    """
+    Gruppiert Bilder, deren dHash höchstens `threshold` Bits auseinanderliegt
+    (transitiv: A~B und B~C landen in einer Gruppe).
+
+    - digest: kleinster dHash der Gruppe als 16-stelliger Hex-String
+    - size: Größe der größten Datei der Gruppe
+    - algorithm: "dhash"
+    Reihenfolge von Gruppen und Dateien folgt der Eingabe.
+    """
+    if threshold < 0:
+        raise ValueError("threshold must be >= 0")
+    engine = engine or HashEngine()
+
+    records = [
+        p if isinstance(p, FileRecord) else FileRecord.from_path(p) for p in paths
+    ]
+    hashes = engine.map(
+        lambda rec: _safe_dhash(rec.path), records, sizes=[r.size for r in records]
+    )
+
+    # Eindeutige Hashes in den Baum, Items sind Indizes in records
+    tree = BKTree()
+    by_hash: dict[int, list[int]] = {}
+    for idx, value in enumerate(hashes):
+        if value is None:
+            continue
+        if value not in by_hash:
+            by_hash[value] = []
+            tree.add(value, idx)
+        by_hash[value].append(idx)
+
+    # Union-Find über die eindeutigen Hashes
+    parent = {value: value for value in by_hash}
+
+    def find(x: int) -> int:
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for value in by_hash:
+        for _dist, other, _items in tree.query(value, threshold):
+            ra, rb = find(value), find(other)
+            if ra != rb:
+                parent[max(ra, rb)] = min(ra, rb)
+
+    members: dict[int, list[int]] = {}
+    for value, idxs in by_hash.items():
+        members.setdefault(find(value), []).extend(idxs)
+
+    components = sorted(
+        (sorted(idxs), root) for root, idxs in members.items() if len(idxs) >= 2
+    )
+    groups: list[DuplicateGroup] = []
+    for idxs, root in components:
+        recs = [records[i] for i in idxs]
+        groups.append(
+            DuplicateGroup(
+                size=max(r.size for r in recs),
+                digest=f"{root:016x}",
+                files=[r.path for r in recs],
+                algorithm="dhash",
+                records=recs,
+            )
+        )
+    return groups
@@ -0,0 +1,147 @@
+"""Auslagern auf die Platte für Bestände, die nicht in den RAM passen.
+
+- RunSorter: sortiert Tupel fester Struktur (struct-Format) extern.
+  Bis max_items Einträge wird im Speicher gesammelt, dann als sortierter
+  Lauf in eine Datei geschrieben; am Ende mischt heapq.merge alle Läufe.
+- PathStore: Pfade hintereinander in einer Datei; die Pfad-ID ist der
+  Offset. So tragen die sortierten Läufe nur Zahlen.
+
+Beides gehört zu dedupe.iter_duplicate_groups_external.
+"""
+
+import heapq
+import os
+import struct
+from collections.abc import Iterator
+from pathlib import Path
+
+# so viele Einträge werden pro read()/write() (de)serialisiert
+_BLOCK = 4096
+# höchstens so viele Läufe gleichzeitig offen; sonst wird vorab gemischt
+MAX_FANIN = 64
+
+_LEN = struct.Struct("<I")
+
+
+class RunSorter:
+    """
+    Externes Sortieren von Tupeln im struct-Format fmt.
+
+    - max_items: Einträge, die höchstens im Speicher liegen
+    - directory: Ort der Lauf-Dateien (wird nicht aufgeräumt, siehe
+      tempfile.TemporaryDirectory beim Aufrufer)
+
+    Solange nichts ausgelagert wurde, sortiert merged() nur im Speicher.
+    """
+
+    def __init__(self, fmt: str, *, max_items: int, directory: Path | str):
+        if max_items < 1:
+            raise ValueError("max_items must be >= 1")
+        self._struct = struct.Struct(fmt)
+        self._max_items = max_items
+        self._dir = Path(directory)
+        self._buf: list[tuple] = []
+        self._runs: list[Path] = []
+        self._next = 0
+        self.items = 0
+        self.bytes_spilled = 0
+
+    @property
+    def runs(self) -> int:
+        """Bisher geschriebene Läufe (inkl. Zwischen-Merges)."""
+        return self._next
+
+    def add(self, item: tuple) -> None:
+        self._buf.append(item)
+        self.items += 1
+        if len(self._buf) >= self._max_items:
+            self._spill()
+
+    def _new_run(self) -> Path:
+        path = self._dir / f"run-{self._next:06d}.bin"
+        self._next += 1
+        return path
+
+    def _write(self, items) -> Path:
+        path = self._new_run()
+        pack = self._struct.pack
+        block: list[bytes] = []
+        with open(path, "wb") as f:
+            for item in items:
+                block.append(pack(*item))
+                if len(block) >= _BLOCK:
+                    f.write(b"".join(block))
+                    block.clear()
+            f.write(b"".join(block))
+            self.bytes_spilled += f.tell()
+        return path
+
+    def _spill(self) -> None:
+        self._buf.sort()
+        self._runs.append(self._write(self._buf))
+        self._buf = []
+
+    def _read(self, path: Path) -> Iterator[tuple]:
+        size = self._struct.size * _BLOCK
+        with open(path, "rb") as f:
+            while block := f.read(size):
+                yield from self._struct.iter_unpack(block)
+        os.unlink(path)
+
+    def merged(self) -> Iterator[tuple]:
+        """Alle Einträge aufsteigend sortiert; danach ist der Sorter leer."""
+        if not self._runs:
+            self._buf.sort()
+            buf, self._buf = self._buf, []
+            yield from buf
+            return
+        if self._buf:
+            self._spill()
+        runs, self._runs = self._runs, []
+        # zu viele offene Dateien vermeiden: vorab in Stufen mischen
+        while len(runs) > MAX_FANIN:
+            head, runs = runs[:MAX_FANIN], runs[MAX_FANIN:]
+            runs.append(self._write(heapq.merge(*map(self._read, head))))
+        yield from heapq.merge(*map(self._read, runs))
+
+
+class PathStore:
+    """
+    Pfade in einer Datei; add() liefert die ID (Offset) für get().
+    append=True: vorhandene Datei weiterverwenden statt sie zu leeren.
+    """
+
+    def __init__(self, path: Path | str, *, append: bool = False):
+        self.path = Path(path)
+        self._file = open(self.path, "a+b" if append else "w+b")
+        self._offset = self._file.seek(0, os.SEEK_END)
+        self._reading = False
+
+    def add(self, path: Path | str) -> int:
+        data = os.fsencode(path)
+        offset = self._offset
+        if self._reading:
+            self._file.seek(offset)
+            self._reading = False
+        self._file.write(_LEN.pack(len(data)) + data)
+        self._offset += _LEN.size + len(data)
+        return offset
+
+    def get(self, offset: int) -> Path:
+        self._reading = True
+        self._file.seek(offset)
+        (length,) = _LEN.unpack(self._file.read(_LEN.size))
+        return Path(os.fsdecode(self._file.read(length)))
+
+    @property
+    def size(self) -> int:
+        return self._offset
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "PathStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
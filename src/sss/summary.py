@@ -1,5 +1,105 @@
-from dataclasses import dataclass
+from array import array
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from pathlib import Path
+import time
+from typing import TypeVar
+
+T = TypeVar("T")
+
+
+@dataclass(slots=True)
+class StageTime:
+    """Aufsummierte Zeiten einer Stufe (CPU = ganzer Prozess, inkl. Worker)."""
+
+    wall: float = 0.0
+    cpu: float = 0.0
+    calls: int = 0
+
+
+class StageTimes:
+    """Wall- und CPU-Zeit pro benannter Stufe, in Reihenfolge des ersten Auftretens."""
+
+    __slots__ = ("_times", "_mark")
+
+    def __init__(self):
+        self._times: dict[str, StageTime] = {}
+        self._mark: tuple[float, float] | None = None
+
+    def add(self, name: str, wall: float, cpu: float) -> None:
+        t = self._times.get(name)
+        if t is None:
+            t = self._times[name] = StageTime()
+        t.wall += wall
+        t.cpu += cpu
+        t.calls += 1
+
+    def start(self) -> None:
+        """Startpunkt für den nächsten lap()."""
+        self._mark = (time.perf_counter(), time.process_time())
+
+    def lap(self, name: str) -> None:
+        """Bucht die Zeit seit start()/dem letzten lap() auf name."""
+        wall, cpu = time.perf_counter(), time.process_time()
+        if self._mark is not None:
+            self.add(name, wall - self._mark[0], cpu - self._mark[1])
+        self._mark = (wall, cpu)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+
+    def wrap(self, name: str, iterable: Iterable[T]) -> Iterator[T]:
+        """
+        Misst die Zeit, die in next() eines (lazy) Iterators steckt, z. B. beim
+        Verzeichnis-Walk, der mit dem Planen verschränkt läuft.
+        Kostet zwei Uhr-Abfragen pro Element – nur mit --stats benutzen.
+        """
+        it = iter(iterable)
+        while True:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                item = next(it)
+            except StopIteration:
+                self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+                return
+            self.add(name, time.perf_counter() - wall, time.process_time() - cpu)
+            yield item
+
+    def merge(self, other: "StageTimes") -> None:
+        for name, t in other.items():
+            mine = self._times.get(name)
+            if mine is None:
+                mine = self._times[name] = StageTime()
+            mine.wall += t.wall
+            mine.cpu += t.cpu
+            mine.calls += t.calls
+
+    def items(self):
+        return self._times.items()
+
+    def __getitem__(self, name: str) -> StageTime:
+        return self._times[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._times
+
+    def __len__(self) -> int:
+        return len(self._times)
+
+
+def percentile(values: Iterable[float], q: float) -> float | None:
+    """Nearest-Rank-Perzentil (q in 0..100); None bei leerer Eingabe."""
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = max(1, -(-len(ordered) * q // 100))
+    return ordered[int(rank) - 1]
 
 
 @dataclass(slots=True, kw_only=True)
@@ -9,6 +109,14 @@ class Summary:
     out_root: Path
     moved: int = 0
     simulated: int = 0
+    linked: int = 0  # Duplikate durch Hardlink/Reflink ersetzt
+
+    # Metriken für --stats / --stats-json
+    stages: StageTimes = field(default_factory=StageTimes)
+    files_hashed: int = 0
+    bytes_read: int = 0
+    cache_hits: int = 0
+    latencies: array = field(default_factory=lambda: array("d"))
 
     def inc_moved(self, n: int = 1) -> None:
         """Erhöhe 'moved' um n (n >= 0)."""
@@ -16,6 +124,12 @@ class Summary:
             raise ValueError("n must be >= 0")
         self.moved += n
 
+    def inc_linked(self, n: int = 1) -> None:
+        """Erhöhe 'linked' um n (n >= 0)."""
+        if n < 0:
+            raise ValueError("n must be >= 0")
+        self.linked += n
+
     def inc_simulated(self, n: int = 1) -> None:
         """Erhöhe 'simulated' um n (n >= 0)."""
         if n < 0:
@@ -27,11 +141,57 @@ class Summary:
         """Summe aus real verschoben + nur simuliert."""
         return self.moved + self.simulated
 
+    def add_latency(self, seconds: float) -> None:
+        """Verarbeitungsdauer einer einzelnen Datei."""
+        self.latencies.append(seconds)
+
+    def to_dict(self) -> dict:
+        """Alle Zahlen als JSON-taugliches dict (für --stats-json)."""
+        return {
+            "out_root": str(self.out_root),
+            "total": self.total,
+            "moved": self.moved,
+            "simulated": self.simulated,
+            "linked": self.linked,
+            "stages": {
+                name: {"wall_s": t.wall, "cpu_s": t.cpu, "calls": t.calls}
+                for name, t in self.stages.items()
+            },
+            "files_hashed": self.files_hashed,
+            "bytes_read": self.bytes_read,
+            "cache_hits": self.cache_hits,
+            "latency": {
+                "count": len(self.latencies),
+                "p50_s": percentile(self.latencies, 50),
+                "p99_s": percentile(self.latencies, 99),
+            },
+        }
+
+    def render_stats(self) -> str:
+        """Mehrzeiliger Metrik-Report (für --stats)."""
+        lines = ["Stufen (wall / cpu):"]
+        for name, t in self.stages.items():
+            lines.append(f"  {name:<12} {t.wall:8.3f}s / {t.cpu:8.3f}s")
+        lines.append(
+            f"Gehasht: {self.files_hashed} Dateien | "
+            f"gelesen: {self.bytes_read / (1024 * 1024):.2f} MB | "
+            f"cache-treffer: {self.cache_hits}"
+        )
+        if self.latencies:
+            p50 = percentile(self.latencies, 50) * 1000
+            p99 = percentile(self.latencies, 99) * 1000
+            lines.append(
+                f"Latenz pro Datei: p50 {p50:.3f} ms | p99 {p99:.3f} ms "
+                f"(n={len(self.latencies)})"
+            )
+        return "\n".join(lines)
+
     def render(self) -> str:
+        linked = f"verlinkt={self.linked} | " if self.linked else ""
         return (
             f"Zusammenfassung: gesamt={self.total} | "
             f"verschoben={self.moved} | simuliert={self.simulated} | "
-            f"zielbasis={self.out_root}"
+            f"{linked}zielbasis={self.out_root}"
         )
 
     def __str__(self) -> str:
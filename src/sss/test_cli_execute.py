@@ -12,8 +12,8 @@ def test_dedupe_execute_moves_file(tmp_path, monkeypatch):
     dst = tmp_path / "b.jpg"
     src.write_bytes(b"123")
 
-    # plan_moves so faken, dass genau eine Move-Action zurückkommt
-    def fake_plan_moves(_dir: Path):
+    # plan_directory so faken, dass genau eine Move-Action zurückkommt
+    def fake_plan_directory(_dir: Path, **_kwargs):
         return [
             dedupe_module.DedupAction(
                 action="move",
@@ -23,7 +23,7 @@ def test_dedupe_execute_moves_file(tmp_path, monkeypatch):
             )
         ]
 
-    monkeypatch.setattr(dedupe_module, "plan_moves", fake_plan_moves)
+    monkeypatch.setattr(dedupe_module, "plan_directory", fake_plan_directory)
 
     result = runner.invoke(app, ["dedupe", "--execute", str(tmp_path)])
 
@@ -40,7 +40,7 @@ def test_dedupe_dry_run_does_not_move_file(tmp_path, monkeypatch):
     dst = tmp_path / "b.jpg"
     src.write_bytes(b"123")
 
-    def fake_plan_moves(_dir: Path):
+    def fake_plan_directory(_dir: Path, **_kwargs):
         return [
             dedupe_module.DedupAction(
                 action="move",
@@ -50,7 +50,7 @@ def test_dedupe_dry_run_does_not_move_file(tmp_path, monkeypatch):
             )
         ]
 
-    monkeypatch.setattr(dedupe_module, "plan_moves", fake_plan_moves)
+    monkeypatch.setattr(dedupe_module, "plan_directory", fake_plan_directory)
 
     result = runner.invoke(app, ["dedupe", str(tmp_path)])  # kein --execute!
 
@@ -66,11 +66,11 @@ def test_dedupe_dry_run_does_not_move_file(tmp_path, monkeypatch):
 
 
 def test_dedupe_no_duplicates_found(tmp_path, monkeypatch):
-    # plan_moves soll eine LEERE Liste zurückgeben
-    def fake_plan_moves(_dir):
+    # plan_directory soll eine LEERE Liste zurückgeben
+    def fake_plan_directory(_dir, **_kwargs):
         return []
 
-    monkeypatch.setattr(dedupe_module, "plan_moves", fake_plan_moves)
+    monkeypatch.setattr(dedupe_module, "plan_directory", fake_plan_directory)
 
     result = runner.invoke(app, ["dedupe", str(tmp_path)])
 
@@ -0,0 +1,219 @@
+"""Inbox überwachen und neue Screenshots einzeln melden.
+
+Unter Linux per inotify (über ctypes, ohne Zusatzpaket): gemeldet wird eine
+Datei erst bei IN_CLOSE_WRITE (Schreiber hat sie geschlossen) oder
+IN_MOVED_TO (atomar hineinverschoben). Halb geschriebene Dateien tauchen so
+nie auf, und die Kosten pro Ereignis hängen nicht von der Größe der Inbox ab.
+
+Überall sonst vergleicht PollingWatcher regelmäßig Verzeichnis-Snapshots.
+Eine neue Datei wird erst gemeldet, wenn Größe und mtime über zwei
+Durchläufe gleich geblieben sind.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+from .scanner import iter_files
+
+DEFAULT_POLL_INTERVAL = 1.0
+
+# aus <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+IN_NONBLOCK = 0o0004000
+
+_EVENT = struct.Struct("iIII")  # wd, mask, cookie, len
+_READ_SIZE = 64 * 1024
+
+
+def _load_libc():
+    if not sys.platform.startswith("linux"):
+        return None
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+    except OSError:
+        return None
+    if not hasattr(libc, "inotify_init1"):
+        return None
+    return libc
+
+
+_libc = _load_libc()
+
+
+def inotify_available() -> bool:
+    return _libc is not None
+
+
+def _matches(name: str, exts: set[str] | None) -> bool:
+    return exts is None or os.path.splitext(name)[1].lower() in exts
+
+
+class InotifyWatcher:
+    """
+    Meldet fertig geschriebene Dateien direkt in root (nicht rekursiv).
+
+    Läuft die Kernel-Queue über (IN_Q_OVERFLOW), werden einmal alle
+    passenden Dateien in root gemeldet – Aufrufer müssen verschwundene oder
+    bereits verarbeitete Dateien ohnehin tolerieren.
+    """
+
+    def __init__(self, root: Path | str, *, extensions: Iterable[str] | None = None):
+        if _libc is None:
+            raise OSError("inotify ist auf dieser Plattform nicht verfügbar")
+        self.root = Path(root)
+        self._exts = None if extensions is None else {e.lower() for e in extensions}
+        fd = _libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        wd = _libc.inotify_add_watch(
+            fd, os.fsencode(self.root), IN_CLOSE_WRITE | IN_MOVED_TO
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            os.close(fd)
+            raise OSError(err, os.strerror(err), str(self.root))
+        self._fd: int | None = fd
+
+    def poll(self, timeout: float | None = None) -> list[Path]:
+        """Wartet höchstens timeout Sekunden und liefert die fertigen Dateien."""
+        if self._fd is None:
+            raise ValueError("watcher is closed")
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return []
+
+        found: list[Path] = []
+        seen: set[str] = set()
+        pos = 0
+        while pos + _EVENT.size <= len(data):
+            _wd, mask, _cookie, length = _EVENT.unpack_from(data, pos)
+            raw = data[pos + _EVENT.size : pos + _EVENT.size + length]
+            pos += _EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                return [
+                    rec.path for rec in iter_files(self.root, extensions=self._exts)
+                ]
+            if mask & (IN_ISDIR | IN_IGNORED):
+                continue
+            name = os.fsdecode(raw.rstrip(b"\0"))
+            if name and name not in seen and _matches(name, self._exts):
+                seen.add(name)
+                found.append(self.root / name)
+        return found
+
+    def events(self, *, timeout: float | None = None) -> Iterator[Path]:
+        """Endlos-Iterator über poll(); timeout begrenzt jede einzelne Wartezeit."""
+        while self._fd is not None:
+            yield from self.poll(timeout)
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> "InotifyWatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class PollingWatcher:
+    """
+    Fallback ohne Kernel-Unterstützung: Snapshot-Diff alle interval Sekunden.
+
+    Dateien, die beim Anlegen schon da sind, gelten als bekannt und werden
+    nicht gemeldet.
+    """
+
+    def __init__(
+        self,
+        root: Path | str,
+        *,
+        extensions: Iterable[str] | None = None,
+        interval: float = DEFAULT_POLL_INTERVAL,
+    ):
+        if interval <= 0:
+            raise ValueError("interval must be > 0")
+        self.root = Path(root)
+        self.interval = interval
+        self._exts = None if extensions is None else {e.lower() for e in extensions}
+        self._known = self._snapshot()
+        self._pending: dict[Path, tuple[int, int]] = {}
+        self._closed = False
+
+    def _snapshot(self) -> dict[Path, tuple[int, int]]:
+        return {
+            rec.path: (rec.size, rec.mtime_ns)
+            for rec in iter_files(self.root, extensions=self._exts)
+        }
+
+    def scan_once(self) -> list[Path]:
+        """Ein Snapshot-Vergleich; liefert Dateien, die seit dem letzten stabil sind."""
+        current = self._snapshot()
+        ready: list[Path] = []
+        pending: dict[Path, tuple[int, int]] = {}
+        for path, sig in current.items():
+            if self._known.get(path) == sig:
+                continue
+            if self._pending.get(path) == sig:
+                ready.append(path)
+            else:
+                pending[path] = sig  # neu oder noch in Arbeit
+        self._pending = pending
+        self._known = {p: s for p, s in current.items() if p not in pending}
+        return sorted(ready)
+
+    def poll(self, timeout: float | None = None) -> list[Path]:
+        """Wie InotifyWatcher.poll; schläft dazu bis zum nächsten Durchlauf."""
+        if self._closed:
+            raise ValueError("watcher is closed")
+        wait = self.interval if timeout is None else min(timeout, self.interval)
+        time.sleep(wait)
+        return self.scan_once()
+
+    def events(self, *, timeout: float | None = None) -> Iterator[Path]:
+        while not self._closed:
+            yield from self.poll(timeout)
+
+    def close(self) -> None:
+        self._closed = True
+
+    def __enter__(self) -> "PollingWatcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def open_watcher(
+    root: Path | str,
+    *,
+    extensions: Iterable[str] | None = None,
+    interval: float = DEFAULT_POLL_INTERVAL,
+    polling: bool = False,
+) -> InotifyWatcher | PollingWatcher:
+    """inotify, wenn verfügbar (und polling=False), sonst PollingWatcher."""
+    if not polling and inotify_available():
+        try:
+            return InotifyWatcher(root, extensions=extensions)
+        except OSError:
+            pass  # z. B. max_user_watches erreicht -> Polling
+    return PollingWatcher(root, extensions=extensions, interval=interval)
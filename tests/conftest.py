@@ -2,6 +2,14 @@
 import sys
 from pathlib import Path
 
+import pytest
+
 ROOT = Path(__file__).resolve().parents[1]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path_factory, monkeypatch):
+    # Tests sollen nie in den echten User-Cache schreiben
+    monkeypatch.setenv("SSS_CACHE_DIR", str(tmp_path_factory.mktemp("sss-cache")))
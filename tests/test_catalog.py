@@ -0,0 +1,117 @@
+import json
+import os
+import shutil
+from datetime import datetime
+from pathlib import Path
+
+from PIL import Image
+from typer.testing import CliRunner
+
+from sss import metadata
+from sss.catalog import Catalog
+from sss.cli import _parse_size, app
+from sss.scanner import iter_files
+
+runner = CliRunner()
+
+
+def _image(path: Path, size: tuple[int, int], year: int, pad: int = 0) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    Image.new("RGB", size, "blue").save(path)
+    if pad:
+        with path.open("ab") as f:
+            f.write(b"\0" * pad)
+    ts = datetime(year, 6, 1).timestamp()
+    os.utime(path, (ts, ts))
+    return path
+
+
+def _index(catalog: Catalog, root: Path):
+    return catalog.update(iter_files(root, recursive=True), root=root)
+
+
+def test_update_is_incremental(tmp_path: Path, monkeypatch):
+    root = tmp_path / "share"
+    a = _image(root / "a.png", (20, 10), 2024)
+    b = _image(root / "sub" / "b.png", (30, 10), 2023)
+
+    with Catalog(tmp_path / "catalog.sqlite") as catalog:
+        report = _index(catalog, root)
+        assert (report.added, report.unchanged) == (2, 0)
+
+        calls = []
+        real = metadata.extract_metadata_many
+        monkeypatch.setattr(
+            "sss.catalog.extract_metadata_many",
+            lambda paths, **kw: calls.append(list(paths)) or real(paths, **kw),
+        )
+        report = _index(catalog, root)
+        assert (report.added, report.updated, report.unchanged) == (0, 0, 2)
+        assert calls == []  # nichts neu gelesen
+
+        _image(a, (40, 10), 2024)
+        b.unlink()
+        report = _index(catalog, root)
+        assert (report.updated, report.removed) == (1, 1)
+        assert calls == [[a]]
+        assert [e.width for e in catalog.query()] == [40]
+
+
+def test_update_only_prunes_below_root(tmp_path: Path):
+    _image(tmp_path / "x" / "a.png", (10, 10), 2024)
+    _image(tmp_path / "xy" / "b.png", (10, 10), 2024)
+
+    with Catalog(tmp_path / "catalog.sqlite") as catalog:
+        _index(catalog, tmp_path / "x")
+        _index(catalog, tmp_path / "xy")
+        # "xy" beginnt mit "x", liegt aber nicht darunter
+        assert _index(catalog, tmp_path / "x").removed == 0
+        assert len(catalog) == 2
+
+
+def test_query_filters_and_duplicates(tmp_path: Path):
+    root = tmp_path / "share"
+    big = _image(root / "big.png", (64, 36), 2024, pad=5 * 1024 * 1024)
+    _image(root / "small.png", (64, 36), 2024)
+    _image(root / "old.png", (64, 36), 2023, pad=5 * 1024 * 1024 + 1)
+    copy = root / "copy" / "big.png"
+    copy.parent.mkdir()
+    shutil.copy2(big, copy)
+
+    with Catalog(tmp_path / "catalog.sqlite") as catalog:
+        _index(catalog, root)
+        hits = catalog.query(
+            ext="PNG", width=64, height=36, year=2024, min_size=5 * 1024 * 1024
+        )
+        assert [e.path.name for e in hits] == ["big.png", "big.png"]
+        dupes = list(catalog.query(duplicates=True))
+        assert {e.path for e in dupes} == {big, copy}
+        assert [e.path for e in catalog.query(under=root / "copy")] == [copy]
+
+
+def test_index_and_query_cli(tmp_path: Path):
+    root = tmp_path / "share"
+    _image(root / "a.png", (2560, 1440), 2024)
+    _image(root / "b.png", (1920, 1080), 2024)
+    db = str(tmp_path / "catalog.sqlite")
+
+    result = runner.invoke(app, ["index", str(root), "--catalog", db])
+    assert result.exit_code == 0, result.output
+    assert "neu=2" in result.output
+
+    result = runner.invoke(
+        app,
+        ["query", "--catalog", db, "--resolution", "2560x1440", "--format", "jsonl"],
+    )
+    assert result.exit_code == 0, result.output
+    records = [json.loads(line) for line in result.output.splitlines()]
+    assert [r["type"] for r in records] == ["file", "summary"]
+    assert Path(records[0]["path"]).name == "a.png"
+    assert records[1]["count"] == 1
+
+
+def test_parse_size():
+    assert _parse_size("4096") == 4096
+    assert _parse_size("5MB") == 5 * 1024 * 1024
+    assert _parse_size("1.5g") == int(1.5 * 1024**3)
+    assert _parse_size("2KiB") == 2048
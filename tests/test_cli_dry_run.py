@@ -11,7 +11,7 @@ def test_dedupe_dry_run(tmp_path, monkeypatch):
     f1.write_bytes(b"123")
     f2.write_bytes(b"123")
 
-    def fake_plan_moves(_dir):
+    def fake_plan_directory(_dir, **_kwargs):
         return [
             dedupe_module.DedupAction(
                 action="move",
@@ -21,7 +21,7 @@ def test_dedupe_dry_run(tmp_path, monkeypatch):
             )
         ]
 
-    monkeypatch.setattr(dedupe_module, "plan_moves", fake_plan_moves)
+    monkeypatch.setattr(dedupe_module, "plan_directory", fake_plan_directory)
 
     result = runner.invoke(app, ["dedupe", str(tmp_path)])
 
@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from sss.cli import DIGEST_CHOICES
+from sss.hashing import ALGORITHMS
+
+SRC = Path(__file__).resolve().parents[1] / "src"
+
+# Großzügig, damit langsame CI-Maschinen nicht flackern; lokal liegt
+# "import sss.cli" bei ~80 ms, fast alles davon ist typer/click.
+BUDGET_MS = float(os.environ.get("SSS_STARTUP_BUDGET_MS", "300"))
+
+# Dürfen bei --help und scan nicht geladen werden
+HEAVY = ("PIL", "sqlite3", "hashlib", "concurrent.futures", "rich", "sss.dedupe")
+
+
+def run_cli(*args: str) -> tuple[subprocess.CompletedProcess, dict[str, int]]:
+    """Startet die CLI mit -X importtime; liefert Prozess und {modul: kumulativ µs}."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "from sss.cli import app; app()"]
+        + list(args),
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONPATH": str(SRC)},
+    )
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _self, cumulative, name = line.split(":", 1)[1].split("|")
+        modules[name.strip()] = int(cumulative)
+    return proc, modules
+
+
+def assert_fast(modules: dict[str, int]) -> None:
+    loaded = [m for m in HEAVY if m in modules]
+    assert not loaded, f"schwere Module beim Start geladen: {loaded}"
+    assert modules["sss.cli"] / 1000 < BUDGET_MS
+
+
+def test_help_startup_budget():
+    proc, modules = run_cli("--help")
+    assert proc.returncode == 0, proc.stderr
+    assert "scan" in proc.stdout
+    assert_fast(modules)
+
+
+def test_scan_startup_budget(tmp_path: Path):
+    (tmp_path / "shot.png").write_bytes(b"\x89PNG")
+    proc, modules = run_cli("scan", str(tmp_path))
+    assert proc.returncode == 0, proc.stderr
+    assert "shot.png" in proc.stdout
+    assert_fast(modules)
+
+
+def test_executing_scan_startup_budget(tmp_path: Path, monkeypatch):
+    monkeypatch.setenv("SSS_CACHE_DIR", str(tmp_path / "cache"))
+    (tmp_path / "in").mkdir()
+    (tmp_path / "in" / "shot.png").write_bytes(b"\x89PNG")
+    proc, modules = run_cli("scan", str(tmp_path / "in"), "--no-dry-run")
+    assert proc.returncode == 0, proc.stderr
+    assert not (tmp_path / "in" / "shot.png").exists()
+    assert "sss.journal" in modules
+    assert_fast(modules)
+
+
+@pytest.mark.parametrize("command", ["dedupe", "similar"])
+def test_heavy_commands_still_load(command: str, tmp_path: Path):
+    proc, modules = run_cli(command, str(tmp_path))
+    assert proc.returncode == 0, proc.stderr
+    assert "sss.dedupe" in modules
+
+
+def test_digest_choices_match_hashing():
+    assert DIGEST_CHOICES == tuple(ALGORITHMS)
@@ -0,0 +1,213 @@
+import os
+import struct
+import zlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from PIL.PngImagePlugin import PngInfo
+
+from sss import dates as dates_module
+from sss.dates import (
+    DateCache,
+    DateResolver,
+    capture_date,
+    filename_date,
+    header_date,
+)
+from sss.hashcache import DigestCache
+from sss.mover import build_target_path
+from sss.scanner import FileRecord
+
+MTIME = datetime(2020, 2, 2, 12, 0).timestamp()
+
+
+def _touch(path: Path) -> Path:
+    os.utime(path, (MTIME, MTIME))
+    return path
+
+
+def _png_chunk(ctype: bytes, data: bytes) -> bytes:
+    crc = zlib.crc32(ctype + data)
+    return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", crc)
+
+
+def test_jpeg_exif_date_time_original(tmp_path: Path):
+    f = tmp_path / "foto.jpg"
+    exif = Image.Exif()
+    exif[0x0132] = "2019:01:01 00:00:00"  # DateTime (Bearbeitung)
+    exif.get_ifd(0x8769)[0x9003] = "2021:07:08 09:10:11"
+    Image.new("RGB", (8, 8)).save(f, exif=exif.tobytes())
+    _touch(f)
+
+    assert capture_date(f) == datetime(2021, 7, 8, 9, 10, 11)
+
+
+def test_png_creation_time_text(tmp_path: Path):
+    f = tmp_path / "bild.png"
+    info = PngInfo()
+    info.add_text("Creation Time", "2022-01-02T03:04:05")
+    Image.new("RGB", (8, 8)).save(f, pnginfo=info)
+    _touch(f)
+
+    assert capture_date(f) == datetime(2022, 1, 2, 3, 4, 5)
+
+
+def test_png_time_chunk_is_utc(tmp_path: Path):
+    f = tmp_path / "bild.png"
+    Image.new("RGB", (8, 8)).save(f)
+    data = f.read_bytes()
+    tIME = _png_chunk(b"tIME", struct.pack(">HBBBBB", 2023, 3, 4, 5, 6, 7))
+    f.write_bytes(data[:33] + tIME + data[33:])  # direkt nach IHDR
+
+    expected = datetime(2023, 3, 4, 5, 6, 7, tzinfo=timezone.utc).astimezone()
+    assert header_date(f.read_bytes()) == expected.replace(tzinfo=None)
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Screenshot 2024-05-03 at 10.22.11.png", (2024, 5, 3, 10, 22, 11)),
+        ("Screen Shot 2020-01-09 at 1.02.03 PM.png", (2020, 1, 9, 13, 2, 3)),
+        ("Bildschirmfoto 2024-05-03 um 10.22.11.png", (2024, 5, 3, 10, 22, 11)),
+        ("Bildschirmfoto vom 2024-05-03 10-22-11.png", (2024, 5, 3, 10, 22, 11)),
+        ("Bildschirmfoto_20240503_102211.png", (2024, 5, 3, 10, 22, 11)),
+        ("Screenshot_20240503-102211_Chrome.jpg", (2024, 5, 3, 10, 22, 11)),
+        ("Screenshot 2024-05-03 102211.png", (2024, 5, 3, 10, 22, 11)),
+        ("export-2024-05-03.png", (2024, 5, 3, 0, 0, 0)),
+        ("IMG_00000000_000000.png", None),
+        ("shot.png", None),
+    ],
+)
+def test_filename_patterns(name: str, expected):
+    assert filename_date(name) == (expected and datetime(*expected))
+
+
+def test_falls_back_to_filename_then_mtime(tmp_path: Path):
+    named = tmp_path / "Screenshot 2024-05-03 at 10.22.11.png"
+    named.write_bytes(b"\x89PNG\r\n\x1a\n")
+    _touch(named)
+    plain = tmp_path / "shot.png"
+    plain.write_bytes(b"x")
+    _touch(plain)
+
+    assert build_target_path(named, tmp_path) == tmp_path / "2024" / "05"
+    assert build_target_path(FileRecord.from_path(plain), tmp_path) == (
+        tmp_path / "2020" / "02"
+    )
+
+
+def test_resolver_caches_per_stat_signature(tmp_path: Path):
+    files = []
+    for i in range(3):
+        f = tmp_path / f"Screenshot_2024050{i + 1}-101010.png"
+        f.write_bytes(b"x")
+        files.append(FileRecord.from_path(f))
+    cache = tmp_path / "dates.bin"
+
+    with DateResolver(cache) as dates:
+        first = [dates(r) for r in files]
+        assert dates.reads == 3
+
+    with DateResolver(cache) as dates:
+        assert [dates(r) for r in files] == first
+        assert (dates.hits, dates.reads) == (3, 0)
+
+    os.utime(files[0].path, (MTIME, MTIME))  # neue Signatur -> neu lesen
+    with DateResolver(cache) as dates:
+        dates(FileRecord.from_path(files[0].path))
+        assert dates.reads == 1
+    assert len(DateCache(cache)) == 4
+
+
+def test_single_file_runs_use_the_cache(tmp_path: Path):
+    f = tmp_path / "Screenshot 2024-05-03 at 10.22.11.png"
+    f.write_bytes(b"x")
+    cache = tmp_path / "dates.bin"
+
+    with DateResolver(cache) as dates:
+        dates(f)
+    with DateResolver(cache) as dates:
+        assert dates(f) == datetime(2024, 5, 3, 10, 22, 11)
+        assert (dates.hits, dates.reads) == (1, 0)
+
+    with DateResolver(cache, use_cache=False) as dates:
+        dates(f)
+        assert dates.reads == 1
+
+
+def test_date_cache_is_separate_from_digest_eviction(tmp_path: Path):
+    f = tmp_path / "shot.png"
+    f.write_bytes(b"x")
+    with DateResolver() as dates:
+        dates(f)
+    digests = DigestCache(max_entries=0)
+    digests.store(f, os.stat(f), "00" * 32)
+    digests.close()  # verwirft alle Digests (LRU)
+    assert digests.prune() == 0
+
+    with DateResolver() as dates:
+        dates(f)
+        assert dates.hits == 1
+
+
+def test_date_cache_merges_and_ignores_foreign_files(tmp_path: Path):
+    path = tmp_path / "dates.bin"
+    path.write_bytes(b"kein cache")
+    records = []
+    for i in range(50):
+        f = tmp_path / f"f{i}.png"
+        f.write_bytes(b"x" * i)
+        records.append(FileRecord.from_path(f))
+
+    for chunk in (records[::2], records[1::2]):
+        with DateCache(path) as cache:
+            for r in chunk:
+                cache.store(cache.key(r), datetime(2020, 1, 1) + timedelta(r.size))
+
+    with DateCache(path) as cache:
+        assert len(cache) == 50
+        for r in records:
+            assert cache.lookup(cache.key(r)) == datetime(2020, 1, 1) + timedelta(
+                r.size
+            )
+        assert cache.lookup(cache.key(FileRecord.from_path(path))) is None
+
+
+def test_date_cache_appends_deltas_instead_of_rewriting(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(dates_module, "DATE_DELTA_MAX", 4)
+    monkeypatch.setattr(dates_module, "DATE_DELTA_FILES", 3)
+    path = tmp_path / "dates.bin"
+    records = []
+    for i in range(6):
+        f = tmp_path / f"f{i}.png"
+        f.write_bytes(b"x" * i)
+        records.append(FileRecord.from_path(f))
+
+    def run(recs):
+        with DateCache(path) as cache:
+            for r in recs:
+                cache.store(cache.key(r), datetime(2020, 1, 1) + timedelta(r.size))
+
+    def deltas():
+        return sorted(p.name for p in tmp_path.glob("dates.bin.delta-*"))
+
+    run(records[:1])
+    run(records[1:2])
+    assert not path.exists()  # Hauptdatei bleibt unangetastet
+    assert len(deltas()) == 2
+    assert len(DateCache(path)) == 2
+
+    run(records[2:3])
+    run(records[3:4])  # drei Deltas gelesen -> zu einem zusammengefasst
+    assert len(deltas()) == 1 and not path.exists()
+
+    run(records[4:6])  # mehr als DATE_DELTA_MAX -> in die Hauptdatei
+    assert deltas() == [] and path.exists()
+
+    with DateCache(path) as cache:
+        assert len(cache) == 6
+        for r in records:
+            expected = datetime(2020, 1, 1) + timedelta(r.size)
+            assert cache.lookup(cache.key(r)) == expected
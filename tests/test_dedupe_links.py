@@ -0,0 +1,124 @@
+import errno
+import os
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sss import mover
+from sss.cli import app
+from sss.dedupe import DedupAction, find_duplicate_groups, plan_moves
+from sss.mover import execute_actions, link_duplicate
+
+runner = CliRunner()
+
+
+def _pair(tmp_path: Path, content: bytes = b"same bytes") -> tuple[Path, Path]:
+    keeper = tmp_path / "keeper.png"
+    dup = tmp_path / "sub" / "dup.png"
+    dup.parent.mkdir()
+    keeper.write_bytes(content)
+    dup.write_bytes(content)
+    return keeper, dup
+
+
+def _same_file(a: Path, b: Path) -> bool:
+    return os.path.samefile(a, b)
+
+
+def test_plan_link_actions_point_from_keeper_to_duplicate(tmp_path: Path):
+    keeper, dup = _pair(tmp_path)
+    (group,) = find_duplicate_groups([keeper, dup])
+
+    (act,) = plan_moves(group, keeper, action="hardlink")
+
+    assert (act.action, act.src, act.dst) == ("hardlink", keeper, dup)
+    with pytest.raises(ValueError, match="Unsupported action"):
+        plan_moves(group, keeper, action="symlink")
+
+
+def test_hardlink_replaces_duplicate_in_place(tmp_path: Path):
+    keeper, dup = _pair(tmp_path)
+
+    report = execute_actions(
+        [DedupAction(src=keeper, action="hardlink", dst=dup, reason="t")]
+    )
+
+    assert _same_file(keeper, dup)
+    assert dup.read_bytes() == b"same bytes"
+    assert (report.hardlinks, report.bytes_saved) == (1, len(b"same bytes"))
+    assert sorted(p.name for p in dup.parent.iterdir()) == ["dup.png"]
+
+    # zweiter Lauf: schon dieselbe Datei, nichts zu tun
+    report = execute_actions(
+        [DedupAction(src=keeper, action="hardlink", dst=dup, reason="t")]
+    )
+    assert (report.hardlinks, report.bytes_saved, len(report.linked)) == (0, 0, 1)
+
+
+def test_reflink_falls_back_to_hardlink(tmp_path: Path, monkeypatch):
+    keeper, dup = _pair(tmp_path)
+
+    def unsupported(src, tmp):
+        raise OSError(errno.EOPNOTSUPP, "no reflink")
+
+    monkeypatch.setattr(mover, "_reflink", unsupported)
+
+    assert link_duplicate(keeper, dup, reflink=True) == "hardlink"
+    assert _same_file(keeper, dup)
+
+
+def test_reflink_keeps_duplicate_metadata(tmp_path: Path, monkeypatch):
+    keeper, dup = _pair(tmp_path)
+    os.utime(dup, (1_000_000_000, 1_000_000_000))
+
+    def fake_clone(src, tmp):  # Reflink simulieren: eigene Datei, gleicher Inhalt
+        Path(tmp).write_bytes(Path(src).read_bytes())
+
+    monkeypatch.setattr(mover, "_reflink", fake_clone)
+
+    assert link_duplicate(keeper, dup, reflink=True) == "reflink"
+    assert not _same_file(keeper, dup)
+    assert dup.stat().st_mtime == 1_000_000_000
+
+
+def test_link_is_skipped_across_devices(tmp_path: Path, monkeypatch):
+    keeper, dup = _pair(tmp_path)
+
+    def cross_device(src, dst):
+        raise OSError(errno.EXDEV, "cross-device link")
+
+    monkeypatch.setattr(mover.os, "link", cross_device)
+    report = execute_actions(
+        [DedupAction(src=keeper, action="hardlink", dst=dup, reason="t")]
+    )
+
+    assert (report.skipped, report.linked) == (1, [])
+    assert not _same_file(keeper, dup)
+    assert sorted(p.name for p in dup.parent.iterdir()) == ["dup.png"]
+
+
+def test_changed_duplicate_is_not_replaced(tmp_path: Path):
+    keeper, dup = _pair(tmp_path)
+    dup.write_bytes(b"edited after planning")
+
+    with pytest.raises(OSError):
+        execute_actions(
+            [DedupAction(src=keeper, action="hardlink", dst=dup, reason="t")]
+        )
+    assert dup.read_bytes() == b"edited after planning"
+
+
+def test_cli_dedupe_hardlink(tmp_path: Path):
+    (tmp_path / "a.png").write_bytes(b"same")
+    (tmp_path / "b.png").write_bytes(b"same")
+
+    result = runner.invoke(
+        app,
+        ["dedupe", str(tmp_path), "--no-cache", "--execute", "--action", "hardlink"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert _same_file(tmp_path / "a.png", tmp_path / "b.png")
+    assert "verlinkt=1" in result.output
+    assert not (tmp_path / "duplicates").exists()
@@ -0,0 +1,96 @@
+from pathlib import Path
+
+from sss.dedupe import (
+    PARTIAL_BLOCK,
+    DedupeStats,
+    find_duplicate_groups,
+)
+from sss.hashcache import DigestCache
+
+SIZE = 3 * PARTIAL_BLOCK
+
+
+def _write(path: Path, head: bytes, middle: bytes = b"M") -> Path:
+    body = head * PARTIAL_BLOCK + middle * PARTIAL_BLOCK + b"T" * PARTIAL_BLOCK
+    path.write_bytes(body)
+    return path
+
+
+def test_partial_hash_rejects_size_collisions(tmp_path: Path):
+    # gleiche Größe, unterschiedlicher Anfang -> kein Voll-Hash nötig
+    a = _write(tmp_path / "a.png", b"A")
+    b = _write(tmp_path / "b.png", b"B")
+    stats = DedupeStats()
+
+    assert find_duplicate_groups([a, b], stats=stats) == []
+    assert stats.size_candidates == 2
+    assert stats.partial_hashed == 2
+    assert stats.partial_unique == 2
+    assert stats.full_hashed == 0
+    assert stats.full_reads_avoided == 2
+    assert stats.bytes_read == 2 * 2 * PARTIAL_BLOCK
+
+
+def test_full_hash_separates_equal_head_and_tail(tmp_path: Path):
+    a = _write(tmp_path / "a.png", b"A")
+    b = _write(tmp_path / "b.png", b"A")
+    c = _write(tmp_path / "c.png", b"A", middle=b"X")  # nur die Mitte anders
+    stats = DedupeStats()
+
+    groups = find_duplicate_groups([a, b, c], stats=stats)
+
+    assert len(groups) == 1
+    assert set(groups[0].files) == {a, b}
+    assert stats.partial_unique == 0
+    assert stats.full_hashed == 3
+    assert stats.bytes_read == 3 * 2 * PARTIAL_BLOCK + 3 * SIZE
+
+
+def test_small_files_skip_partial_stage(tmp_path: Path):
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+    stats = DedupeStats()
+
+    assert len(find_duplicate_groups([a, b], stats=stats)) == 1
+    assert stats.partial_hashed == 0
+    assert stats.full_hashed == 2
+
+
+def test_cached_bucket_needs_no_reads(tmp_path: Path):
+    a = _write(tmp_path / "a.png", b"A")
+    b = _write(tmp_path / "b.png", b"A")
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        find_duplicate_groups([a, b], cache=cache)
+
+    stats = DedupeStats()
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        groups = find_duplicate_groups([a, b], cache=cache, stats=stats)
+
+    assert len(groups) == 1
+    assert stats.cache_hits == 2
+    assert stats.partial_hashed == 0
+    assert stats.full_hashed == 0
+    assert stats.bytes_read == 0
+
+
+def test_cached_partial_hashes_need_no_reads(tmp_path: Path):
+    # gleiche Größe, anderer Inhalt: nur Teil-Hashes, die beim zweiten Lauf
+    # aus dem Cache kommen
+    a = _write(tmp_path / "a.png", b"A")
+    b = _write(tmp_path / "b.png", b"B")
+    c = _write(tmp_path / "c.png", b"C")
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        find_duplicate_groups([a, b, c], cache=cache)
+
+    stats = DedupeStats()
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        assert find_duplicate_groups([a, b, c], cache=cache, stats=stats) == []
+
+    assert stats.partial_cached == 3
+    assert stats.partial_hashed == 0
+    assert stats.partial_unique == 3
+    assert stats.bytes_read == 0
@@ -0,0 +1,64 @@
+import hashlib
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sss.cli import app
+from sss.dedupe import compute_sha256, find_duplicate_groups
+from sss.hashcache import DigestCache
+from sss.hashing import HashEngine, new_hasher
+
+runner = CliRunner()
+
+
+def test_compute_digest_per_algorithm(tmp_path: Path):
+    f = tmp_path / "a.bin"
+    f.write_bytes(b"abc")
+
+    assert compute_sha256(f) == hashlib.sha256(b"abc").hexdigest()
+    assert (
+        compute_sha256(f, algorithm="blake2b")
+        == hashlib.blake2b(b"abc", digest_size=32).hexdigest()
+    )
+    assert compute_sha256(f, algorithm="blake2s") == hashlib.blake2s(b"abc").hexdigest()
+
+
+def test_unknown_algorithm_rejected():
+    with pytest.raises(ValueError):
+        new_hasher("md5")
+    with pytest.raises(ValueError):
+        HashEngine(algorithm="md5")
+
+
+def test_groups_record_algorithm(tmp_path: Path):
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+
+    (group,) = find_duplicate_groups([a, b], engine=HashEngine(algorithm="blake2b"))
+
+    assert group.algorithm == "blake2b"
+    assert group.digest == hashlib.blake2b(b"same", digest_size=32).hexdigest()
+
+
+def test_cache_never_mixes_algorithms(tmp_path: Path):
+    f = tmp_path / "a.bin"
+    f.write_bytes(b"payload")
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        sha = compute_sha256(f, cache=cache)
+        blake = compute_sha256(f, cache=cache, algorithm="blake2b")
+        assert sha != blake
+        assert cache.hits == 0
+
+        assert compute_sha256(f, cache=cache) == sha
+        assert compute_sha256(f, cache=cache, algorithm="blake2b") == blake
+        assert cache.hits == 2
+        assert len(cache) == 2
+
+
+def test_cli_rejects_unknown_digest(tmp_path: Path):
+    result = runner.invoke(app, ["dedupe", str(tmp_path), "--digest", "md5"])
+    assert result.exit_code == 2
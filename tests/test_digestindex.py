@@ -0,0 +1,225 @@
+import hashlib
+import os
+import shutil
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+import sss.digestindex
+from sss.cli import app
+from sss.dedupe import DedupeStats, plan_against
+from sss.digestindex import DigestIndex, add_pending, index_dir
+from sss.hashcache import DigestCache
+from sss.hashing import DEFAULT_ALGORITHM
+from sss.journal import Journal
+from sss.mover import execute_moves, resume_journal, safe_move
+
+runner = CliRunner()
+
+
+def _archive(root: Path) -> dict[str, Path]:
+    files = {
+        "a": root / "2024" / "05" / "a.png",
+        "b": root / "2024" / "06" / "b.png",
+        "c": root / "2023" / "01" / "c.jpg",
+    }
+    for name, path in files.items():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(name.encode() * 1000)
+    return files
+
+
+def _sha(data: bytes) -> bytes:
+    return hashlib.sha256(data).digest()
+
+
+def test_default_algorithm_mirror_matches_hashing():
+    assert sss.digestindex.DEFAULT_ALGORITHM == DEFAULT_ALGORITHM
+
+
+def _pending(archive: Path) -> list[Path]:
+    return sorted(index_dir(archive).glob("pending-*.jsonl"))
+
+
+def test_build_then_lookup_without_rehashing(tmp_path: Path):
+    files = _archive(tmp_path / "arch")
+
+    with DigestIndex.open(tmp_path / "arch") as index:
+        assert len(index) == 3
+        assert index.hashed == 3
+        assert index.has_size(1000)
+        assert not index.has_size(999)
+        ((path, mtime_ns),) = index.lookup(1000, _sha(b"b" * 1000))
+        assert path == files["b"]
+        assert mtime_ns == files["b"].stat().st_mtime_ns
+        assert index.lookup(1000, _sha(b"x" * 1000)) == []
+
+    with DigestIndex.open(tmp_path / "arch") as again:
+        assert again.hashed == 0
+        assert len(again) == 3
+
+
+def test_pending_moves_reuse_the_cache(tmp_path: Path):
+    _archive(tmp_path / "arch")
+    cache = DigestCache(tmp_path / "cache.sqlite")
+    DigestIndex.open(tmp_path / "arch", cache=cache).close()
+
+    src = tmp_path / "inbox" / "new.png"
+    src.parent.mkdir()
+    src.write_bytes(b"neu")
+    cache.store(src, os.stat(src), hashlib.sha256(b"neu").hexdigest())
+    dst = tmp_path / "arch" / "2024" / "05" / "new.png"
+    os.replace(src, dst)
+    assert add_pending(tmp_path / "arch", [(src, dst), (src, tmp_path / "x")]) == 1
+
+    with DigestIndex.open(tmp_path / "arch", cache=cache) as index:
+        assert index.hashed == 0  # Treffer unter dem alten Pfad
+        assert len(index) == 4
+        assert index.lookup(3, _sha(b"neu"))[0][0] == dst
+    assert _pending(tmp_path / "arch") == []
+    cache.close()
+
+
+def test_moves_noted_during_resolve_are_kept(tmp_path: Path, monkeypatch):
+    archive = tmp_path / "arch"
+    _archive(archive)
+    DigestIndex.open(archive).close()
+    first, late = archive / "2022" / "e.png", archive / "2022" / "f.png"
+    first.parent.mkdir()
+    first.write_bytes(b"e")
+    late.write_bytes(b"f")
+    add_pending(archive, [(tmp_path / "e.png", first)])
+    real_hash = DigestIndex._hash
+
+    def hash_and_race(self, items, cache, engine):
+        # ein paralleler scan merkt vor, während resolve_pending hasht
+        add_pending(archive, [(tmp_path / "f.png", late)])
+        return real_hash(self, items, cache, engine)
+
+    monkeypatch.setattr(DigestIndex, "_hash", hash_and_race)
+    DigestIndex.open(archive).close()
+    monkeypatch.undo()
+
+    assert len(_pending(archive)) == 1
+    with DigestIndex.open(archive) as index:
+        assert len(index) == 5
+        assert index.lookup(1, _sha(b"f"))[0][0] == late
+
+
+def test_library_moves_reach_the_index(tmp_path: Path, monkeypatch):
+    archive = tmp_path / "arch"
+    _archive(archive)
+    DigestIndex.open(archive).close()
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    for name in ("g.png", "h.png", "i.png", "j.png"):
+        (inbox / name).write_bytes(name.encode())
+    dest = archive / "2025" / "01"
+
+    safe_move(inbox / "g.png", dest)
+    execute_moves([(inbox / "h.png", dest / "h.png")])
+    execute_moves([(inbox / "i.png", tmp_path / "elsewhere" / "i.png")])
+    # resume eines abgebrochenen Laufs
+    journal = tmp_path / "j.jsonl"
+    j = Journal(journal, command="scan", unique=True)
+    j.intent(inbox / "j.png", dest / "j.png")
+    j.sync()
+    resume_journal(journal)
+
+    assert len(_pending(archive)) == 3
+    with DigestIndex.open(archive) as index:
+        assert len(index) == 6
+        for name in ("g.png", "h.png", "j.png"):
+            assert index.lookup(5, _sha(name.encode()))[0][0] == dest / name
+
+
+def test_delta_is_merged_into_the_sorted_file(tmp_path: Path, monkeypatch):
+    _archive(tmp_path / "arch")
+    DigestIndex.open(tmp_path / "arch").close()
+    extra = tmp_path / "arch" / "2022" / "d.png"
+    extra.parent.mkdir()
+    extra.write_bytes(b"d" * 10)
+    add_pending(tmp_path / "arch", [(tmp_path / "old" / "d.png", extra)])
+    monkeypatch.setattr(sss.digestindex, "DELTA_LIMIT", 1)
+
+    with DigestIndex.open(tmp_path / "arch") as index:
+        assert len(index) == 4
+        assert index.lookup(10, _sha(b"d" * 10))[0][0] == extra
+        assert index.lookup(1000, _sha(b"a" * 1000))
+
+    assert not list(index_dir(tmp_path / "arch").glob("delta-*.bin"))
+
+
+def test_rebuild_and_algorithm_change_start_a_new_generation(tmp_path: Path):
+    _archive(tmp_path / "arch")
+    DigestIndex.open(tmp_path / "arch").close()
+
+    with DigestIndex.open(tmp_path / "arch", algorithm="blake2s") as index:
+        assert index.hashed == 3
+        assert index.lookup(1000, hashlib.blake2s(b"c" * 1000).digest())
+    with DigestIndex.open(tmp_path / "arch", algorithm="blake2s", rebuild=True):
+        pass
+
+    names = sorted(p.name for p in index_dir(tmp_path / "arch").iterdir())
+    assert names == ["digests.idx", "paths-3.bin"]
+
+
+def test_plan_against_hashes_only_size_matches(tmp_path: Path):
+    files = _archive(tmp_path / "arch")
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    (inbox / "dup.png").write_bytes(b"a" * 1000)
+    (inbox / "same-size.png").write_bytes(b"z" * 1000)
+    (inbox / "other.png").write_bytes(b"kurz")
+    stats = DedupeStats()
+
+    with DigestIndex.open(tmp_path / "arch") as index:
+        actions = plan_against(inbox, index, stats=stats)
+        files["a"].write_bytes(b"a" * 1000)  # jetzt veraltet (mtime)
+        os.utime(files["a"], ns=(1, 1))
+        stale = plan_against(inbox, index)
+
+    assert [(a.src, a.dst.parent.parent) for a in actions] == [
+        (inbox / "dup.png", inbox / "duplicates")
+    ]
+    assert stats.files_seen == 3
+    assert stats.full_hashed == 2
+    assert stale == []
+
+
+def test_cli_dedupe_against_hardlinks_into_archive(tmp_path: Path):
+    files = _archive(tmp_path / "arch")
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    shutil.copy(files["c"], inbox / "c-kopie.jpg")
+    args = ["dedupe", str(inbox), "--against", str(tmp_path / "arch"), "--no-cache"]
+
+    result = runner.invoke(app, [*args, "--execute", "--action", "hardlink"])
+
+    assert result.exit_code == 0, result.output
+    assert "Archiv-Index: 3 Dateien (3 neu gehasht)" in result.output
+    assert os.path.samefile(inbox / "c-kopie.jpg", files["c"])
+
+    again = runner.invoke(app, args)
+    assert again.exit_code == 0, again.output
+    assert "(0 neu gehasht)" in again.output
+    assert "HARDLINK" not in again.output.upper()
+
+    missing = runner.invoke(app, ["dedupe", str(inbox), "--against", "/nix/da"])
+    assert missing.exit_code == 1
+
+
+def test_scan_marks_moves_for_an_existing_index(tmp_path: Path):
+    src = tmp_path / "in"
+    src.mkdir()
+    (src / "shot.png").write_bytes(b"\x89PNG")
+    out_root = src / "_by_date"
+    index_dir(out_root).mkdir(parents=True)
+
+    result = runner.invoke(app, ["scan", str(src), "--no-dry-run"])
+
+    assert result.exit_code == 0, result.output
+    (pending,) = _pending(out_root)
+    assert "shot.png" in pending.read_text(encoding="utf-8")
+    with DigestIndex.open(out_root) as index:
+        assert len(index) == 1
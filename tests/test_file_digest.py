@@ -0,0 +1,57 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import pytest
+
+from sss import hashing
+from sss.hashing import file_digest
+
+
+@pytest.mark.parametrize("size", [0, 1, 4095, 4096, 300_001])
+def test_readinto_and_mmap_paths_agree(tmp_path: Path, size: int):
+    f = tmp_path / "data.bin"
+    data = os.urandom(size)
+    f.write_bytes(data)
+    expected = hashlib.sha256(data).hexdigest()
+
+    # readinto-Pfad mit kleinen Chunks (nie mmap)
+    assert file_digest(f, chunk_size=4096, mmap_threshold=0) == expected
+    # mmap-Pfad (Schwelle 1 Byte -> jede nicht-leere Datei wird gemappt)
+    assert file_digest(f, chunk_size=4096, mmap_threshold=1) == expected
+
+
+def test_buffer_is_reused_per_thread():
+    first = hashing._buffer(1024)
+    second = hashing._buffer(512)
+    assert first.obj is second.obj
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(hashing._buffer(512).obj))
+    t.start()
+    t.join()
+    assert other[0] is not first.obj
+
+
+def test_invalid_chunk_size(tmp_path: Path):
+    f = tmp_path / "a.bin"
+    f.write_bytes(b"x")
+    with pytest.raises(ValueError):
+        file_digest(f, chunk_size=0)
+
+
+@pytest.mark.parametrize("mmap_threshold", [0, 1])
+def test_file_digest_head_returns_prefix_from_same_pass(
+    tmp_path: Path, mmap_threshold: int
+):
+    f = tmp_path / "data.bin"
+    data = os.urandom(50_000)
+    f.write_bytes(data)
+
+    digest, head = hashing.file_digest_head(
+        f, head_size=10_000, chunk_size=4096, mmap_threshold=mmap_threshold
+    )
+
+    assert digest == hashlib.sha256(data).hexdigest()
+    assert head == data[:10_000]
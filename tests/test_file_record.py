@@ -0,0 +1,102 @@
+import os
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sss.cli import app
+from sss.dedupe import choose_keeper, find_duplicate_groups, plan_moves
+from sss.mover import build_target_path, safe_move
+from sss.scanner import FileRecord
+
+runner = CliRunner()
+
+
+@pytest.fixture
+def stat_calls(monkeypatch):
+    """Zählt os.stat-Aufrufe pro Pfad (Path.stat/is_file laufen darüber)."""
+    calls: Counter[str] = Counter()
+    real_stat = os.stat
+
+    def counting_stat(path, *args, **kwargs):
+        calls[os.fspath(path)] += 1
+        return real_stat(path, *args, **kwargs)
+
+    monkeypatch.setattr(os, "stat", counting_stat)
+    return calls
+
+
+def test_record_from_path_holds_single_stat(tmp_path: Path):
+    f = tmp_path / "a.png"
+    f.write_bytes(b"12345")
+    st = os.stat(f)
+
+    rec = FileRecord.from_path(f)
+
+    assert (rec.path, rec.size, rec.mtime_ns) == (f, 5, st.st_mtime_ns)
+    assert (rec.ino, rec.dev) == (st.st_ino, st.st_dev)
+    assert os.fspath(rec) == str(f)
+    assert not hasattr(rec, "__dict__")
+
+
+def test_dedupe_pipeline_stats_each_file_once(tmp_path: Path, stat_calls):
+    files = []
+    for name, content in [("a", b"dup"), ("b", b"dup"), ("c", b"one")]:
+        f = tmp_path / f"{name}.png"
+        f.write_bytes(content)
+        files.append(f)
+
+    records = [FileRecord.from_path(f) for f in files]
+    (group,) = find_duplicate_groups(records)
+    keeper = choose_keeper(group)
+    actions = plan_moves(group, keeper, target_dir=tmp_path / "dupes")
+    dest = build_target_path(records[2], tmp_path / "out")
+    safe_move(records[2], dest)
+
+    assert len(actions) == 1
+    for f in files:
+        assert stat_calls[str(f)] == 1, f
+
+
+def test_find_duplicate_groups_stats_plain_paths_once(tmp_path: Path, stat_calls):
+    a = tmp_path / "a.png"
+    b = tmp_path / "b.png"
+    a.write_bytes(b"dup")
+    b.write_bytes(b"dup")
+
+    (group,) = find_duplicate_groups([a, b])
+    choose_keeper(group)
+
+    assert stat_calls[str(a)] == 1
+    assert stat_calls[str(b)] == 1
+
+
+def test_scan_uses_only_the_scandir_stat(tmp_path: Path, stat_calls, monkeypatch):
+    src = tmp_path / "in"
+    src.mkdir()
+    ts = datetime(2024, 7, 5, 12, 0).timestamp()
+    names = ["a.png", "b.jpg", "c.jpeg"]
+    for name in names:
+        f = src / name
+        f.write_bytes(b"x" * 10)
+        os.utime(f, (ts, ts))
+
+    entry_stats: Counter[str] = Counter()
+    real_from_entry = FileRecord.from_entry.__func__
+
+    def counting_from_entry(cls, entry):
+        entry_stats[entry.name] += 1
+        return real_from_entry(cls, entry)
+
+    monkeypatch.setattr(FileRecord, "from_entry", classmethod(counting_from_entry))
+
+    result = runner.invoke(
+        app, ["scan", str(src), "--no-dry-run", "--out-dir", str(tmp_path / "out")]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert entry_stats == Counter(names)
+    for name in names:
+        assert stat_calls[str(src / name)] == 0
@@ -0,0 +1,138 @@
+import os
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+import sss.dedupe as dedupe_module
+from sss.cli import app
+from sss.dedupe import compute_sha256, find_duplicate_groups
+from sss.hashcache import DigestCache
+from sss.metadata import get_sha256
+from sss.scanner import FileRecord
+
+runner = CliRunner()
+
+
+def test_cache_hit_skips_reading(tmp_path: Path, monkeypatch):
+    f = tmp_path / "a.png"
+    f.write_bytes(b"DATA")
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        first = compute_sha256(f, cache=cache)
+
+    # Zweiter Lauf: Datei darf nicht mehr geöffnet werden
+    def fail_open(*_args, **_kwargs):
+        raise AssertionError("file was read despite cache hit")
+
+    monkeypatch.setattr(Path, "open", fail_open)
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        assert compute_sha256(f, cache=cache) == first
+        assert get_sha256(f, cache=cache) == first
+        assert cache.hits == 2
+
+
+def test_cache_invalidated_by_mtime_and_size(tmp_path: Path):
+    f = tmp_path / "a.png"
+    f.write_bytes(b"DATA")
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        old = compute_sha256(f, cache=cache)
+
+        f.write_bytes(b"OTHER DATA")
+        st = f.stat()
+        os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+        new = compute_sha256(f, cache=cache)
+        assert new != old
+        assert cache.misses == 2
+
+
+def test_find_duplicate_groups_uses_cache(tmp_path: Path, monkeypatch):
+    a = tmp_path / "a.txt"
+    b = tmp_path / "b.txt"
+    a.write_bytes(b"same")
+    b.write_bytes(b"same")
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        groups = find_duplicate_groups([a, b], cache=cache)
+    assert len(groups) == 1
+
+    monkeypatch.setattr(Path, "open", lambda *a, **k: 1 / 0)
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        again = find_duplicate_groups([a, b], cache=cache)
+        assert cache.hits == 2
+    assert again[0].digest == groups[0].digest
+
+
+def test_records_without_inode_match_stat_signatures(tmp_path: Path):
+    f = tmp_path / "a.png"
+    f.write_bytes(b"DATA")
+    st = os.stat(f)
+    # wie FileRecord.from_entry unter Windows: st_ino/st_dev sind 0
+    record = FileRecord(f, st.st_size, st.st_mtime_ns, 0, 0)
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        cache.store(f, record, "ab" * 32)
+        assert cache.prune() == 0
+        assert cache.lookup(f, st) == "ab" * 32
+        assert cache.lookup(f, FileRecord.from_path(f)) == "ab" * 32
+
+        f.write_bytes(b"OTHER")
+        assert cache.lookup(f, os.stat(f)) is None
+        assert cache.prune() == 1
+
+
+def test_prune_and_max_entries(tmp_path: Path):
+    files = []
+    for i in range(5):
+        f = tmp_path / f"f{i}.bin"
+        f.write_bytes(bytes([i]) * 10)
+        files.append(f)
+
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        for f in files:
+            compute_sha256(f, cache=cache)
+        assert len(cache) == 5
+
+        files[0].unlink()
+        assert cache.prune() == 1
+        assert len(cache) == 4
+
+        assert cache.prune(max_entries=2) == 2
+        assert len(cache) == 2
+
+    # Obergrenze greift auch beim Schließen
+    with DigestCache(tmp_path / "c.sqlite", max_entries=1) as cache:
+        compute_sha256(files[4], cache=cache)
+    with DigestCache(tmp_path / "c.sqlite") as cache:
+        assert len(cache) == 1
+
+
+def test_cli_dedupe_real_plan_with_cache(tmp_path: Path):
+    data = tmp_path / "data"
+    data.mkdir()
+    (data / "a.jpg").write_bytes(b"123")
+    (data / "b.jpg").write_bytes(b"123")
+    (data / "c.jpg").write_bytes(b"456")
+    cache_file = tmp_path / "cache.sqlite"
+
+    result = runner.invoke(app, ["dedupe", str(data), "--cache-path", str(cache_file)])
+    assert result.exit_code == 0, result.output
+    assert "Dry-Run: 1 geplante Aktionen" in result.stdout
+    with DigestCache(cache_file) as cache:
+        # alle drei Dateien haben dieselbe Größe -> alle gehasht
+        assert len(cache) == 3
+
+    result = runner.invoke(app, ["dedupe", str(data), "--no-cache"])
+    assert result.exit_code == 0, result.output
+    assert "Dry-Run: 1 geplante Aktionen" in result.stdout
+
+
+def test_plan_directory_plans_a_whole_folder(tmp_path: Path):
+    (tmp_path / "a.jpg").write_bytes(b"x")
+    (tmp_path / "b.jpg").write_bytes(b"x")
+
+    actions = dedupe_module.plan_directory(tmp_path)
+
+    assert len(actions) == 1
+    assert actions[0].dst.parent.parent == tmp_path / "duplicates"
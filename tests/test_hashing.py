@@ -0,0 +1,75 @@
+import hashlib
+import random
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from sss.dedupe import find_duplicate_groups
+from sss.hashing import HashEngine
+from sss.metadata import get_sha256_many
+
+
+def test_map_keeps_input_order_when_workers_finish_out_of_order():
+    def slow_first(n: int) -> int:
+        # frühe Einträge dauern länger -> Worker werden in umgekehrter Reihenfolge fertig
+        time.sleep(0.01 * (5 - n))
+        return n * n
+
+    engine = HashEngine(4)
+    assert engine.map(slow_first, range(5), sizes=[1] * 5) == [0, 1, 4, 9, 16]
+
+
+def test_map_respects_inflight_byte_budget():
+    lock = threading.Lock()
+    inflight = 0
+    peak = 0
+
+    def work(size: int) -> int:
+        nonlocal inflight, peak
+        with lock:
+            inflight += size
+            peak = max(peak, inflight)
+        time.sleep(0.005)
+        with lock:
+            inflight -= size
+        return size
+
+    sizes = [40, 40, 40, 40, 40, 40]
+    engine = HashEngine(6, max_inflight_bytes=100)
+    assert engine.map(work, sizes, sizes=sizes) == sizes
+    assert peak <= 100
+
+
+def test_invalid_jobs():
+    with pytest.raises(ValueError):
+        HashEngine(0)
+
+
+def test_parallel_groups_are_deterministic(tmp_path: Path):
+    rng = random.Random(7)
+    paths = []
+    for i in range(40):
+        f = tmp_path / f"f{i:02d}.bin"
+        f.write_bytes(bytes([i % 5]) * (200_000 + (i % 3)))
+        paths.append(f)
+    rng.shuffle(paths)
+
+    serial = find_duplicate_groups(paths)
+    for _ in range(3):
+        parallel = find_duplicate_groups(paths, engine=HashEngine(8))
+        assert [(g.size, g.digest, g.files) for g in parallel] == [
+            (g.size, g.digest, g.files) for g in serial
+        ]
+
+
+def test_get_sha256_many(tmp_path: Path):
+    files = []
+    for i in range(6):
+        f = tmp_path / f"{i}.bin"
+        f.write_bytes(str(i).encode() * 1000)
+        files.append(f)
+
+    expected = [hashlib.sha256(f.read_bytes()).hexdigest() for f in files]
+    assert get_sha256_many(files, jobs=3) == expected
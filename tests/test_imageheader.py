@@ -0,0 +1,83 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from PIL import Image, features
+
+from sss.imageheader import parse_image_header, read_image_header
+from sss.metadata import get_image_size
+
+FORMATS = [
+    ("png", "PNG", {}),
+    ("jpg", "JPEG", {}),
+    ("gif", "GIF", {}),
+    ("bmp", "BMP", {}),
+]
+if features.check("webp"):
+    FORMATS += [
+        ("webp", "WEBP", {"lossless": False}),
+        ("webp", "WEBP", {"lossless": True}),
+    ]
+
+
+@pytest.mark.parametrize("ext, fmt, options", FORMATS)
+def test_header_matches_pillow(tmp_path: Path, ext, fmt, options):
+    f = tmp_path / f"img.{ext}"
+    Image.new("RGB", (123, 45), "red").save(f, **options)
+
+    with f.open("rb") as fh:
+        assert read_image_header(fh) == (fmt, 123, 45)
+    assert get_image_size(f) == (123, 45)
+
+
+def test_jpeg_with_large_exif_block_is_found_by_seeking(tmp_path: Path):
+    f = tmp_path / "big_exif.jpg"
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 20_000  # ImageDescription -> APP1 größer als der Kopf
+    Image.new("RGB", (640, 480)).save(f, exif=exif.tobytes())
+
+    head = f.read_bytes()[:4096]
+    assert parse_image_header(head) is None  # SOF liegt hinter dem Kopf
+    with f.open("rb") as fh:
+        assert read_image_header(fh) == ("JPEG", 640, 480)
+
+
+def test_bmp_top_down_height_is_positive():
+    head = bytearray(b"BM" + bytes(24))
+    head[14:18] = (40).to_bytes(4, "little")
+    head[18:22] = (10).to_bytes(4, "little", signed=True)
+    head[22:26] = (-20).to_bytes(4, "little", signed=True)
+    assert parse_image_header(bytes(head)) == ("BMP", 10, 20)
+
+
+def test_unknown_format_falls_back_to_pillow(tmp_path: Path):
+    f = tmp_path / "img.tiff"
+    Image.new("RGB", (7, 9)).save(f)
+
+    with f.open("rb") as fh:
+        assert read_image_header(fh) is None
+    assert get_image_size(f) == (7, 9)
+
+
+def test_non_image_raises_oserror(tmp_path: Path):
+    f = tmp_path / "fake.png"
+    f.write_bytes(b"not an image")
+    with pytest.raises(OSError):
+        get_image_size(f)
+
+
+def test_metadata_import_does_not_load_pillow():
+    code = "import sys, sss.metadata; print('PIL' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env={
+            **os.environ,
+            "PYTHONPATH": str(Path(__file__).resolve().parents[1] / "src"),
+        },
+    )
+    assert out.stdout.strip() == "False"
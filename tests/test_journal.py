@@ -0,0 +1,312 @@
+import json
+import os
+import time
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sss import journal as journal_module
+from sss import mover
+from sss.cli import app
+from sss.journal import Journal, default_journal_dir, read_journal
+from sss.mover import execute_moves, resume_journal, safe_move
+from sss.renamer import NameAllocator
+
+runner = CliRunner()
+
+
+def _inbox(root: Path, n: int) -> list[Path]:
+    root.mkdir()
+    paths = []
+    for i in range(n):
+        p = root / f"shot{i}.png"
+        p.write_bytes(b"%d" % i)
+        paths.append(p)
+    return paths
+
+
+def _crash_after(monkeypatch, n: int):
+    """os.replace in mover schlägt nach n Aufrufen mit einem 'Absturz' fehl."""
+    real_replace = os.replace
+    calls = []
+
+    def replace(src, dst):
+        if len(calls) == n:
+            raise KeyboardInterrupt
+        calls.append(src)
+        real_replace(src, dst)
+
+    monkeypatch.setattr(mover.os, "replace", replace)
+    return real_replace
+
+
+def test_roundtrip_and_torn_last_line(tmp_path: Path):
+    path = tmp_path / "j.jsonl"
+    with Journal(path, command="scan", unique=True) as j:
+        a = j.intent(Path("/in/a.png"), Path("/out/a.png"))
+        b = j.intent(Path("/in/b.png"), Path("/out/b.png"))
+        j.done(a)
+    with path.open("a") as f:
+        f.write('{"op": "done", "i"')  # Absturz mitten im Schreiben
+
+    state = read_journal(path)
+
+    assert state.command == "scan" and state.unique and state.complete
+    assert state.pending == [(b, Path("/in/b.png"), Path("/out/b.png"))]
+
+
+def test_corrupt_line_in_the_middle_is_an_error(tmp_path: Path):
+    path = tmp_path / "j.jsonl"
+    with Journal(path, command="scan", unique=True) as j:
+        j.intent(Path("a"), Path("b"))
+    lines = path.read_text().splitlines()
+    lines[1] = "{kaputt"
+    path.write_text("\n".join(lines) + "\n")
+
+    with pytest.raises(ValueError):
+        read_journal(path)
+
+
+def test_fsync_is_batched(tmp_path: Path, monkeypatch):
+    srcs = _inbox(tmp_path / "in", 5)
+    syncs = []
+    monkeypatch.setattr(journal_module.os, "fsync", syncs.append)
+
+    with Journal(tmp_path / "j.jsonl", command="scan", unique=True, sync_every=2) as j:
+        report = execute_moves(
+            [(s, tmp_path / "out" / s.name) for s in srcs], journal=j
+        )
+
+    assert len(report.moved) == 5
+    # begin + 3 Blöcke + Abschluss der Kopierstufe + end
+    assert len(syncs) == 6
+    ops = [json.loads(line)["op"] for line in (tmp_path / "j.jsonl").open()]
+    assert ops.count("intent") == ops.count("done") == 5
+    assert set(report.timings) == {"plan", "mkdir", "rename", "copy", "fsync"}
+
+
+def test_fsync_has_its_own_stage(tmp_path: Path, monkeypatch):
+    srcs = _inbox(tmp_path / "in", 2)
+    monkeypatch.setattr(journal_module.os, "fsync", lambda fd: time.sleep(0.05))
+
+    with Journal(tmp_path / "j.jsonl", command="scan", unique=True) as j:
+        report = execute_moves(
+            [(s, tmp_path / "out" / s.name) for s in srcs], journal=j
+        )
+
+    # Block-fsync (Stufe rename) und Abschluss-fsync (Stufe copy)
+    assert report.timings["fsync"] >= 0.1
+    assert report.timings["rename"] < 0.05 and report.timings["copy"] < 0.05
+
+
+def test_resume_finishes_interrupted_run(tmp_path: Path, monkeypatch):
+    srcs = _inbox(tmp_path / "in", 4)
+    out = tmp_path / "out"
+    path = tmp_path / "j.jsonl"
+    real_replace = _crash_after(monkeypatch, 2)
+
+    with pytest.raises(KeyboardInterrupt):
+        with Journal(path, command="scan", unique=True) as j:
+            execute_moves([(s, out / s.name) for s in srcs], journal=j)
+    monkeypatch.setattr(mover.os, "replace", real_replace)
+
+    state = read_journal(path)
+    assert not state.complete
+    assert len(state.pending) == 2
+    # die offenen Ziele sind als leere Platzhalter reserviert
+    assert all(
+        dst.exists() and dst.stat().st_size == 0 for _i, _s, dst in state.pending
+    )
+
+    report = resume_journal(path)
+
+    assert len(report.moved) == 2 and not report.errors
+    assert sorted(p.name for p in out.iterdir()) == [s.name for s in srcs]
+    assert not any(s.exists() for s in srcs)
+    assert (out / "shot3.png").read_bytes() == b"3"
+    assert read_journal(path).complete
+
+
+def test_placeholders_are_journaled_before_they_exist(tmp_path: Path, monkeypatch):
+    srcs = _inbox(tmp_path / "in", 4)
+    out = tmp_path / "out"
+    path = tmp_path / "j.jsonl"
+    real_take = NameAllocator.take
+    taken = []
+    on_disk = []
+
+    def take(self, name):
+        if len(taken) == 2:
+            # Absturz beim Belegen: nur was bis hier synchronisiert ist, bleibt
+            on_disk.append(path.read_bytes())
+            raise KeyboardInterrupt
+        taken.append(name)
+        return real_take(self, name)
+
+    monkeypatch.setattr(NameAllocator, "take", take)
+    with pytest.raises(KeyboardInterrupt):
+        with Journal(path, command="scan", unique=True) as j:
+            execute_moves([(s, out / s.name) for s in srcs], journal=j)
+    monkeypatch.undo()
+    path.write_bytes(on_disk[0])
+
+    state = read_journal(path)
+    assert len(state.pending) == 4
+    assert {p.name for p in out.iterdir()} <= {d.name for _i, _s, d in state.pending}
+
+    resume_journal(path, rollback=True)
+
+    assert list(out.iterdir()) == []
+    assert all(s.exists() for s in srcs)
+
+
+def test_name_taken_by_another_process_gets_a_new_intent(tmp_path: Path, monkeypatch):
+    (src,) = _inbox(tmp_path / "in", 1)
+    out = tmp_path / "out"
+    out.mkdir()
+    path = tmp_path / "j.jsonl"
+    real_take = NameAllocator.take
+
+    def take(self, name):
+        if name == "shot0.png":
+            (out / name).write_bytes(b"fremd")  # kam nach dem Listen dazu
+        return real_take(self, name)
+
+    monkeypatch.setattr(NameAllocator, "take", take)
+    with Journal(path, command="scan", unique=True) as j:
+        report = execute_moves([(src, out / "shot0.png")], journal=j)
+
+    assert report.moved == [(src, out / "shot0 (1).png")]
+    assert (out / "shot0.png").read_bytes() == b"fremd"
+    state = read_journal(path)
+    assert [d.name for d in (dst for _s, dst in state.intents.values())] == [
+        "shot0.png",
+        "shot0 (1).png",
+    ]
+    assert not state.pending
+
+
+def test_resume_rollback_restores_sources(tmp_path: Path):
+    srcs = _inbox(tmp_path / "in", 2)
+    out = tmp_path / "out"
+    out.mkdir()
+    path = tmp_path / "j.jsonl"
+    j = Journal(path, command="scan", unique=True)
+    j.intent(srcs[0], out / "shot0.png")
+    j.intent(srcs[1], out / "shot1.png")
+    j.sync()
+    os.replace(srcs[0], out / "shot0.png")  # verschoben, aber nicht quittiert
+    (out / "shot1.png").write_bytes(b"")  # nur Platzhalter
+
+    report = resume_journal(path, rollback=True)
+
+    assert len(report.moved) == 2
+    assert srcs[0].read_bytes() == b"0" and srcs[1].read_bytes() == b"1"
+    assert list(out.iterdir()) == []
+
+
+@pytest.mark.parametrize("rollback", [False, True])
+def test_resume_leaves_foreign_target_alone(tmp_path: Path, rollback: bool):
+    (src,) = _inbox(tmp_path / "in", 1)
+    out = tmp_path / "out"
+    out.mkdir()
+    path = tmp_path / "j.jsonl"
+    j = Journal(path, command="scan", unique=True)
+    j.intent(src, out / "shot0.png")
+    j.sync()  # Absturz vor take(): den Namen belegt ein anderer Prozess
+    (out / "shot0.png").write_bytes(b"fremd")
+
+    report = resume_journal(path, rollback=rollback)
+
+    assert not report.errors
+    assert (out / "shot0.png").read_bytes() == b"fremd"
+    if rollback:
+        assert src.read_bytes() == b"0"
+        assert list(out.iterdir()) == [out / "shot0.png"]
+    else:
+        assert report.moved == [(src, out / "shot0 (1).png")]
+        assert (out / "shot0 (1).png").read_bytes() == b"0"
+        state = read_journal(path)
+        assert state.complete and not state.pending
+
+
+def test_claimed_half_copy_is_removed_on_rollback(tmp_path: Path):
+    (src,) = _inbox(tmp_path / "in", 1)
+    out = tmp_path / "out"
+    out.mkdir()
+    path = tmp_path / "j.jsonl"
+    j = Journal(path, command="scan", unique=True)
+    j.intent(src, out / "shot0.png")
+    j.claimed(0)
+    j.sync()
+    (out / "shot0.png").write_bytes(b"halb")  # abgebrochene Kopie
+
+    resume_journal(path, rollback=True)
+
+    assert list(out.iterdir()) == []
+    assert src.read_bytes() == b"0"
+
+
+def test_resume_reports_lost_files(tmp_path: Path):
+    path = tmp_path / "j.jsonl"
+    j = Journal(path, command="dedupe", unique=False)
+    j.intent(tmp_path / "gone.png", tmp_path / "out" / "gone.png")
+    j.sync()
+
+    report = resume_journal(path)
+
+    assert [src.name for src, _exc in report.errors] == ["gone.png"]
+    assert not read_journal(path).complete
+
+
+def test_safe_move_with_journal(tmp_path: Path):
+    (src,) = _inbox(tmp_path / "in", 1)
+    path = tmp_path / "j.jsonl"
+    with Journal(path, command="watch", unique=True) as j:
+        dest = safe_move(src, tmp_path / "out", journal=j)
+
+    assert dest.read_bytes() == b"0"
+    state = read_journal(path)
+    assert state.intents == {0: (src, dest)} and not state.pending
+
+
+def test_cli_scan_removes_auto_journal_after_success(tmp_path: Path):
+    _inbox(tmp_path / "in", 2)
+
+    result = runner.invoke(
+        app,
+        [
+            "scan",
+            str(tmp_path / "in"),
+            "--no-dry-run",
+            "--out-dir",
+            str(tmp_path / "out"),
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Journal:" in result.output
+    assert list(default_journal_dir().glob("*.jsonl")) == []
+
+
+def test_cli_resume_lists_and_finishes(tmp_path: Path, monkeypatch):
+    srcs = _inbox(tmp_path / "in", 3)
+    path = default_journal_dir() / "crashed-scan.jsonl"
+    real_replace = _crash_after(monkeypatch, 1)
+    with pytest.raises(KeyboardInterrupt):
+        with Journal(path, command="scan", unique=True) as j:
+            execute_moves([(s, tmp_path / "out" / s.name) for s in srcs], journal=j)
+    monkeypatch.setattr(mover.os, "replace", real_replace)
+
+    listed = runner.invoke(app, ["resume"])
+    assert "crashed-scan.jsonl" in listed.output
+    assert "2 offen" in listed.output
+
+    result = runner.invoke(app, ["resume", str(path)])
+    assert result.exit_code == 0, result.output
+    assert "Fertiggestellt: 2 von 2" in result.output
+    assert not any(s.exists() for s in srcs)
+
+    again = runner.invoke(app, ["resume", str(path)])
+    assert "Nichts zu tun" in again.output
@@ -111,3 +111,41 @@ def test_extract_metadata_includes_image_size(tmp_path):
     assert md["mime"] == "image/png"
     assert md["width"] == 100
     assert md["height"] == 50
+
+
+def test_extract_metadata_reads_image_once(tmp_path, monkeypatch):
+    import sss.metadata as metadata
+
+    f = tmp_path / "bild.jpg"
+    exif = Image.Exif()
+    exif[0x010E] = "x" * 20_000  # SOF liegt hinter den ersten 4 KB
+    Image.new("RGB", (64, 48)).save(f, exif=exif.tobytes())
+
+    def no_second_open(_path):
+        raise AssertionError("Datei wurde ein zweites Mal geöffnet")
+
+    monkeypatch.setattr(metadata, "get_image_size", no_second_open)
+    md = extract_metadata(f)
+
+    assert (md["width"], md["height"]) == (64, 48)
+    assert md["sha256"] == hashlib.sha256(f.read_bytes()).hexdigest()
+
+
+def test_extract_metadata_many_keeps_input_order(tmp_path):
+    from sss.hashcache import DigestCache
+    from sss.metadata import extract_metadata_many
+
+    paths = []
+    for i in range(6):
+        f = tmp_path / f"bild{i}.png"
+        Image.new("RGB", (10 + i, 20)).save(f, format="PNG")
+        paths.append(f)
+    (tmp_path / "notiz.txt").write_text("kein Bild")
+    paths.append(tmp_path / "notiz.txt")
+
+    with DigestCache(tmp_path / "cache.sqlite") as cache:
+        cold = extract_metadata_many(paths, jobs=4, cache=cache)
+        warm = extract_metadata_many(paths, jobs=4, cache=cache)
+
+    assert cold == warm == [extract_metadata(p) for p in paths]
+    assert [md.get("width") for md in cold] == [10, 11, 12, 13, 14, 15, None]
@@ -0,0 +1,105 @@
+import errno
+import os
+from pathlib import Path
+
+from sss import mover
+from sss.mover import execute_moves
+from sss.renamer import unique_path
+from sss.scanner import FileRecord
+
+
+def _files(root: Path, *names: str) -> list[Path]:
+    root.mkdir(exist_ok=True)
+    paths = []
+    for name in names:
+        p = root / name
+        p.write_bytes(name.encode())
+        paths.append(p)
+    return paths
+
+
+def test_each_target_dir_is_created_once(tmp_path: Path, monkeypatch):
+    a, b, c = _files(tmp_path / "in", "a.png", "b.png", "c.png")
+    out = tmp_path / "out"
+    (out / "2024").mkdir(parents=True)  # keine rekursiven makedirs-Aufrufe
+    made = []
+    real_makedirs = os.makedirs
+    monkeypatch.setattr(
+        mover.os, "makedirs", lambda d, **kw: made.append(d) or real_makedirs(d, **kw)
+    )
+
+    report = execute_moves(
+        [(a, out / "2024" / "01" / "a.png"), (b, out / "2024" / "01" / "b.png")]
+        + [(FileRecord.from_path(c), out / "2024" / "02" / "c.png")]
+    )
+
+    assert sorted(made) == [out / "2024" / "01", out / "2024" / "02"]
+    assert report.dirs == 2
+    assert report.renamed == 3 and report.copied == 0
+    assert (out / "2024" / "02" / "c.png").read_bytes() == b"c.png"
+    assert not c.exists()
+    assert set(report.timings) == {"plan", "mkdir", "rename", "copy"}
+
+
+def test_unique_names_within_batch_and_existing(tmp_path: Path):
+    srcs = [_files(tmp_path / f"in{i}", "shot.png")[0] for i in range(3)]
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "shot.png").write_bytes(b"old")
+
+    report = execute_moves([(s, out / "shot.png") for s in srcs])
+
+    assert [dst.name for _src, dst in report.moved] == [
+        "shot (1).png",
+        "shot (2).png",
+        "shot (3).png",
+    ]
+    assert (out / "shot.png").read_bytes() == b"old"
+
+
+def test_unique_false_replaces(tmp_path: Path):
+    (src,) = _files(tmp_path / "in", "a.png")
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "a.png").write_bytes(b"old")
+
+    report = execute_moves([(src, out / "a.png")], unique=False)
+
+    assert report.moved == [(src, out / "a.png")]
+    assert (out / "a.png").read_bytes() == b"a.png"
+
+
+def test_cross_device_falls_back_to_copy(tmp_path: Path, monkeypatch):
+    srcs = _files(tmp_path / "in", "a.png", "b.png", "c.png")
+    out = tmp_path / "out"
+
+    def exdev(*_args, **_kwargs):
+        raise OSError(errno.EXDEV, "Invalid cross-device link")
+
+    monkeypatch.setattr(mover.os, "link", exdev)
+    monkeypatch.setattr(mover.os, "replace", exdev)
+    report = execute_moves([(s, out / s.name) for s in srcs], workers=2)
+
+    assert report.renamed == 0 and report.copied == 3
+    assert sorted(p.name for p in out.iterdir()) == ["a.png", "b.png", "c.png"]
+    assert not any(s.exists() for s in srcs)
+
+
+def test_errors_do_not_stop_the_batch(tmp_path: Path):
+    (ok,) = _files(tmp_path / "in", "ok.png")
+    missing = tmp_path / "in" / "missing.png"
+
+    report = execute_moves(
+        [(missing, tmp_path / "out" / "missing.png")]
+        + [(ok, tmp_path / "out" / "ok.png")]
+    )
+
+    assert [src for src, _exc in report.errors] == [missing]
+    assert report.moved == [(ok, tmp_path / "out" / "ok.png")]
+    assert "fehler=1" in report.render()
+
+
+def test_unique_path_does_not_create_dir(tmp_path: Path):
+    target = tmp_path / "not-yet"
+    assert unique_path(target, "a.png") == target / "a.png"
+    assert not target.exists()
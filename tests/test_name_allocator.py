@@ -0,0 +1,129 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from sss import mover, renamer
+from sss.mover import safe_move
+from sss.renamer import NameAllocator
+
+
+@pytest.fixture
+def listdir_calls(monkeypatch):
+    calls = []
+    real_listdir = os.listdir
+
+    def counting_listdir(path="."):
+        calls.append(path)
+        return real_listdir(path)
+
+    monkeypatch.setattr(renamer.os, "listdir", counting_listdir)
+    return calls
+
+
+def test_lists_directory_once_and_never_probes(
+    tmp_path: Path, listdir_calls, monkeypatch
+):
+    (tmp_path / "shot.png").write_bytes(b"")
+    monkeypatch.setattr(Path, "exists", lambda self: 1 / 0)
+
+    alloc = NameAllocator(tmp_path)
+    names = [alloc.next_name("shot.png") for _ in range(1000)]
+
+    assert names[0] == "shot (1).png"
+    assert names[-1] == "shot (1000).png"
+    assert len(listdir_calls) == 1
+
+
+def test_continues_after_highest_counter(tmp_path: Path):
+    for name in ["shot.png", "shot (7).png", "shot (2).jpg", "other.png"]:
+        (tmp_path / name).write_bytes(b"")
+
+    alloc = NameAllocator(tmp_path)
+
+    assert alloc.next_name("shot.png") == "shot (8).png"
+    assert alloc.next_name("shot.jpg") == "shot.jpg"
+    assert alloc.next_name("shot.jpg") == "shot (3).jpg"
+    assert alloc.next_name("new.png") == "new.png"
+    assert alloc.next_name("bild:neu?.png") == "bild_neu_.png"
+
+
+def test_missing_directory_is_empty(tmp_path: Path):
+    assert NameAllocator(tmp_path / "nope").next_name("a.png") == "a.png"
+
+
+def test_claim_skips_names_taken_by_other_writers(tmp_path: Path):
+    alloc = NameAllocator(tmp_path)
+    alloc.next_name("x.png")  # Ordner ist jetzt gelistet (leer)
+    (tmp_path / "shot.png").write_bytes(b"fremd")
+    (tmp_path / "shot (1).png").write_bytes(b"fremd")
+
+    path = alloc.claim("shot.png")
+
+    assert path == tmp_path / "shot (2).png"
+    assert path.read_bytes() == b""
+    assert (tmp_path / "shot.png").read_bytes() == b"fremd"
+
+
+def test_link_skips_names_taken_by_other_writers(tmp_path: Path):
+    src = tmp_path / "src.png"
+    src.write_bytes(b"neu")
+    out = tmp_path / "out"
+    out.mkdir()
+    alloc = NameAllocator(out)
+    alloc.next_name("x.png")
+    (out / "src.png").write_bytes(b"fremd")
+
+    assert alloc.link(src, "src.png") == out / "src (1).png"
+    assert (out / "src.png").read_bytes() == b"fremd"
+
+
+def test_safe_move_without_hardlinks_uses_placeholder(tmp_path: Path, monkeypatch):
+    out = tmp_path / "out"
+    out.mkdir()
+    (out / "a.png").write_bytes(b"old")
+    src = tmp_path / "a.png"
+    src.write_bytes(b"new")
+
+    def no_links(*_args, **_kwargs):
+        raise PermissionError("hardlinks not supported")
+
+    monkeypatch.setattr(renamer.os, "link", no_links)
+    dest = safe_move(src, out)
+
+    # kein Zähler wurde durch den gescheiterten Link verbraucht
+    assert dest == out / "a (1).png"
+    assert dest.read_bytes() == b"new"
+    assert not src.exists()
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink") or os.name == "nt", reason="Symlinks")
+@pytest.mark.parametrize("nofollow", [True, False])
+def test_safe_move_moves_symlinks_as_links(tmp_path: Path, monkeypatch, nofollow: bool):
+    monkeypatch.setattr(renamer, "_LINK_NOFOLLOW", nofollow and renamer._LINK_NOFOLLOW)
+    target = tmp_path / "target.png"
+    target.write_bytes(b"bild")
+    src = tmp_path / "in" / "shot.png"
+    src.parent.mkdir()
+    src.symlink_to(target)
+
+    dest = safe_move(src, tmp_path / "out")
+
+    assert dest.is_symlink() and os.readlink(dest) == str(target)
+    assert not os.path.lexists(src)
+    assert os.stat(target).st_nlink == 1
+
+
+def test_safe_move_reuses_allocator(tmp_path: Path, listdir_calls):
+    out = tmp_path / "out"
+    alloc = NameAllocator(out)
+    dests = []
+    for i in range(3):
+        src = tmp_path / f"in{i}" / "shot.png"
+        src.parent.mkdir()
+        src.write_bytes(b"%d" % i)
+        dests.append(safe_move(src, out, allocator=alloc))
+
+    assert [d.name for d in dests] == ["shot.png", "shot (1).png", "shot (2).png"]
+    assert len(listdir_calls) == 1
+    assert mover.NameAllocator is NameAllocator
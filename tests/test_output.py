@@ -0,0 +1,111 @@
+import io
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from sss.cli import app
+from sss.output import Output
+
+runner = CliRunner()
+
+
+def _shots(root: Path, n: int) -> None:
+    for i in range(n):
+        (root / f"shot{i}.png").write_bytes(b"x" * (i + 1))
+
+
+def _records(output: str) -> list[dict]:
+    return [json.loads(line) for line in output.splitlines()]
+
+
+def test_output_modes_filter_lines_and_records():
+    for fmt, quiet, expected in (
+        ("text", False, "a\nsumme\n"),
+        ("text", True, "summe\n"),
+        ("jsonl", False, '{"type":"plan","src":"x/ä"}\n{"type":"summary","n":1}\n'),
+        ("jsonl", True, '{"type":"summary","n":1}\n'),
+    ):
+        buf = io.StringIO()
+        out = Output(fmt, quiet=quiet, stream=buf)
+        out.line("a")
+        out.record(kind="plan", src=Path("x/ä"))
+        out.summary("summe", {"n": 1})
+        assert buf.getvalue() == expected, (fmt, quiet)
+
+
+def test_scan_help_says_sorting_lists_everything_first():
+    result = runner.invoke(app, ["scan", "--help"], terminal_width=200)
+    assert result.exit_code == 0
+    assert "komplett gelistet, auch mit --format jsonl" in result.output
+
+
+def test_scan_jsonl_dry_run(tmp_path: Path):
+    _shots(tmp_path, 3)
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--format", "jsonl"])
+
+    assert result.exit_code == 0, result.output
+    records = _records(result.output)
+    assert [r["type"] for r in records] == ["plan"] * 3 + ["summary"]
+    assert {Path(r["src"]).name for r in records[:3]} == {
+        "shot0.png",
+        "shot1.png",
+        "shot2.png",
+    }
+    assert records[0]["dst"].endswith(Path(records[0]["src"]).name)
+    assert records[-1]["simulated"] == 3
+
+
+def test_scan_jsonl_execute_reports_final_paths(tmp_path: Path):
+    _shots(tmp_path, 2)
+    out_dir = tmp_path / "out"
+
+    result = runner.invoke(
+        app,
+        [
+            "scan",
+            str(tmp_path),
+            "--no-dry-run",
+            "--out-dir",
+            str(out_dir),
+            "--format",
+            "jsonl",
+        ],
+    )
+
+    assert result.exit_code == 0, result.output
+    moves = [r for r in _records(result.output) if r["type"] == "move"]
+    assert len(moves) == 2
+    assert all(Path(r["dst"]).is_file() for r in moves)
+
+
+def test_scan_quiet_prints_only_summary(tmp_path: Path):
+    _shots(tmp_path, 2)
+
+    result = runner.invoke(app, ["scan", str(tmp_path), "--quiet"])
+
+    assert result.exit_code == 0, result.output
+    assert "PLAN" not in result.output
+    assert "Simulation" not in result.output
+    assert "Zusammenfassung: gesamt=2" in result.output
+
+
+def test_dedupe_jsonl_dry_run(tmp_path: Path):
+    (tmp_path / "a.png").write_bytes(b"same")
+    (tmp_path / "b.png").write_bytes(b"same")
+
+    result = runner.invoke(
+        app, ["dedupe", str(tmp_path), "--no-cache", "--format", "jsonl"]
+    )
+
+    assert result.exit_code == 0, result.output
+    records = _records(result.output)
+    assert [r["type"] for r in records] == ["plan", "summary"]
+    assert records[0]["action"] == "move"
+    assert records[1]["files_hashed"] == 2
+
+
+def test_unknown_format_is_rejected(tmp_path: Path):
+    result = runner.invoke(app, ["scan", str(tmp_path), "--format", "xml"])
+    assert result.exit_code == 2
@@ -0,0 +1,90 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from sss.dedupe import DuplicateGroup, choose_keeper
+from sss.pathtable import PathTable
+from sss.scanner import FileRecord
+
+
+def test_path_table_roundtrip_and_interning(tmp_path: Path):
+    paths = [
+        tmp_path / "a" / "x.png",
+        tmp_path / "a" / "Bildschirmfoto ü.png",
+        tmp_path / "b" / "x.png",
+        Path("relativ.png"),
+    ]
+    table = PathTable()
+
+    ids = [table.add(p) for p in paths]
+
+    assert ids == [0, 1, 2, 3]
+    assert [table[i] for i in ids] == paths
+    assert list(table) == paths
+    assert table.dirs == 3
+    assert table.nbytes() > 0
+
+
+def test_path_table_keeps_undecodable_names(tmp_path: Path):
+    name = os.fsdecode(b"shot-\xff.png")
+    table = PathTable()
+
+    assert table[table.add(tmp_path / name)] == tmp_path / name
+
+
+def test_group_is_compact_but_behaves_like_before(tmp_path: Path):
+    digest = "ab" * 32
+    recs = [
+        FileRecord(tmp_path / "a.png", 5, 2_000, 11, 1),
+        FileRecord(tmp_path / "b.png", 5, 1_000, 2**63 + 5, 1),
+    ]
+    table = PathTable()
+
+    group = DuplicateGroup(size=5, digest=digest, records=recs, table=table)
+    other = DuplicateGroup(5, bytes.fromhex(digest), [r.path for r in recs])
+
+    assert group.raw_digest == bytes([0xAB]) * 32
+    assert group.digest == digest
+    assert group.files == tuple(r.path for r in recs)
+    assert [(r.path, r.mtime_ns, r.ino) for r in group.records] == [
+        (r.path, r.mtime_ns, r.ino) for r in recs
+    ]
+    assert len(group) == len(other) == 2
+    assert group == other
+    assert other.records == ()
+    assert choose_keeper(group) == recs[0].path
+    assert "a.png" in repr(group)
+
+
+def test_group_accepts_any_digest_and_reassigned_files(tmp_path: Path):
+    recs = [
+        FileRecord(tmp_path / name, 3 + i, 1_000 * i, i + 1, 1)
+        for i, name in enumerate(("a.png", "b.png", "c.png"))
+    ]
+    group = DuplicateGroup(3, "not-hex", algorithm="custom", records=recs)
+    assert group.digest == "not-hex"
+    assert DuplicateGroup(3, "ABCD").digest == "ABCD"
+    assert DuplicateGroup(3, "abcd").raw_digest == b"\xab\xcd"
+
+    with pytest.raises(AttributeError):
+        group.files.append(tmp_path / "x.png")  # nur per Zuweisung änderbar
+    with pytest.raises(AttributeError):
+        group.records.remove(recs[0])
+    assert len(group) == 3
+    group.files = [recs[2].path, recs[0].path]
+    assert group.files == (recs[2].path, recs[0].path)
+    assert [r.size for r in group.records] == [recs[2].size, recs[0].size]
+    group.files = [*group.files, str(tmp_path / "new.png")]
+    assert len(group) == 3 and group.records == ()
+
+
+def test_groups_share_one_table(tmp_path: Path):
+    table = PathTable()
+    first = DuplicateGroup(1, "00", [tmp_path / "a", tmp_path / "b"], table=table)
+    second = DuplicateGroup(1, "01", [tmp_path / "c", tmp_path / "d"], table=table)
+
+    assert len(table) == 4
+    assert table.dirs == 1
+    assert second.files == (tmp_path / "c", tmp_path / "d")
+    assert first.files == (tmp_path / "a", tmp_path / "b")
@@ -0,0 +1,198 @@
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+import sss.cli
+from sss.cli import app
+from sss.dedupe import (
+    PARTIAL_BLOCK,
+    DedupeStats,
+    find_duplicate_groups,
+    stream_duplicate_groups,
+)
+from sss.hashcache import DigestCache
+from sss.hashing import HashEngine
+from sss.mover import MoveReport, execute_moves
+from sss.pipeline import Pipeline
+from sss.scanner import iter_files
+
+runner = CliRunner()
+
+
+def test_map_flat_batch_and_finish_in_order():
+    got = []
+    Pipeline(range(10), maxsize=2).map(lambda x: x * 2).map(
+        lambda x: [x, x + 1] if x % 4 == 0 else None, inline=True, flat=True
+    ).map(lambda x: x, finish=lambda: "fertig").run(sink=got.append)
+
+    assert got == [0, 1, 4, 5, 8, 9, 12, 13, 16, 17, "fertig"]
+
+
+def test_batch_collects_everything():
+    batches = []
+    Pipeline(range(100)).batch(30).run(sink=batches.append)
+
+    assert all(1 <= len(b) <= 30 for b in batches)
+    assert [x for b in batches for x in b] == list(range(100))
+
+
+def test_single_worker_stays_on_one_thread():
+    threads = set()
+
+    def note(_x=None):
+        threads.add(threading.get_ident())
+
+    Pipeline(range(200)).map(note, finish=note).run()
+
+    assert len(threads) == 1
+    assert threading.get_ident() not in threads
+
+
+def test_parallel_workers_see_every_item():
+    got = []
+    Pipeline(range(500)).map(lambda x: x + 1, workers=4).run(sink=got.append)
+
+    assert sorted(got) == list(range(1, 501))
+
+
+def test_backpressure_bounds_items_in_flight():
+    produced = 0
+    ahead = []
+
+    def source():
+        nonlocal produced
+        for i in range(2000):
+            produced += 1
+            yield i
+
+    def sink(i):
+        ahead.append(produced - (i + 1))
+
+    Pipeline(source(), maxsize=4).map(lambda x: x).run(sink=sink)
+
+    assert len(ahead) == 2000
+    # Quell-Block + zwei Warteschlangen + je ein Element in Arbeit
+    assert max(ahead) <= 64 + 2 * 4 + 2
+
+
+def test_stage_errors_propagate():
+    def boom(x):
+        if x == 50:
+            raise ValueError("kaputt")
+        return x
+
+    with pytest.raises(ValueError, match="kaputt"):
+        Pipeline(range(1000), maxsize=2).map(boom, workers=3).run()
+
+
+def _big(path: Path, head: bytes, middle: bytes = b"M") -> Path:
+    path.write_bytes(head * PARTIAL_BLOCK + middle * PARTIAL_BLOCK + b"T" * 10)
+    return path
+
+
+def _tree(root: Path) -> None:
+    (root / "sub").mkdir(parents=True)
+    _big(root / "a.png", b"A")
+    _big(root / "sub" / "b.png", b"A")
+    _big(root / "c.png", b"A", middle=b"X")
+    _big(root / "d.png", b"B")
+    for name in ("e.txt", "sub/f.txt", "g.txt"):
+        (root / name).write_bytes(b"klein")
+    (root / "h.txt").write_bytes(b"einzeln")
+
+
+@pytest.mark.parametrize("jobs", [1, 4])
+def test_stream_groups_match_sequential(tmp_path: Path, jobs: int):
+    _tree(tmp_path)
+    seq_stats, stream_stats = DedupeStats(), DedupeStats()
+    records = list(iter_files(tmp_path, recursive=True))
+
+    expected = find_duplicate_groups(
+        sorted(records, key=lambda r: r.path), stats=seq_stats
+    )
+    got = stream_duplicate_groups(
+        reversed(records), stats=stream_stats, engine=HashEngine(jobs)
+    )
+
+    assert [(g.digest, g.files) for g in got] == [(g.digest, g.files) for g in expected]
+    for name in (
+        "files_seen",
+        "size_candidates",
+        "partial_hashed",
+        "partial_unique",
+        "full_hashed",
+        "bytes_read",
+    ):
+        assert getattr(stream_stats, name) == getattr(seq_stats, name), name
+    assert {"partial-hash", "full-hash", "group"} <= set(
+        dict(stream_stats.stages.items())
+    )
+
+
+def test_stream_groups_use_the_cache(tmp_path: Path):
+    root = tmp_path / "tree"
+    _tree(root)
+    cache = DigestCache(tmp_path / "cache.sqlite")
+    first_stats, stats = DedupeStats(), DedupeStats()
+    first = stream_duplicate_groups(
+        iter_files(root, recursive=True), cache=cache, stats=first_stats
+    )
+
+    again = stream_duplicate_groups(
+        iter_files(root, recursive=True), cache=cache, stats=stats
+    )
+
+    assert [g.files for g in again] == [g.files for g in first]
+    assert stats.full_hashed == 0
+    assert stats.cache_hits == first_stats.full_hashed
+    assert stats.partial_hashed == 0
+    assert stats.partial_cached == first_stats.partial_hashed > 0
+    assert stats.bytes_read == 0
+    cache.close()
+
+
+def test_execute_moves_shares_allocators_across_batches(tmp_path: Path):
+    src = tmp_path / "in"
+    src.mkdir()
+    for name in ("x1", "x2"):
+        (src / name).mkdir()
+        (src / name / "shot.png").write_bytes(name.encode())
+    dest = tmp_path / "out"
+    allocators: dict = {}
+    total = MoveReport()
+
+    for name in ("x1", "x2"):
+        total.merge(
+            execute_moves(
+                [(src / name / "shot.png", dest / "shot.png")], allocators=allocators
+            )
+        )
+
+    assert sorted(p.name for p in dest.iterdir()) == ["shot (1).png", "shot.png"]
+    assert len(total.moved) == 2
+    assert total.dirs == 1
+    assert list(allocators) == [dest]
+
+
+def test_scan_runs_on_the_pipeline(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(sss.cli, "_PIPELINE_AFTER", 2)
+    monkeypatch.setattr(sss.cli, "_MOVE_BATCH", 3)
+    src = tmp_path / "in"
+    src.mkdir()
+    names = [f"shot{i}.png" for i in range(10)]
+    for name in names:
+        (src / name).write_bytes(b"\x89PNG")
+    journal = tmp_path / "scan.journal"
+
+    result = runner.invoke(
+        app,
+        ["scan", str(src), "--no-dry-run", "--no-sort", "--journal", str(journal)],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert result.output.count("✓ Verschoben") == 10
+    moved = sorted(p.name for p in (src / "_by_date").rglob("*.png"))
+    assert moved == sorted(names)
+    assert not list(src.glob("*.png"))
@@ -0,0 +1,105 @@
+import os
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sss.cli import app
+from sss.scanner import FileRecord, iter_files
+
+runner = CliRunner()
+
+
+def _tree(root: Path) -> None:
+    (root / "a.png").write_bytes(b"a")
+    (root / "notes.txt").write_bytes(b"n")
+    (root / "sub").mkdir()
+    (root / "sub" / "b.JPG").write_bytes(b"bb")
+    (root / "sub" / "deep").mkdir()
+    (root / "sub" / "deep" / "c.jpeg").write_bytes(b"ccc")
+    (root / "skip").mkdir()
+    (root / "skip" / "d.png").write_bytes(b"d")
+
+
+def _names(records) -> set[str]:
+    return {r.name for r in records}
+
+
+def test_top_level_only_by_default(tmp_path: Path):
+    _tree(tmp_path)
+    assert _names(iter_files(tmp_path)) == {"a.png", "notes.txt"}
+
+
+def test_recursive_with_depth_extensions_and_exclude(tmp_path: Path):
+    _tree(tmp_path)
+    exts = (".png", ".jpg", ".jpeg")
+
+    all_images = iter_files(tmp_path, recursive=True, extensions=exts)
+    assert _names(all_images) == {"a.png", "b.JPG", "c.jpeg", "d.png"}
+
+    depth_one = iter_files(tmp_path, recursive=True, max_depth=1, extensions=exts)
+    assert _names(depth_one) == {"a.png", "b.JPG", "d.png"}
+
+    by_name = iter_files(tmp_path, recursive=True, extensions=exts, exclude=["skip"])
+    assert _names(by_name) == {"a.png", "b.JPG", "c.jpeg"}
+
+    by_path = iter_files(
+        tmp_path, recursive=True, extensions=exts, exclude=[tmp_path / "sub"]
+    )
+    assert _names(by_path) == {"a.png", "d.png"}
+
+
+def test_records_carry_stat_data(tmp_path: Path):
+    f = tmp_path / "a.png"
+    f.write_bytes(b"12345")
+    os.utime(f, ns=(1_700_000_000_000_000_000, 1_700_000_000_000_000_000))
+
+    (record,) = iter_files(tmp_path)
+
+    assert isinstance(record, FileRecord)
+    assert record.path == f
+    assert record.size == 5
+    assert record.mtime_ns == 1_700_000_000_000_000_000
+
+
+def test_walk_is_lazy(tmp_path: Path):
+    (tmp_path / "a.png").write_bytes(b"a")
+    (tmp_path / "sub").mkdir()
+
+    it = iter_files(tmp_path, recursive=True)
+    assert next(it).name == "a.png"
+
+    # sub wurde noch nicht gelesen -> nachträglich angelegte Datei erscheint
+    (tmp_path / "sub" / "late.png").write_bytes(b"l")
+    assert [r.name for r in it] == ["late.png"]
+
+
+def test_negative_max_depth_rejected(tmp_path: Path):
+    with pytest.raises(ValueError):
+        list(iter_files(tmp_path, recursive=True, max_depth=-1))
+
+
+def test_cli_scan_recursive_skips_out_root(tmp_path: Path):
+    _tree(tmp_path)
+    ts = datetime(2024, 7, 5, 12, 0).timestamp()
+    for f in tmp_path.rglob("*"):
+        if f.is_file():
+            os.utime(f, (ts, ts))
+
+    result = runner.invoke(
+        app, ["scan", str(tmp_path), "--recursive", "--no-dry-run", "--no-sort"]
+    )
+    assert result.exit_code == 0, result.output
+
+    target = tmp_path / "_by_date" / "2024" / "07"
+    assert sorted(p.name for p in target.iterdir()) == [
+        "a.png",
+        "b.JPG",
+        "c.jpeg",
+        "d.png",
+    ]
+
+    # zweiter Lauf findet die bereits einsortierten Dateien nicht erneut
+    result = runner.invoke(app, ["scan", str(tmp_path), "--recursive"])
+    assert "Keine Screenshots gefunden." in result.stdout
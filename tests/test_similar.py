@@ -0,0 +1,114 @@
+import random
+from pathlib import Path
+
+from PIL import Image, ImageDraw
+from typer.testing import CliRunner
+
+from sss.cli import app
+from sss.dedupe import choose_keeper
+from sss.similar import BKTree, dhash, find_similar_groups, hamming
+
+runner = CliRunner()
+
+
+def _screen(seed: int, size=(320, 200)) -> Image.Image:
+    rng = random.Random(seed)
+    img = Image.new("RGB", size, "white")
+    draw = ImageDraw.Draw(img)
+    for _ in range(12):
+        x0, y0 = rng.randrange(size[0]), rng.randrange(size[1])
+        x1, y1 = x0 + rng.randrange(20, 120), y0 + rng.randrange(10, 60)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle([x0, y0, x1, y1], fill=color)
+    return img
+
+
+def _variants(tmp_path: Path) -> dict[str, Path]:
+    base = _screen(1)
+    other = _screen(2)
+    paths = {
+        "png": tmp_path / "shot.png",
+        "jpg": tmp_path / "shot.jpg",
+        "small": tmp_path / "shot_small.png",
+        "other": tmp_path / "other.png",
+    }
+    base.save(paths["png"])
+    base.save(paths["jpg"], quality=80)
+    base.resize((160, 100)).save(paths["small"])
+    other.save(paths["other"])
+    return paths
+
+
+def test_dhash_is_stable_across_format_and_size(tmp_path: Path):
+    paths = _variants(tmp_path)
+    h = {k: dhash(p) for k, p in paths.items()}
+
+    assert 0 <= h["png"] < 2**64
+    assert hamming(h["png"], h["jpg"]) <= 6
+    assert hamming(h["png"], h["small"]) <= 6
+    assert hamming(h["png"], h["other"]) > 12
+
+
+def test_bktree_matches_brute_force():
+    rng = random.Random(42)
+    values = [rng.getrandbits(64) for _ in range(300)]
+    # ein paar nahe Nachbarn einstreuen
+    values += [v ^ (1 << rng.randrange(64)) for v in values[:50]]
+
+    tree = BKTree()
+    for i, v in enumerate(values):
+        tree.add(v, i)
+    assert len(tree) == len(values)
+
+    for probe in values[:40]:
+        expected = {v for v in values if hamming(v, probe) <= 8}
+        found = {value for _d, value, _items in tree.query(probe, 8)}
+        assert found == expected
+
+
+def test_find_similar_groups_compatible_with_keeper(tmp_path: Path):
+    paths = _variants(tmp_path)
+    ordered = sorted(paths.values())
+
+    (group,) = find_similar_groups(ordered)
+
+    assert group.algorithm == "dhash"
+    assert len(group.digest) == 16
+    assert set(group.files) == {paths["png"], paths["jpg"], paths["small"]}
+    assert list(group.files) == sorted(group.files)
+    # größte Datei bleibt liegen
+    largest = max(group.files, key=lambda p: p.stat().st_size)
+    assert choose_keeper(group, policy="largest") == largest
+
+
+def test_cli_similar_dry_run_and_execute(tmp_path: Path):
+    paths = _variants(tmp_path)
+
+    result = runner.invoke(app, ["similar", str(tmp_path)])
+    assert result.exit_code == 0, result.output
+    assert "Dry-Run: 1 Gruppen, 2 geplante Aktionen" in result.stdout
+
+    result = runner.invoke(app, ["similar", str(tmp_path), "--execute"])
+    assert result.exit_code == 0, result.output
+    assert paths["other"].exists()
+    remaining = [k for k in ("png", "jpg", "small") if paths[k].exists()]
+    assert len(remaining) == 1
+    assert len(list((tmp_path / "similar").rglob("*.*"))) == 2
+
+
+def test_cli_similar_keeps_same_named_files_from_subfolders(tmp_path: Path):
+    base = _screen(1)
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    base.resize((640, 400)).save(tmp_path / "keep.png")
+    base.resize((160, 100)).save(tmp_path / "a" / "shot.png")
+    base.resize((200, 125)).save(tmp_path / "b" / "shot.png")
+    sizes = {(tmp_path / d / "shot.png").stat().st_size for d in ("a", "b")}
+
+    result = runner.invoke(app, ["similar", str(tmp_path), "-r", "--execute"])
+    assert result.exit_code == 0, result.output
+
+    moved = list((tmp_path / "similar").rglob("*.png"))
+    assert sorted(p.name for p in moved) == ["shot (1).png", "shot.png"]
+    assert {p.stat().st_size for p in moved} == sizes
+    assert (tmp_path / "keep.png").exists()
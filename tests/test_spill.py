@@ -0,0 +1,123 @@
+import random
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+import sss.spill
+from sss.cli import app
+from sss.dedupe import (
+    PARTIAL_BLOCK,
+    DedupeStats,
+    find_duplicate_groups,
+    iter_duplicate_groups_external,
+)
+from sss.scanner import iter_files
+from sss.spill import PathStore, RunSorter
+
+runner = CliRunner()
+
+
+def _items(n: int) -> list[tuple[int, int]]:
+    rng = random.Random(7)
+    return [(rng.randrange(50), i) for i in range(n)]
+
+
+def test_run_sorter_in_memory(tmp_path: Path):
+    sorter = RunSorter("<QQ", max_items=1000, directory=tmp_path)
+    for item in _items(100):
+        sorter.add(item)
+
+    assert list(sorter.merged()) == sorted(_items(100))
+    assert sorter.runs == 0
+    assert not list(tmp_path.iterdir())
+
+
+def test_run_sorter_spills_and_merges(tmp_path: Path, monkeypatch):
+    monkeypatch.setattr(sss.spill, "MAX_FANIN", 3)
+    sorter = RunSorter("<QQ", max_items=7, directory=tmp_path)
+    for item in _items(100):
+        sorter.add(item)
+
+    assert list(sorter.merged()) == sorted(_items(100))
+    # 15 Läufe + Zwischen-Merges wegen MAX_FANIN=3
+    assert sorter.runs > 15
+    assert sorter.bytes_spilled >= 100 * 16
+    assert not list(tmp_path.iterdir())
+
+
+def test_path_store_roundtrip(tmp_path: Path):
+    names = [tmp_path / "a.png", tmp_path / "Ümlaut ü.png", tmp_path / "x" / "y.jpg"]
+    with PathStore(tmp_path / "paths.bin") as store:
+        ids = [store.add(p) for p in names[:2]]
+        assert store.get(ids[0]) == names[0]
+        ids.append(store.add(names[2]))  # schreiben nach dem Lesen
+        assert [store.get(i) for i in reversed(ids)] == names[::-1]
+
+
+def _tree(root: Path) -> None:
+    root.mkdir()
+    big = b"A" * PARTIAL_BLOCK * 3
+    for name, data in [
+        ("a.png", big),
+        ("b.png", big),
+        ("c.png", b"B" * len(big)),
+        ("d.txt", b"klein"),
+        ("e.txt", b"klein"),
+        ("f.txt", b"kleiN"),
+        ("g.txt", b"einzeln"),
+    ]:
+        (root / name).write_bytes(data)
+    for i in range(40):
+        (root / f"u{i}.bin").write_bytes(b"u" * (i + 100))
+
+
+def _as_sets(groups):
+    return sorted((g.digest, sorted(g.files)) for g in groups)
+
+
+def test_external_groups_match_in_memory(tmp_path: Path):
+    root = tmp_path / "tree"
+    _tree(root)
+    expected_stats, stats = DedupeStats(), DedupeStats()
+    expected = find_duplicate_groups(list(iter_files(root)), stats=expected_stats)
+
+    # winziges Budget: viele Läufe, Hash-Blöcke von wenigen Dateien
+    got = list(
+        iter_duplicate_groups_external(
+            iter_files(root), max_memory=2000, stats=stats, spill_dir=tmp_path
+        )
+    )
+
+    assert _as_sets(got) == _as_sets(expected)
+    assert stats.files_seen == expected_stats.files_seen == 47
+    assert stats.size_candidates == expected_stats.size_candidates
+    assert stats.full_hashed == expected_stats.full_hashed
+    assert stats.spilled_runs > 1
+    assert "ausgelagert=" in stats.render()
+    assert [p.name for p in tmp_path.iterdir()] == ["tree"]
+
+
+def test_external_groups_are_a_stream(tmp_path: Path):
+    root = tmp_path / "tree"
+    _tree(root)
+
+    groups = iter_duplicate_groups_external(iter_files(root), max_memory=1 << 20)
+
+    assert next(groups).files
+    assert len(list(groups)) == 1
+
+
+def test_cli_dedupe_max_memory(tmp_path: Path):
+    root = tmp_path / "tree"
+    _tree(root)
+
+    result = runner.invoke(
+        app, ["dedupe", str(root), "--no-cache", "--max-memory", "1M"]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "dateien=47" in result.output
+    assert result.output.count("/duplicates/") == 2
+
+    bad = runner.invoke(app, ["dedupe", str(root), "--max-memory", "viel"])
+    assert bad.exit_code != 0
@@ -0,0 +1,91 @@
+import json
+from pathlib import Path
+
+from typer.testing import CliRunner
+
+from sss.cli import app
+from sss.dedupe import PARTIAL_BLOCK, DedupeStats, find_duplicate_groups
+from sss.summary import StageTimes, Summary, percentile
+
+runner = CliRunner()
+
+
+def test_percentile_nearest_rank():
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([3.0], 99) == 3.0
+    assert percentile([], 50) is None
+
+
+def test_stage_times_measure_wrap_and_merge():
+    stages = StageTimes()
+    with stages.measure("plan"):
+        pass
+    with stages.measure("plan"):
+        pass
+    assert list(stages.wrap("walk", [1, 2, 3])) == [1, 2, 3]
+
+    assert stages["plan"].calls == 2
+    assert stages["walk"].calls == 4  # drei Elemente + StopIteration
+
+    other = StageTimes()
+    other.add("plan", 1.0, 0.5)
+    stages.merge(other)
+    assert stages["plan"].calls == 3
+    assert stages["plan"].wall >= 1.0
+
+
+def test_summary_to_dict_is_json():
+    summary = Summary(out_root=Path("out"))
+    summary.stages.add("walk", 0.25, 0.125)
+    summary.add_latency(0.002)
+    data = json.loads(json.dumps(summary.to_dict()))
+    assert data["stages"]["walk"] == {"wall_s": 0.25, "cpu_s": 0.125, "calls": 1}
+    assert data["latency"] == {"count": 1, "p50_s": 0.002, "p99_s": 0.002}
+
+
+def test_dedupe_records_stages_and_latencies(tmp_path: Path):
+    body = b"X" * (3 * PARTIAL_BLOCK)
+    (tmp_path / "a.png").write_bytes(body)
+    (tmp_path / "b.png").write_bytes(body)
+    stats = DedupeStats()
+
+    groups = find_duplicate_groups(sorted(tmp_path.iterdir()), stats=stats)
+
+    assert len(groups) == 1
+    for stage in ("stat", "partial-hash", "full-hash", "group"):
+        assert stage in stats.stages
+    assert len(stats.latencies) == stats.full_hashed == 2
+
+
+def test_scan_stats_report(tmp_path: Path):
+    for name in ("a.png", "b.png"):
+        (tmp_path / name).write_bytes(b"x")
+    out = tmp_path / "stats.json"
+
+    result = runner.invoke(
+        app, ["scan", str(tmp_path), "--stats", "--stats-json", str(out)]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Stufen (wall / cpu):" in result.output
+    assert "Latenz pro Datei: p50" in result.output
+    data = json.loads(out.read_text(encoding="utf-8"))
+    assert {"walk", "sort", "plan"} <= set(data["stages"])
+    assert data["latency"]["count"] == 2
+    assert data["simulated"] == 2
+
+
+def test_dedupe_stats_json_stdout(tmp_path: Path):
+    (tmp_path / "a.png").write_bytes(b"same")
+    (tmp_path / "b.png").write_bytes(b"same")
+
+    result = runner.invoke(
+        app, ["dedupe", str(tmp_path), "--no-cache", "--stats-json", "-"]
+    )
+
+    assert result.exit_code == 0, result.output
+    data = json.loads(result.output[result.output.index("{") :])
+    assert data["files_hashed"] == 2
+    assert "full-hash" in data["stages"]
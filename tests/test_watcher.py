@@ -0,0 +1,108 @@
+import os
+import threading
+from pathlib import Path
+
+import pytest
+from typer.testing import CliRunner
+
+from sss.cli import app
+from sss.scanner import IMAGE_EXTENSIONS
+from sss.watcher import InotifyWatcher, PollingWatcher, inotify_available
+
+runner = CliRunner()
+
+needs_inotify = pytest.mark.skipif(
+    not inotify_available(), reason="inotify nur unter Linux"
+)
+
+
+def test_polling_ignores_existing_and_waits_until_stable(tmp_path: Path):
+    (tmp_path / "old.png").write_bytes(b"old")
+    w = PollingWatcher(tmp_path, extensions=IMAGE_EXTENSIONS, interval=0.01)
+
+    new = tmp_path / "new.png"
+    new.write_bytes(b"x")
+    (tmp_path / "notes.txt").write_bytes(b"n")
+    assert w.scan_once() == []  # erst einmal gesehen
+
+    # wächst noch -> weiter warten
+    with new.open("ab") as f:
+        f.write(b"more")
+    assert w.scan_once() == []
+
+    assert w.scan_once() == [new]
+    assert w.scan_once() == []  # nicht doppelt melden
+
+
+def test_polling_poll_sleeps_and_reports(tmp_path: Path):
+    with PollingWatcher(tmp_path, interval=0.01) as w:
+        (tmp_path / "a.png").write_bytes(b"a")
+        found = w.poll() + w.poll()
+    assert found == [tmp_path / "a.png"]
+    with pytest.raises(ValueError):
+        w.poll()
+
+
+@needs_inotify
+def test_inotify_reports_only_closed_files(tmp_path: Path):
+    with InotifyWatcher(tmp_path, extensions=IMAGE_EXTENSIONS) as w:
+        f = (tmp_path / "partial.png").open("wb")
+        f.write(b"half")
+        f.flush()
+        assert w.poll(0.05) == []  # noch offen
+        f.close()
+        (tmp_path / "notes.txt").write_bytes(b"n")
+        assert w.poll(1.0) == [tmp_path / "partial.png"]
+
+
+@needs_inotify
+def test_inotify_reports_moved_in_files(tmp_path: Path):
+    inbox = tmp_path / "inbox"
+    inbox.mkdir()
+    staged = tmp_path / "shot.jpg"
+    staged.write_bytes(b"jpg")
+    with InotifyWatcher(inbox, extensions=IMAGE_EXTENSIONS) as w:
+        os.rename(staged, inbox / "shot.jpg")
+        (inbox / "sub").mkdir()  # Verzeichnisse ignorieren
+        assert w.poll(1.0) == [inbox / "shot.jpg"]
+
+
+def test_watch_initial_scan_moves_existing(tmp_path: Path):
+    (tmp_path / "a.png").write_bytes(b"a")
+    out = tmp_path / "out"
+
+    result = runner.invoke(
+        app,
+        ["watch", str(tmp_path), "--out-dir", str(out), "--no-dry-run"]
+        + ["--polling", "--interval", "0.01", "--timeout", "0.05"],
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "polling" in result.output
+    assert not (tmp_path / "a.png").exists()
+    assert len(list(out.rglob("a.png"))) == 1
+    assert "verschoben=1" in result.output
+
+
+@needs_inotify
+def test_watch_sorts_files_as_they_arrive(tmp_path: Path):
+    out = tmp_path / "out"
+    timer = threading.Timer(0.1, (tmp_path / "late.png").write_bytes, [b"late"])
+    timer.start()
+    try:
+        result = runner.invoke(
+            app,
+            ["watch", str(tmp_path), "--out-dir", str(out), "--no-dry-run"]
+            + ["--timeout", "0.5"],
+        )
+    finally:
+        timer.join()
+
+    assert result.exit_code == 0, result.output
+    assert "inotify" in result.output
+    assert len(list(out.rglob("late.png"))) == 1
+
+
+def test_watch_missing_path(tmp_path: Path):
+    result = runner.invoke(app, ["watch", str(tmp_path / "nope")])
+    assert result.exit_code == 1